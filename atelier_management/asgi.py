@@ -1,7 +1,9 @@
 """
 ASGI config for atelier_management project.
 
-It exposes the ASGI callable as a module-level variable named ``application``.
+It exposes the ASGI callable as a module-level variable named ``application``:
+one entry point serving HTTP (Django, async views included), the dashboard
+WebSocket (Channels) and the ASGI lifespan events (deadline rollover scheduler).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -13,4 +15,20 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'atelier_management.settings')
 
-application = get_asgi_application()
+# Initialize Django (app registry, settings) before importing consumers and models.
+django_asgi_app = get_asgi_application()
+
+from channels.auth import AuthMiddlewareStack # noqa: E402
+from channels.routing import ProtocolTypeRouter, URLRouter # noqa: E402
+from channels.security.websocket import AllowedHostsOriginValidator # noqa: E402
+
+from tasks.routing import websocket_urlpatterns # noqa: E402
+from tasks.scheduler import lifespan_app # noqa: E402
+
+application = ProtocolTypeRouter({
+    "http": django_asgi_app,
+    "websocket": AllowedHostsOriginValidator(
+        AuthMiddlewareStack(URLRouter(websocket_urlpatterns))
+    ),
+    "lifespan": lifespan_app, # Deadline rollover pushes
+})
@@ -0,0 +1,95 @@
+from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connections
+from django.forms import Media
+from django.utils.functional import cached_property
+
+# Admin changelists over large tables (see TaskAdmin): counts that don't scan
+# the table, and a related-object filter that doesn't list the related table.
+
+def estimate_row_count(model, using):
+    """
+    Row count of the model's table as last estimated by the planner (PostgreSQL's
+    pg_class.reltuples, kept current by autovacuum); None when unknown.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+        row = cursor.fetchone()
+    if row is None or row[0] < 0: # -1: never vacuumed / analyzed
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator whose count never runs an exact COUNT(*) over a large table:
+    the unfiltered changelist uses the planner's estimate once the table holds
+    more than 'estimate_threshold' rows, and filtered ones count at most
+    'count_limit' rows (later pages are reached by narrowing the filters).
+    Pair it with show_full_result_count = False, which drops the admin's
+    second, unfiltered count.
+    """
+    estimate_threshold = 10_000
+    count_limit = 10_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.has_filters():
+            estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.estimate_threshold:
+                return estimate
+        return queryset.order_by()[:self.count_limit].count()
+
+
+class AutocompleteListFilter(admin.RelatedFieldListFilter):
+    """
+    Related-object list filter rendered as the admin's autocomplete widget,
+    usage: list_filter = [('client', AutocompleteListFilter)]. Unlike the
+    default filter it doesn't load the related table into the sidebar: the
+    widget searches it through the related ModelAdmin's search_fields and only
+    the selected row is read. The ModelAdmin needs AutocompleteFilterMixin for
+    the widget's scripts.
+    """
+    template = 'admin/autocomplete_filter.html'
+    value_placeholder = '__value__'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.admin_site = model_admin.admin_site
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+    def field_choices(self, field, request, model_admin):
+        return [] # Picked in the widget, not listed
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        # Where the widget navigates to: the current filters with the picked value.
+        self.value_query_string = changelist.get_query_string(
+            {self.lookup_kwarg: self.value_placeholder}, [self.lookup_kwarg_isnull]
+        )
+        return super().choices(changelist)
+
+    def widget(self):
+        # Through a form field, which supplies the widget's choices (the query for the selected row).
+        widget = self.field.formfield(widget=AutocompleteSelect(self.field, self.admin_site), required=False).widget
+        value = self.lookup_val[-1] if self.lookup_val else None
+        return widget.render(self.lookup_kwarg, value, attrs={'id': f'{self.lookup_kwarg}_autocomplete'})
+
+
+class AutocompleteFilterMixin:
+    """ModelAdmin mixin adding the scripts of its AutocompleteListFilter list filters."""
+    @property
+    def media(self):
+        media = super().media
+        for list_filter in self.list_filter:
+            if isinstance(list_filter, (list, tuple)) and issubclass(list_filter[1], AutocompleteListFilter):
+                field = self.model._meta.get_field(list_filter[0])
+                media += AutocompleteSelect(field, self.admin_site).media
+                media += Media(js=['js/autocomplete_filter.js'])
+        return media
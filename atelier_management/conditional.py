@@ -0,0 +1,89 @@
+import datetime
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    View mixin answering GET requests with 304 Not Modified when the content
+    has not changed since the client's copy, before any rendering work.
+
+    get_validators() returns a dict of cheap values describing the content,
+    typically one aggregate over the displayed queryset: Max('updated_at')
+    values plus a Count (so deletions change the validators too). The ETag
+    hashes them together with what else the response varies on: the user,
+    the HX-Request header (page vs. partial) and the query string
+    (filters, cursor). Returning None skips conditional handling.
+
+    Views with async handlers call aconditional_get() from their get() instead;
+    they may override aget_validators() to read the validators with the async ORM.
+    """
+    def get_validators(self):
+        raise NotImplementedError("Subclasses of ConditionalGetMixin must implement get_validators().")
+
+    async def aget_validators(self):
+        return await sync_to_async(self.get_validators)()
+
+    def get_etag(self, validators):
+        parts = [
+            self.request.user.pk,
+            bool(self.request.htmx) and not self.request.htmx.history_restore_request,
+            self.request.META.get('QUERY_STRING', ''),
+            *(f'{key}={value}' for key, value in sorted(validators.items())),
+        ]
+        return quote_etag(hashlib.md5('|'.join(map(str, parts)).encode()).hexdigest())
+
+    def get_last_modified(self, validators):
+        timestamps = [value for value in validators.values() if isinstance(value, datetime.datetime)]
+        return max(timestamps).timestamp() if timestamps else None
+
+    def has_pending_messages(self):
+        # Pending flash messages are rendered (and consumed) by the page, so it must be sent.
+        return bool(len(get_messages(self.request)))
+
+    def evaluate_preconditions(self, validators):
+        """Returns (304 response or None, etag, last modified timestamp)."""
+        etag = self.get_etag(validators)
+        last_modified = self.get_last_modified(validators)
+        response = get_conditional_response(self.request, etag=etag, last_modified=last_modified)
+        return response, etag, last_modified
+
+    def patch_conditional_headers(self, response, etag, last_modified):
+        response.headers.setdefault('ETag', etag)
+        if last_modified is not None:
+            response.headers.setdefault('Last-Modified', http_date(last_modified))
+        patch_vary_headers(response, ('HX-Request', 'Cookie'))
+        # Let browsers keep the copy but revalidate it on every use (no heuristic freshness).
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get(self, request, *args, **kwargs):
+        if self.has_pending_messages():
+            return super().get(request, *args, **kwargs)
+        validators = self.get_validators()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+        response, etag, last_modified = self.evaluate_preconditions(validators)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return self.patch_conditional_headers(response, etag, last_modified)
+
+    async def aconditional_get(self, handler, request, *args, **kwargs):
+        """
+        Async counterpart of get(): 'handler' is the coroutine function
+        producing the full response when the client's copy is stale.
+        """
+        # The message storage may read the session, which the event loop can't do.
+        if await sync_to_async(self.has_pending_messages)():
+            return await handler(request, *args, **kwargs)
+        validators = await self.aget_validators()
+        if validators is None:
+            return await handler(request, *args, **kwargs)
+        response, etag, last_modified = self.evaluate_preconditions(validators)
+        if response is None:
+            response = await handler(request, *args, **kwargs)
+        return self.patch_conditional_headers(response, etag, last_modified)
@@ -0,0 +1,100 @@
+from contextlib import asynccontextmanager
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+
+# How a worker process manages its database connections (DATABASE_CONNECTIONS):
+# - 'pool': a psycopg 3 pool per process and database (PostgreSQL); requests and
+#   consumers borrow a connection and give it back when done. Backends without
+#   pooling fall back to 'per-request'.
+# - 'persistent': every thread keeps its connection for CONN_MAX_AGE seconds,
+#   checked before reuse. Suited to threaded WSGI servers only: under ASGI each
+#   request runs in a new thread, whose connection would be abandoned.
+# - 'per-request': Django's default, a new connection per request.
+CONNECTION_MODES = ('pool', 'persistent', 'per-request')
+POOLING_ENGINES = {'django.db.backends.postgresql'} # Backends with built-in pooling (Django 5.1+)
+
+def configure_connections(database, mode='pool', workers=1, budget=80,
+                          min_size=2, timeout=10, conn_max_age=60):
+    """
+    Returns a copy of the DATABASES entry 'database' set up for 'mode'.
+
+    Pools are sized per worker process: every server worker (WEB_CONCURRENCY)
+    owns a pool, so the 'budget' of connections the database server grants
+    this deployment is split between them. A request waits up to 'timeout'
+    seconds for a free connection, then fails instead of piling up.
+    """
+    if mode not in CONNECTION_MODES:
+        raise ValueError(f"Unknown connection mode {mode!r}, expected one of {', '.join(CONNECTION_MODES)}.")
+    database = {**database, 'OPTIONS': dict(database.get('OPTIONS', {}))}
+    if mode == 'pool' and database['ENGINE'] not in POOLING_ENGINES:
+        mode = 'per-request'
+    if mode == 'pool':
+        max_size = max(min_size, budget // max(workers, 1))
+        database['CONN_MAX_AGE'] = 0 # Required by pooling: connections go back to the pool instead
+        database['CONN_HEALTH_CHECKS'] = True # Makes the pool test connections before handing them out
+        database['OPTIONS']['pool'] = {
+            'min_size': min(min_size, max_size),
+            'max_size': max_size,
+            'timeout': timeout,
+            'max_idle': 300, # Shrink back to min_size after bursts
+        }
+    elif mode == 'persistent':
+        database['CONN_MAX_AGE'] = conn_max_age
+        database['CONN_HEALTH_CHECKS'] = True # A dropped connection is replaced, not failed on
+    else:
+        database['CONN_MAX_AGE'] = 0
+    return database
+
+def get_connection_mode(settings_dict):
+    if settings_dict['OPTIONS'].get('pool'):
+        return 'pool'
+    return 'persistent' if settings_dict['CONN_MAX_AGE'] != 0 else 'per-request'
+
+def get_connection_stats():
+    """
+    Connection settings of every database and, for pooled ones, the counters
+    of this process's pool: size, idle connections, waiting requests, wait
+    times, errors (see psycopg_pool's get_stats()).
+    """
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        entry = {
+            'vendor': connection.vendor,
+            'mode': get_connection_mode(connection.settings_dict),
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            'health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+        }
+        pool = getattr(connection, 'pool', None)
+        if pool is not None:
+            entry['pool'] = pool.get_stats()
+        stats[alias] = entry
+    return stats
+
+def release_connections():
+    """
+    close_old_connections() for work outside of requests: closes the unusable
+    or expired connections of this thread, which for pooled ones means giving
+    them back. Connections inside a transaction are left alone.
+    """
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close_if_unusable_or_obsolete()
+
+@asynccontextmanager
+async def areleasing_connections():
+    """
+    Connection handling for async ORM work outside of HTTP requests (consumers,
+    the rollover scheduler), which request_started / request_finished don't
+    cover: unusable or expired connections are dropped before the work, and
+    the connection is released afterwards. The async ORM runs consumer queries
+    in one long-lived thread, which would otherwise keep a pooled connection
+    checked out, or a broken one, forever.
+    """
+    # Run in the ORM's thread: connections belong to threads.
+    await sync_to_async(release_connections)()
+    try:
+        yield
+    finally:
+        await sync_to_async(release_connections)()
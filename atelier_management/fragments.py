@@ -0,0 +1,53 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+def get_fragment_cache():
+    return caches[getattr(settings, 'FRAGMENT_CACHE_ALIAS', 'default')]
+
+def _object_token(obj):
+    """model:pk:updated_at; a save bumps updated_at, so the token (and every key using it) changes."""
+    updated_at = getattr(obj, 'updated_at', None)
+    return f"{obj._meta.label_lower}:{obj.pk}:{updated_at.timestamp() if updated_at else ''}"
+
+def _index_key(obj):
+    return f"fragment-index:{obj._meta.label_lower}:{obj.pk}"
+
+def fragment_key(name, objects, day=None):
+    """
+    Cache key of fragment 'name' rendered for 'objects' (the owner first, then the
+    objects it displays data of, e.g. a task's client) on local date 'day', since
+    fragments may show date-relative state such as is_overdue.
+    """
+    day = day or timezone.localdate()
+    tokens = '|'.join(_object_token(obj) for obj in objects)
+    digest = hashlib.md5(f"{tokens}|{day.isoformat()}".encode()).hexdigest()
+    return f"fragment:{name}:{digest}"
+
+def get_or_render(name, objects, render):
+    """
+    Returns the cached HTML of fragment 'name' for 'objects', calling render()
+    on a miss. Keys written for the owner object are indexed so that
+    invalidate_fragments() can drop them when it is saved or deleted.
+    """
+    cache = get_fragment_cache()
+    key = fragment_key(name, objects)
+    html = cache.get(key)
+    if html is None:
+        html = render()
+        timeout = getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 60 * 60 * 24)
+        cache.set(key, html, timeout)
+        # Best effort: a lost index update only leaves an entry to expire on its own.
+        index_key = _index_key(objects[0])
+        keys = cache.get(index_key) or []
+        if key not in keys:
+            cache.set(index_key, [*keys, key], timeout)
+    return html
+
+def invalidate_fragments(obj):
+    """Drops every cached fragment owned by 'obj' (called on save and delete)."""
+    cache = get_fragment_cache()
+    index_key = _index_key(obj)
+    cache.delete_many([*(cache.get(index_key) or []), index_key])
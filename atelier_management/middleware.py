@@ -0,0 +1,43 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .queries import arecord_queries, log_queries, record_queries
+
+class QueryInstrumentationMiddleware:
+    """
+    Records the queries of every request (count, database time, duplicated SQL)
+    and reports them as a structured log record and, when
+    QUERY_INSTRUMENTATION_HEADERS is on, as X-DB-* response headers.
+    Place it first so that session and authentication queries are included.
+    Runs natively in both sync (WSGI) and async (ASGI) stacks, so it never
+    forces async views back into a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with record_queries() as recorder:
+            response = self.get_response(request)
+        return self.report(request, response, recorder)
+
+    async def __acall__(self, request):
+        async with arecord_queries() as recorder:
+            response = await self.get_response(request)
+        return self.report(request, response, recorder)
+
+    def report(self, request, response, recorder):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else None
+        log_queries(f"{request.method} {request.path}", recorder, view=view, status=response.status_code)
+        if getattr(settings, 'QUERY_INSTRUMENTATION_HEADERS', False):
+            response['X-DB-Query-Count'] = str(recorder.count)
+            response['X-DB-Time-Ms'] = str(recorder.duration_ms)
+            response['X-DB-Duplicate-Queries'] = str(recorder.duplicate_count)
+        return response
@@ -0,0 +1,244 @@
+import base64
+import binascii
+import json
+
+from urllib.parse import urlsplit
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404, QueryDict
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class KeysetPage:
+    """
+    A page of results produced by KeysetPaginator.
+    Mirrors the parts of Django's Page API used by templates (has_next,
+    has_previous, has_other_pages, object_list) and adds the cursors
+    needed to fetch the neighbouring pages.
+    """
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, total_count=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.total_count = total_count # None when the exact count was skipped
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Cursor (keyset) paginator.
+
+    Instead of COUNT(*) + OFFSET n it filters on the last seen values of a
+    unique ordering, e.g. ('-created_at', '-id'): every page costs one
+    index range scan, however deep it is. The ordering must end with a
+    unique field so that the position of every row is unambiguous.
+    """
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = int(per_page)
+        self.fields = [
+            (name.lstrip('-'), name.startswith('-')) for name in self.ordering
+        ]
+
+    def encode_cursor(self, obj, direction):
+        values = [getattr(obj, name) for name, _ in self.fields]
+        # Full isoformat(): DjangoJSONEncoder would truncate datetimes to milliseconds,
+        # making the seek skip rows created within the same millisecond.
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+        data = json.dumps({'d': direction, 'v': values})
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Returns (direction, values); raises InvalidCursor on tampered input."""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            direction, raw_values = data['d'], data['v']
+            if direction not in ('next', 'prev') or len(raw_values) != len(self.fields):
+                raise InvalidCursor(cursor)
+            values = []
+            for (name, _), raw_value in zip(self.fields, raw_values):
+                field = self._get_field(name)
+                value = field.to_python(raw_value)
+                if value is None:
+                    raise InvalidCursor(cursor) # Ordering fields are never NULL; the ORM would refuse it
+                field.run_validators(value) # e.g. integers out of the column's range
+                values.append(value)
+        except (ValueError, KeyError, TypeError, binascii.Error, ValidationError) as exc:
+            raise InvalidCursor(cursor) from exc
+        return direction, values
+
+    def _get_field(self, name):
+        """Model field, or output field of an annotation (e.g. a search rank)."""
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.queryset.model._meta.get_field(name)
+
+    def _seek(self, values, reverse):
+        """
+        Q selecting the rows strictly after 'values' in the ordering
+        (strictly before when 'reverse'), expanded lexicographically:
+        (a > x) OR (a = x AND b > y) OR ...
+        """
+        condition = Q()
+        for index, (name, descending) in enumerate(self.fields):
+            lookup = 'gt' if descending == reverse else 'lt'
+            clause = Q(**{f'{name}__{lookup}': values[index]})
+            for prev_index in range(index):
+                clause &= Q(**{self.fields[prev_index][0]: values[prev_index]})
+            condition |= clause
+        return condition
+
+    def page(self, cursor=None, with_count=False):
+        """
+        Returns the KeysetPage after (or before, for 'prev' cursors) 'cursor'.
+        Fetches per_page + 1 rows to know whether another page exists.
+        The exact total is only computed when 'with_count' is True.
+        """
+        queryset, values, reverse = self._page_queryset(cursor)
+        rows = list(queryset[:self.per_page + 1])
+        total_count = self.queryset.count() if with_count else None
+        return self._build_page(rows, values, reverse, total_count)
+
+    async def apage(self, cursor=None, with_count=False):
+        """Async counterpart of page(), reading the rows with the async ORM."""
+        queryset, values, reverse = self._page_queryset(cursor)
+        rows = [obj async for obj in queryset[:self.per_page + 1]]
+        total_count = await self.queryset.acount() if with_count else None
+        return self._build_page(rows, values, reverse, total_count)
+
+    def _page_queryset(self, cursor):
+        """Returns (queryset of the page and beyond, cursor values, reverse)."""
+        direction, values = ('next', None) if not cursor else self.decode_cursor(cursor)
+        reverse = direction == 'prev'
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(name[1:] if name.startswith('-') else f'-{name}' for name in ordering)
+        queryset = self.queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, reverse))
+        return queryset, values, reverse
+
+    def _build_page(self, rows, values, reverse, total_count):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+        next_cursor = previous_cursor = None
+        if rows:
+            next_cursor = self.encode_cursor(rows[-1], 'next') if has_next else None
+            previous_cursor = self.encode_cursor(rows[0], 'prev') if has_previous else None
+        return KeysetPage(rows, next_cursor, previous_cursor, total_count)
+
+
+def get_current_list_params(request):
+    """
+    Query parameters (filters, cursor) of the page an HTMX request was sent
+    from, read from the HX-Current-URL header; empty for other requests.
+    """
+    current_url = request.htmx.current_url if request.htmx else None
+    return QueryDict(urlsplit(current_url or '').query)
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin switching pagination to keyset mode.
+    Set 'keyset_ordering' to a unique ordering (or override get_keyset_ordering());
+    pages are addressed by an opaque ?cursor= parameter. The exact total count is skipped unless
+    'keyset_exact_count' is True or the request asks for it with ?count=1.
+    """
+    keyset_ordering = None
+    keyset_exact_count = False
+    cursor_kwarg = 'cursor'
+
+    @classmethod
+    def get_keyset_ordering(cls, queryset):
+        """Ordering used for 'queryset'; override to e.g. rank search results."""
+        return cls.keyset_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, self.get_keyset_ordering(queryset), page_size)
+        # Async views fetch the page beforehand (apaginate_queryset()).
+        page = getattr(self, 'keyset_page', None)
+        if page is None:
+            try:
+                page = paginator.page(self.request.GET.get(self.cursor_kwarg), with_count=self.get_keyset_with_count())
+            except InvalidCursor:
+                raise Http404("Invalid page cursor.")
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    async def apaginate_queryset(self, queryset, page_size):
+        """
+        Async counterpart of paginate_queryset(): fetches the page with the async
+        ORM and keeps it, so that get_context_data() does no further query.
+        """
+        paginator = KeysetPaginator(queryset, self.get_keyset_ordering(queryset), page_size)
+        try:
+            self.keyset_page = await paginator.apage(
+                self.request.GET.get(self.cursor_kwarg), with_count=self.get_keyset_with_count()
+            )
+        except InvalidCursor:
+            raise Http404("Invalid page cursor.")
+        return self.paginate_queryset(queryset, page_size)
+
+    def get_keyset_with_count(self):
+        return self.keyset_exact_count or self.request.GET.get('count') == '1'
+
+    def get_page_query(self, cursor):
+        """Current query string (filters included) pointing at 'cursor'."""
+        params = self.request.GET.copy()
+        params[self.cursor_kwarg] = cursor
+        return params.urlencode()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context.get('page_obj')
+        if page is not None:
+            context['next_page_query'] = self.get_page_query(page.next_cursor) if page.has_next() else None
+            context['previous_page_query'] = self.get_page_query(page.previous_cursor) if page.has_previous() else None
+        return context
+
+    @classmethod
+    def get_first_page_context(cls, queryset, params):
+        """
+        Context of the table partials for the first page of 'queryset', capped at
+        paginate_by rows. 'params' (a QueryDict of the list's filters) is kept in
+        the page links. A classmethod, for views re-rendering a list page they
+        don't serve (e.g. after a create).
+        """
+        params = params.copy()
+        params.pop(cls.cursor_kwarg, None)
+        page = KeysetPaginator(queryset, cls.get_keyset_ordering(queryset), cls.paginate_by).page()
+        next_page_query = None
+        if page.has_next():
+            params[cls.cursor_kwarg] = page.next_cursor
+            next_page_query = params.urlencode()
+        return {
+            cls.context_object_name: page.object_list,
+            'page_obj': page,
+            'next_page_query': next_page_query,
+            'previous_page_query': None,
+        }
@@ -0,0 +1,128 @@
+import functools
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.db import connections, DEFAULT_DB_ALIAS
+
+logger = logging.getLogger('atelier_management.queries')
+
+# Recorders of the arecord_queries() blocks the current task (or request) is in.
+_active_recorders = ContextVar('active_query_recorders', default=())
+
+# Attributes every LogRecord has; anything else was passed through 'extra'.
+_STANDARD_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+class StructuredFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, 'extra' fields included."""
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        data.update({key: value for key, value in vars(record).items() if key not in _STANDARD_RECORD_ATTRS})
+        return json.dumps(data, default=str)
+
+class QueryRecorder:
+    """
+    Database execute wrapper recording the queries run through a connection:
+    how many, total time spent in the database, and how often the same SQL
+    (parameters aside) was repeated, which is the signature of an N+1 pattern.
+    Unlike connection.queries it works with DEBUG off and has no size cap.
+    """
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+    @property
+    def duration_ms(self):
+        return round(self.duration * 1000, 2)
+
+    @property
+    def duplicate_count(self):
+        """Queries whose SQL had already been run (N+1 candidates)."""
+        return self.count - len(self.statements)
+
+    def most_repeated(self, limit=3):
+        """The most repeated statements as (sql, times), repeated ones only."""
+        return [(sql, times) for sql, times in self.statements.most_common(limit) if times > 1]
+
+    def as_dict(self):
+        return {
+            'query_count': self.count,
+            'db_time_ms': self.duration_ms,
+            'duplicate_queries': self.duplicate_count,
+        }
+
+@contextmanager
+def record_queries(using=DEFAULT_DB_ALIAS):
+    """Context manager yielding a QueryRecorder attached to the connection of this thread."""
+    recorder = QueryRecorder()
+    with connections[using].execute_wrapper(recorder):
+        yield recorder
+
+@asynccontextmanager
+async def arecord_queries(using=DEFAULT_DB_ALIAS):
+    """
+    Async counterpart of record_queries(), for async views and consumers.
+    The async ORM runs queries in a thread (outside of a request, one shared
+    by every consumer of the process), so the recorder is attached to the
+    connection of that thread and only counts the queries issued from this
+    context: concurrent consumers don't see each other's queries.
+    """
+    recorder = QueryRecorder()
+
+    def wrapper(execute, sql, params, many, context):
+        if recorder in _active_recorders.get():
+            return recorder(execute, sql, params, many, context)
+        return execute(sql, params, many, context)
+
+    # Looked up in the thread: connections are per thread.
+    await sync_to_async(lambda: connections[using].execute_wrappers.append(wrapper))()
+    token = _active_recorders.set((*_active_recorders.get(), recorder))
+    try:
+        yield recorder
+    finally:
+        _active_recorders.reset(token)
+        await sync_to_async(lambda: connections[using].execute_wrappers.remove(wrapper))()
+
+def log_queries(label, recorder, **extra):
+    """Emits one structured log record for a unit of work (request, consumer message)."""
+    logger.info(
+        "%s: %d queries (%d duplicated) in %.2f ms",
+        label, recorder.count, recorder.duplicate_count, recorder.duration_ms,
+        extra={'label': label, **recorder.as_dict(), **extra},
+    )
+    for sql, times in recorder.most_repeated():
+        logger.debug("%s: repeated %d times: %s", label, times, sql)
+
+def instrument_queries(label):
+    """
+    Decorator recording and logging the queries of a synchronous function,
+    e.g. the database half of a consumer message (wrap it before sync_to_async).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with record_queries() as recorder:
+                result = func(*args, **kwargs)
+            log_queries(label, recorder)
+            return result
+        return wrapper
+    return decorator
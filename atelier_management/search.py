@@ -0,0 +1,230 @@
+import re
+import sqlite3
+from contextlib import closing
+from functools import lru_cache
+
+from django.db.models import BooleanField, F, FloatField, Func, Lookup, Q, TextField, Value
+from django.db.models.expressions import RawSQL
+
+# Relative weight of each class; the same values Postgres ts_rank uses by default.
+WEIGHTS = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+# Search terms are reduced to word characters: nothing of the user input reaches
+# the tsquery / FTS5 MATCH syntax except plain (prefix-matched) words.
+TERM_RE = re.compile(r'\w+')
+MAX_TERMS = 8
+
+def parse_terms(query):
+    """Lower-cased words of 'query', at most MAX_TERMS of them."""
+    return TERM_RE.findall((query or '').lower())[:MAX_TERMS]
+
+@lru_cache(maxsize=None)
+def _sqlite_has_fts5():
+    # A property of the SQLite library Python links against, the same for every
+    # connection: checked on a throwaway in-memory database, so that building a
+    # search query never touches the Django connection (async views build them
+    # on the event loop).
+    with closing(sqlite3.connect(':memory:')) as db:
+        return 'ENABLE_FTS5' in {row[0] for row in db.execute("PRAGMA compile_options")}
+
+
+class FullTextMatch(Lookup):
+    """SQLite FTS5 'MATCH' on the hidden column named after the FTS table."""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+class SearchDocumentField(TextField):
+    """
+    The hidden column of an FTS5 table (db_column = the table name), on an
+    unmanaged model mapping the table. Supports the __match lookup and is the
+    first argument of bm25().
+    """
+
+SearchDocumentField.register_lookup(FullTextMatch)
+
+
+class SearchIndex:
+    """
+    Weighted full-text index over some text columns of a table, maintained by
+    the database itself so that every write path (save(), bulk_create(),
+    update(), raw SQL) keeps it current:
+
+    - PostgreSQL: a generated 'search_vector' tsvector column with a GIN index;
+    - SQLite: an FTS5 external content table kept in sync by triggers, joined
+      through 'entry', the reverse one-to-one of an unmanaged model mapping it
+      (rowid as primary key, a SearchDocumentField named 'document');
+    - any other database: no index, searches fall back to icontains scans.
+
+    create() / drop() are RunPython callables for migrations. match() and
+    rank() return the expressions used by the querysets' search() methods.
+    """
+    def __init__(self, table, columns, entry='search_entry'):
+        self.table = table
+        self.columns = list(columns) # [(column, weight 'A'-'D'), ...]
+        self.entry = entry
+
+    @property
+    def fts_table(self):
+        return f'{self.table}_fts'
+
+    def get_backend(self, connection):
+        if connection.vendor == 'postgresql':
+            return 'postgresql'
+        if connection.vendor == 'sqlite' and _sqlite_has_fts5():
+            return 'sqlite'
+        return None
+
+    # Schema
+
+    def create(self, apps, schema_editor):
+        backend = self.get_backend(schema_editor.connection)
+        if backend == 'postgresql':
+            document = ' || '.join(
+                f"setweight(to_tsvector('simple', coalesce({schema_editor.quote_name(column)}, '')), '{weight}')"
+                for column, weight in self.columns
+            )
+            schema_editor.execute(
+                f"ALTER TABLE {self.table} ADD COLUMN search_vector tsvector "
+                f"GENERATED ALWAYS AS ({document}) STORED"
+            )
+            schema_editor.execute(f"CREATE INDEX {self.table}_search_idx ON {self.table} USING gin (search_vector)")
+        elif backend == 'sqlite':
+            for statement in self.sqlite_statements():
+                schema_editor.execute(statement)
+            self.rebuild(schema_editor.connection)
+
+    def drop(self, apps, schema_editor):
+        backend = self.get_backend(schema_editor.connection)
+        if backend == 'postgresql':
+            schema_editor.execute(f"ALTER TABLE {self.table} DROP COLUMN search_vector") # Drops the index too
+        elif backend == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {self.fts_table}_{suffix}")
+            schema_editor.execute(f"DROP TABLE IF EXISTS {self.fts_table}")
+
+    def sqlite_statements(self):
+        """FTS5 table and the triggers mirroring every insert, update and delete into it."""
+        names = ', '.join(column for column, _ in self.columns)
+        new = ', '.join(f'new.{column}' for column, _ in self.columns)
+        old = ', '.join(f'old.{column}' for column, _ in self.columns)
+        insert = f"INSERT INTO {self.fts_table}(rowid, {names}) VALUES (new.id, {new});"
+        delete = f"INSERT INTO {self.fts_table}({self.fts_table}, rowid, {names}) VALUES ('delete', old.id, {old});"
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table} USING fts5("
+            f"{names}, content='{self.table}', content_rowid='id')",
+            f"CREATE TRIGGER IF NOT EXISTS {self.fts_table}_ai AFTER INSERT ON {self.table} BEGIN {insert} END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.fts_table}_ad AFTER DELETE ON {self.table} BEGIN {delete} END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.fts_table}_au AFTER UPDATE OF {names} ON {self.table} "
+            f"BEGIN {delete} {insert} END",
+        ]
+
+    def rebuild(self, connection):
+        """
+        Re-creates the SQLite triggers if missing (SQLite migrations altering the
+        table rebuild it without them) and refills the index from the table.
+        """
+        if self.get_backend(connection) != 'sqlite':
+            return
+        with connection.cursor() as cursor:
+            for statement in self.sqlite_statements():
+                cursor.execute(statement)
+            cursor.execute(f"INSERT INTO {self.fts_table}({self.fts_table}) VALUES ('rebuild')")
+
+    # Queries
+
+    def match(self, terms, connection):
+        """Q selecting the rows containing every term (as a word prefix)."""
+        backend = self.get_backend(connection)
+        if backend == 'postgresql':
+            return Q(RawSQL(
+                f"{self.table}.search_vector @@ to_tsquery('simple', %s)",
+                [self.tsquery(terms)], output_field=BooleanField(),
+            ))
+        if backend == 'sqlite':
+            # A join (rather than pk IN (...)) lets rank() use bm25() on the same FTS scan.
+            return Q(**{f'{self.entry}__document__match': self.fts_query(terms)})
+        match = Q()
+        for term in terms:
+            match &= Q.create([(f'{column}__icontains', term) for column, _ in self.columns], connector=Q.OR)
+        return match
+
+    def rank(self, terms, connection):
+        """Relevance of the rows selected by match() (higher is better)."""
+        backend = self.get_backend(connection)
+        if backend == 'postgresql':
+            return RawSQL(
+                f"ts_rank({self.table}.search_vector, to_tsquery('simple', %s))",
+                [self.tsquery(terms)], output_field=FloatField(),
+            )
+        if backend == 'sqlite':
+            weights = [Value(WEIGHTS[weight]) for _, weight in self.columns]
+            # bm25() is negative, more negative being more relevant.
+            return Func(
+                F(f'{self.entry}__document'), *weights,
+                function='bm25', template='-%(function)s(%(expressions)s)', output_field=FloatField(),
+            )
+        return Value(0.0, output_field=FloatField())
+
+    def match_pks(self, terms, connection):
+        """
+        match() as a primary key subquery instead of a join, for OR-ing with
+        other conditions: FTS5 refuses MATCH anywhere but in a join constraint.
+        """
+        if self.get_backend(connection) == 'sqlite':
+            return Q(pk__in=RawSQL(
+                f"SELECT rowid FROM {self.fts_table} WHERE {self.fts_table} MATCH %s", [self.fts_query(terms)],
+            ))
+        return self.match(terms, connection)
+
+    def rank_or_zero(self, terms, connection):
+        """rank() for rows selected by match_pks() alone or OR-ed: 0 for rows not matching."""
+        backend = self.get_backend(connection)
+        if backend == 'postgresql':
+            return RawSQL(
+                f"CASE WHEN {self.table}.search_vector @@ to_tsquery('simple', %s) "
+                f"THEN ts_rank({self.table}.search_vector, to_tsquery('simple', %s)) ELSE 0 END",
+                [self.tsquery(terms)] * 2, output_field=FloatField(),
+            )
+        if backend == 'sqlite':
+            weights = ', '.join(str(WEIGHTS[weight]) for _, weight in self.columns)
+            # bm25() needs the MATCH in its own query. The ranks of all matches are
+            # materialized once and looked up per row: a plain correlated subquery
+            # would re-run the (prefix) MATCH for every row.
+            materialized = 'MATERIALIZED ' if sqlite3.sqlite_version_info >= (3, 35) else ''
+            return RawSQL(
+                f"COALESCE((WITH ranks AS {materialized}(SELECT rowid, -bm25({self.fts_table}, {weights}) AS rank "
+                f"FROM {self.fts_table} WHERE {self.fts_table} MATCH %s) "
+                f"SELECT rank FROM ranks WHERE rowid = {self.table}.id), 0)",
+                [self.fts_query(terms)], output_field=FloatField(),
+            )
+        return Value(0.0, output_field=FloatField())
+
+    @staticmethod
+    def tsquery(terms):
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    @staticmethod
+    def fts_query(terms):
+        return ' '.join(f'"{term}"*' for term in terms)
+
+
+class FullTextSearchAdminMixin:
+    """
+    ModelAdmin mixin sending the changelist search box through the model's
+    indexed, ranked search() instead of icontains scans over search_fields
+    (which must still be set for the admin to show the box). Results are
+    sorted by relevance unless a column header was clicked.
+    """
+    def get_search_results(self, request, queryset, search_term):
+        from django.contrib.admin.views.main import ORDER_VAR
+        if not parse_terms(search_term):
+            return queryset, False
+        results = queryset.search(search_term)
+        if ORDER_VAR not in request.GET:
+            results = results.order_by('-search_rank', *queryset.query.order_by)
+        return results, False
@@ -20,6 +20,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'atelier_management.middleware.QueryInstrumentationMiddleware', # First: counts session/auth queries too
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -27,6 +28,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'django_htmx.middleware.HtmxMiddleware', # Sets request.htmx for HTMX-aware views
 ]
 
 ROOT_URLCONF = 'atelier_management.urls'
@@ -43,12 +45,24 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'libraries': {
+                'fragment_cache': 'atelier_management.templatetags.fragment_cache', # {% fragmentcache %}
+            },
         },
     },
 ]
 
 WSGI_APPLICATION = 'atelier_management.wsgi.application'
 
+# Loads the user's profile (role) together with the user on every authenticated request.
+# ModelBackend stays listed so sessions logged in before ProfileModelBackend (which record
+# ModelBackend as their backend) remain valid instead of being logged out; new logins use
+# ProfileModelBackend, which comes first.
+AUTHENTICATION_BACKENDS = [
+    'users.backends.ProfileModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -103,3 +117,57 @@ CHANNEL_LAYERS = {
         },
     },
 }
+
+# Dashboard broadcasts: task changes within this window (seconds) are merged
+# into a single metrics push. 0 disables debouncing (one push per commit).
+DASHBOARD_BROADCAST_WINDOW = float(os.environ.get('DASHBOARD_BROADCAST_WINDOW', 0.5))
+
+# Cache shared by the client choices and the template fragment cache:
+# Redis when REDIS_URL is set, process-local memory otherwise.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
+# Sessions and the authenticated user (users.backends.ProfileModelBackend) are read
+# through the cache, so authenticated requests and websocket connects don't query
+# django_session / auth_user. Both are dropped from the cache on logout, and the user
+# on every user or profile save, but only in the process's own cache: with LocMem
+# this is for single-process servers (production.py falls back otherwise).
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+AUTH_USER_CACHE_TIMEOUT = 60 * 5 # 0 disables the user cache
+
+# Rendered row/card fragments ({% fragmentcache %}); keys change on every save anyway.
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Query instrumentation: every request is logged to 'atelier_management.queries'
+# (count, DB time, duplicated SQL); these headers expose the same numbers.
+QUERY_INSTRUMENTATION_HEADERS = os.environ.get('QUERY_INSTRUMENTATION_HEADERS', 'true').lower() in ('1', 'true', 'yes')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'structured': {'()': 'atelier_management.queries.StructuredFormatter'},
+    },
+    'handlers': {
+        'structured_console': {'class': 'logging.StreamHandler', 'formatter': 'structured'},
+    },
+    'loggers': {
+        'atelier_management.queries': {
+            'handlers': ['structured_console'],
+            'level': os.environ.get('QUERY_LOG_LEVEL', 'WARNING'), # INFO: one record per request
+            'propagate': False,
+        },
+    },
+}
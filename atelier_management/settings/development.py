@@ -7,15 +7,22 @@ ALLOWED_HOSTS = ['*'] # Allows access from any host during dev
 
 # Database (using django-environ to parse DATABASE_URL from docker-compose)
 import environ
+from atelier_management.connections import configure_connections
 env = environ.Env()
 environ.Env.read_env() # reads .env file
 DATABASES = {
-    'default': env.db('DATABASE_URL')
+    # Per-request connections unless DATABASE_CONNECTIONS picks another mode (e.g. to try the pool)
+    'default': configure_connections(
+        env.db('DATABASE_URL'),
+        mode=os.environ.get('DATABASE_CONNECTIONS', 'per-request'),
+        workers=int(os.environ.get('WEB_CONCURRENCY', 1)),
+    )
 }
 
 # Django Debug Toolbar
 INSTALLED_APPS += [
     'debug_toolbar',
+    'benchmarks', # seed_benchmark / run_benchmarks commands
 ]
 
 MIDDLEWARE += [
@@ -6,13 +6,31 @@ ALLOWED_HOSTS = ['yourdomain.com', 'www.yourdomain.com'] # IMPORTANT: Change in
 
 # Database (using django-environ)
 import environ
+from atelier_management.connections import configure_connections
 env = environ.Env()
 # In production, env vars are usually set directly in the environment, not from .env file.
 # But you might read from an explicit path if needed (e.g., K8s secrets)
 DATABASES = {
-    'default': env.db('DATABASE_URL')
+    'default': configure_connections(
+        env.db('DATABASE_URL'),
+        mode=os.environ.get('DATABASE_CONNECTIONS', 'pool'), # pool | persistent | per-request
+        workers=int(os.environ.get('WEB_CONCURRENCY', 1)), # Each worker process has its own pool
+        budget=int(os.environ.get('DATABASE_CONNECTION_BUDGET', 80)), # Postgres max_connections minus headroom
+        timeout=float(os.environ.get('DATABASE_POOL_TIMEOUT', 10)),
+        conn_max_age=int(os.environ.get('CONN_MAX_AGE', 60)),
+    )
 }
 
+# Without a shared cache (REDIS_URL), worker processes can't invalidate each other's
+# cached sessions and users: a logout or password change in one would go unnoticed
+# by the others. Several workers then read both from the database.
+if not REDIS_URL and int(os.environ.get('WEB_CONCURRENCY', 1)) > 1:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+    AUTH_USER_CACHE_TIMEOUT = 0
+
+# Structured per-request query logs (count, DB time, duplicated SQL)
+LOGGING['loggers']['atelier_management.queries']['level'] = os.environ.get('QUERY_LOG_LEVEL', 'INFO')
+
 # Configure static and media files for production
 # STATIC_ROOT = os.path.join(BASE_DIR, 'static_root')
 # MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -0,0 +1,34 @@
+from django import template
+
+from atelier_management.fragments import get_or_render
+
+register = template.Library()
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, name, objects):
+        self.nodelist = nodelist
+        self.name = name
+        self.objects = objects
+
+    def render(self, context):
+        name = self.name.resolve(context)
+        objects = [obj.resolve(context) for obj in self.objects]
+        return get_or_render(name, objects, lambda: self.nodelist.render(context))
+
+@register.tag('fragmentcache')
+def do_fragment_cache(parser, token):
+    """
+    Caches the enclosed fragment per object and version:
+
+        {% fragmentcache 'task_row' task task.client %} ... {% endfragmentcache %}
+
+    The key combines the fragment name, model, pk and updated_at of every listed
+    object (the first one owns the entry) and today's local date. Only use it
+    around markup that does not depend on the request or user.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a fragment name and at least one object.")
+    nodelist = parser.parse(('endfragmentcache',))
+    parser.delete_first_token()
+    return FragmentCacheNode(nodelist, parser.compile_filter(bits[1]), [parser.compile_filter(bit) for bit in bits[2:]])
@@ -0,0 +1,22 @@
+from contextlib import contextmanager
+
+from .queries import record_queries
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin declaring query budgets: unlike assertNumQueries, the
+    budget is an upper bound, so a view may get cheaper without breaking
+    its test, but never more expensive. Duplicated SQL is reported in the
+    failure message to point at the N+1 culprit.
+    """
+    @contextmanager
+    def assertQueryBudget(self, max_queries, allow_duplicates=True):
+        with record_queries() as recorder:
+            yield recorder
+        repeated = "\n".join(f"  {times}x {sql}" for sql, times in recorder.most_repeated())
+        self.assertLessEqual(
+            recorder.count, max_queries,
+            f"{recorder.count} queries executed, budget is {max_queries}.\n{repeated}",
+        )
+        if not allow_duplicates:
+            self.assertEqual(recorder.duplicate_count, 0, f"Duplicated queries:\n{repeated}")
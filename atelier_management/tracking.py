@@ -0,0 +1,72 @@
+class FieldTrackerMixin:
+    """
+    Model mixin remembering the field values an instance was loaded with.
+
+    The snapshot is taken in from_db() and refreshed after every save, so
+    "what changed?" can be answered in memory instead of re-reading the row.
+    Set `save_changed_fields_only = True` on a model to have a plain save()
+    of a loaded instance issue an UPDATE of the changed columns only.
+    """
+    save_changed_fields_only = False
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def _snapshot(self, field_names=None):
+        """Stores the current values of `field_names` (default: all loaded concrete fields)."""
+        deferred = self.get_deferred_fields()
+        loaded = getattr(self, '_loaded_values', {})
+        for field in self._meta.concrete_fields:
+            if field.attname in deferred:
+                continue
+            if field_names is not None and field.name not in field_names and field.attname not in field_names:
+                continue
+            loaded[field.attname] = getattr(self, field.attname)
+        self._loaded_values = loaded
+
+    def has_loaded_values(self):
+        """True if the instance carries a snapshot of its database state."""
+        return bool(getattr(self, '_loaded_values', None))
+
+    def get_loaded_value(self, attname, default=None):
+        """Returns the value `attname` had when loaded (or last saved)."""
+        return getattr(self, '_loaded_values', {}).get(attname, default)
+
+    def get_dirty_fields(self):
+        """Returns {attname: loaded_value} for every field changed since load/save."""
+        loaded = getattr(self, '_loaded_values', {})
+        return {
+            attname: old_value
+            for attname, old_value in loaded.items()
+            if getattr(self, attname) != old_value
+        }
+
+    def is_dirty(self):
+        return bool(self.get_dirty_fields())
+
+    def save(self, *args, **kwargs):
+        if (
+            self.save_changed_fields_only
+            and not args
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+            and not self._state.adding
+            and self.has_loaded_values()
+        ):
+            changed = list(self.get_dirty_fields())
+            if not changed:
+                return # Nothing changed: skip the UPDATE (and the save signals).
+            auto_now = [
+                field.attname for field in self._meta.concrete_fields
+                if getattr(field, 'auto_now', False) and field.attname not in changed
+            ]
+            kwargs['update_fields'] = changed + auto_now
+        super().save(*args, **kwargs)
+        self._snapshot(kwargs.get('update_fields'))
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._snapshot(fields)
@@ -2,9 +2,11 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.contrib.auth import views as auth_views # Import Django's auth views
+from .views import database_stats
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics/db/', database_stats, name='database_stats'), # Staff only: pool size, waits, errors
     path('login/', auth_views.LoginView.as_view(template_name='registration/login.html'), name='login'),
     path('logout/', auth_views.LogoutView.as_view(next_page='/login/'), name='logout'), # Redirect to login after logout
     # Add client/task URLs here later
@@ -0,0 +1,12 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from .connections import get_connection_stats
+
+@staff_member_required
+def database_stats(request):
+    """
+    Connection management of this worker process as JSON: mode per database
+    and, when pooled, the pool counters (each worker has its own pool).
+    """
+    return JsonResponse(get_connection_stats())
@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.runner import BenchmarkRunner, compare, load_report, save_report
+
+DEFAULT_BASELINE = Path(__file__).resolve().parents[2] / 'baseline.json'
+MIN_BASELINE_ITERATIONS = 20 # Below that, the nearest-rank p95 is simply the slowest run
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the HTTP views and the dashboard WebSocket against the current database "
+        "(see seed_benchmark) and compares the results with a stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help="Measured runs per scenario.")
+        parser.add_argument('--connections', type=int, default=200, help="Concurrent dashboard WebSockets.")
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+        parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed latency regression (fraction).")
+        parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline.")
+        parser.add_argument('--output', help="Also write the report (JSON) to this file.")
+
+    def handle(self, *args, **options):
+        if not options['iterations'] or not options['connections']:
+            raise CommandError("--iterations and --connections must be positive.")
+        if options['save_baseline'] and options['iterations'] < MIN_BASELINE_ITERATIONS:
+            raise CommandError(f"A baseline needs at least {MIN_BASELINE_ITERATIONS} iterations for a meaningful p95.")
+        runner = BenchmarkRunner(options['iterations'], options['connections'], log=self.stdout.write)
+        report = runner.run()
+        if options['output']:
+            save_report(report, options['output'])
+        if options['save_baseline']:
+            save_report(report, options['baseline'])
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['baseline']}."))
+            return
+        if not Path(options['baseline']).exists():
+            self.stdout.write(self.style.WARNING("No baseline to compare with; run with --save-baseline first."))
+            return
+        baseline = load_report(options['baseline'])
+        if baseline.get('volumes') != report['volumes'] or baseline.get('database') != report['database']:
+            self.stdout.write(self.style.WARNING(
+                f"Baseline was recorded on {baseline.get('database')} with {baseline.get('volumes')}; "
+                f"this run used {report['database']} with {report['volumes']}. Timings are not comparable."
+            ))
+        regressions = compare(report, baseline, options['tolerance'])
+        if regressions:
+            raise CommandError("Regressions against the baseline:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
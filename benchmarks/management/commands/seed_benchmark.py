@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.seed import seed
+from clients.models import Client
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = "Seeds the database with a reproducible, realistic volume of clients and tasks for benchmarking."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=10000)
+        parser.add_argument('--tasks', type=int, default=500000)
+        parser.add_argument('--seed', type=int, default=42, help="Random seed: same seed, same data.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--reset', action='store_true',
+            help="Delete ALL existing clients and tasks first. Only use on a scratch database.",
+        )
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            Client.objects.all().delete() # Cascades to tasks and their statistics
+        elif Client.objects.exists() or Task.objects.exists():
+            raise CommandError("The database already has clients or tasks; use --reset on a scratch database.")
+        seed(
+            clients=options['clients'],
+            tasks=options['tasks'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {options['clients']} clients and {options['tasks']} tasks."
+        ))
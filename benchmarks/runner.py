@@ -0,0 +1,230 @@
+import asyncio
+import json
+import math
+import statistics
+import time
+
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+from django.test import Client as HttpClient
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from atelier_management.connections import get_connection_stats
+from atelier_management.queries import record_queries
+
+from clients.models import Client
+from tasks.metrics import broadcast_dashboard_metrics, dashboard_dispatcher
+from tasks.models import Task, TaskStatus
+from tasks.scheduler import deadline_scheduler
+
+BENCHMARK_USERNAME = 'benchmark'
+
+# Metrics compared against the baseline, and whether they are timings
+# (compared with a tolerance) or deterministic counts (compared exactly).
+COMPARED_METRICS = {'p95_ms': True, 'mean_queries': False}
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+def summarize(durations, queries=None):
+    """Latency percentiles in milliseconds, plus queries per run when measured."""
+    result = {
+        'runs': len(durations),
+        'p50_ms': round(percentile(durations, 50) * 1000, 2),
+        'p95_ms': round(percentile(durations, 95) * 1000, 2),
+    }
+    if queries is not None:
+        result['mean_queries'] = round(statistics.mean(queries), 2)
+        result['max_queries'] = max(queries)
+    return result
+
+class BenchmarkRunner:
+    """
+    Drives the HTTP views and the dashboard WebSocket in-process against the
+    configured database, with the in-memory channel layer so no Redis is needed.
+    Sockets go through the project's ASGI application (origin check,
+    AuthMiddlewareStack resolving the logged-in session, routing), as in production.
+    Each scenario reports p50/p95 latency and queries per request; the socket
+    scenarios report connect latency and broadcast fan-out time.
+    """
+    def __init__(self, iterations=20, connections=200, log=None):
+        self.iterations = iterations
+        self.connections = connections
+        self.log = log or (lambda message: None)
+
+    def run(self):
+        with override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}):
+            self.user, _ = User.objects.get_or_create(username=BENCHMARK_USERNAME)
+            self.http = HttpClient(REMOTE_ADDR='10.0.0.1') # Outside INTERNAL_IPS: no debug toolbar
+            self.http.force_login(self.user) # Its session cookie also authenticates the sockets
+            results = {}
+            results.update(self.run_http())
+            dashboard_dispatcher.flush() # Don't let pending broadcasts leak into the socket scenarios
+            results.update(async_to_sync(self.run_websocket)())
+        # Connection mode and, when pooled, the pool counters after the run (waits, errors, size).
+        database_connections = get_connection_stats()[DEFAULT_DB_ALIAS]
+        self.log(f"database connections: {database_connections}")
+        return {
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'volumes': {'clients': Client.objects.count(), 'tasks': Task.objects.count()},
+            'iterations': self.iterations,
+            'connections': self.connections,
+            'database_connections': database_connections,
+            'results': results,
+        }
+
+    # HTTP
+
+    def get_http_scenarios(self):
+        """(name, method, url, data factory, HTMX request) for every benchmarked request."""
+        client = Client.objects.order_by('pk').first()
+        task = Task.objects.filter(status__in=[TaskStatus.PENDING, TaskStatus.IN_PROGRESS]).order_by('pk').first()
+        statuses = [TaskStatus.IN_PROGRESS, TaskStatus.PENDING]
+
+        def task_data(i):
+            return {
+                'client': client.pk,
+                'title': f"Benchmark task {i}",
+                'description': '',
+                'status': TaskStatus.PENDING,
+                'deadline': (timezone.localdate() + timezone.timedelta(days=i % 10)).isoformat(),
+            }
+
+        return [
+            ('task_list', 'get', reverse('task_list'), None, False),
+            ('task_list_filtered', 'get', f"{reverse('task_list')}?status={TaskStatus.PENDING}", None, True),
+            ('task_list_search', 'get', f"{reverse('task_list')}?q=dress", None, True),
+            ('client_list', 'get', reverse('client_list'), None, False),
+            ('client_list_search', 'get', f"{reverse('client_list')}?q={client.last_name[:3]}", None, True),
+            ('client_detail', 'get', reverse('client_detail', args=[client.pk]), None, False),
+            ('dashboard', 'get', reverse('dashboard'), None, False),
+            ('dashboard_section', 'get', reverse('dashboard_section', args=['overdue']), None, True),
+            ('task_create_htmx', 'post', reverse('task_create'), task_data, True),
+            ('task_update_htmx', 'post', reverse('task_update', args=[task.pk]), task_data, True),
+            ('task_status_htmx', 'post', reverse('task_update_status', args=[task.pk]),
+             lambda i: {'status': statuses[i % 2]}, True),
+        ]
+
+    def run_http(self):
+        http = self.http
+        results = {}
+        for name, method, url, data, htmx in self.get_http_scenarios():
+            if method == 'get':
+                results[name] = self.run_http_scenario(http, name, method, url, data, htmx)
+                continue
+            # Writes are rolled back, so that every run sees the seeded data (and volumes).
+            # Their commit (and the on_commit broadcast) is therefore not measured.
+            with transaction.atomic():
+                results[name] = self.run_http_scenario(http, name, method, url, data, htmx)
+                transaction.set_rollback(True)
+        return results
+
+    def run_http_scenario(self, http, name, method, url, data, htmx):
+        headers = {'HX-Request': 'true'} if htmx else {}
+        request = getattr(http, method)
+        request(url, data(0) if data else None, headers=headers) # Warm-up (caches, template loading)
+        durations, queries = [], []
+        for i in range(self.iterations):
+            with record_queries() as recorder:
+                start = time.perf_counter()
+                response = request(url, data(i) if data else None, headers=headers)
+                durations.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{name}: {method.upper()} {url} returned {response.status_code}")
+            queries.append(recorder.count)
+        result = summarize(durations, queries)
+        self.log(f"{name}: {result}")
+        return result
+
+    # WebSocket
+
+    def make_communicator(self):
+        """
+        Connection to the dashboard through atelier_management.asgi.application,
+        authenticated by the benchmark user's session cookie (no server needed).
+        Channels' WebsocketCommunicator would do the same, but channels.testing
+        imports daphne, which this project doesn't install.
+        """
+        from atelier_management.asgi import application
+        host = next((host for host in settings.ALLOWED_HOSTS if host != '*'), 'localhost').lstrip('.')
+        session_id = self.http.cookies[settings.SESSION_COOKIE_NAME].value
+        scope = {
+            'type': 'websocket',
+            'path': '/ws/dashboard/',
+            'query_string': b'',
+            'headers': [
+                (b'host', host.encode()),
+                (b'origin', f'http://{host}'.encode()),
+                (b'cookie', f'{settings.SESSION_COOKIE_NAME}={session_id}'.encode()),
+            ],
+            'subprotocols': [],
+        }
+        return ApplicationCommunicator(application, scope)
+
+    async def connect(self, communicator):
+        start = time.perf_counter()
+        await communicator.send_input({'type': 'websocket.connect'})
+        accepted = await communicator.receive_output(timeout=30)
+        assert accepted['type'] == 'websocket.accept', accepted # Closed: origin or session rejected
+        # Simultaneous connections share one metrics snapshot, but the session and
+        # user lookups still queue on the ORM's single thread.
+        await communicator.receive_output(timeout=30 + self.connections)
+        return time.perf_counter() - start
+
+    async def run_websocket(self):
+        communicators = [self.make_communicator() for _ in range(self.connections)]
+        connect_times = await asyncio.gather(*(self.connect(communicator) for communicator in communicators))
+        results = {'ws_connect': summarize(connect_times)}
+        self.log(f"ws_connect ({self.connections} sockets): {results['ws_connect']}")
+
+        fan_out = []
+        for _ in range(self.iterations):
+            start = time.perf_counter()
+            # Compute the payload once and send it to the group, then wait for every socket.
+            await database_sync_to_async(broadcast_dashboard_metrics)()
+            await asyncio.gather(*(communicator.receive_output(timeout=30) for communicator in communicators))
+            fan_out.append(time.perf_counter() - start)
+        results['ws_broadcast_fan_out'] = summarize(fan_out)
+        self.log(f"ws_broadcast_fan_out ({self.connections} sockets): {results['ws_broadcast_fan_out']}")
+
+        for communicator in communicators:
+            await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await communicator.wait(timeout=30)
+        await deadline_scheduler.stop() # Started by the first connection on this loop
+        return results
+
+def compare(report, baseline, tolerance=0.25):
+    """
+    Lists the regressions of 'report' against 'baseline': timings slower than
+    the baseline by more than 'tolerance' (a fraction), or more queries.
+    """
+    regressions = []
+    for name, result in report['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            continue
+        for metric, is_timing in COMPARED_METRICS.items():
+            if metric not in result or metric not in base:
+                continue
+            limit = base[metric] * (1 + tolerance) if is_timing else base[metric]
+            if result[metric] > limit:
+                regressions.append(f"{name}.{metric}: {result[metric]} > baseline {base[metric]}")
+    return regressions
+
+def load_report(path):
+    with open(path) as report_file:
+        return json.load(report_file)
+
+def save_report(report, path):
+    with open(path, 'w') as report_file:
+        json.dump(report, report_file, indent=2, sort_keys=True)
+        report_file.write('\n')
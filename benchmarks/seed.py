@@ -0,0 +1,67 @@
+import datetime
+import random
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from clients.choices import invalidate_client_choices
+from clients.models import Client
+from tasks.models import Task, TaskDailyStats, TaskStatus
+
+FIRST_NAMES = ['Olena', 'Ivan', 'Maria', 'Taras', 'Iryna', 'Andrii', 'Sofia', 'Dmytro', 'Kateryna', 'Oleh']
+LAST_NAMES = ['Shevchenko', 'Kovalenko', 'Bondarenko', 'Tkachenko', 'Kravchenko', 'Melnyk', 'Boyko', 'Moroz']
+TASK_TITLES = ['Hem trousers', 'Take in waist', 'Replace zipper', 'Shorten sleeves', 'Tailor suit', 'Sew dress']
+
+# Mostly finished history with a small open backlog, as in a real atelier.
+STATUS_WEIGHTS = {
+    TaskStatus.COMPLETED: 80,
+    TaskStatus.CANCELLED: 5,
+    TaskStatus.PENDING: 6,
+    TaskStatus.IN_PROGRESS: 6,
+    TaskStatus.ON_HOLD: 3,
+}
+
+def seed(clients=10000, tasks=500000, seed=42, batch_size=5000, log=None):
+    """
+    Bulk-inserts 'clients' clients and 'tasks' tasks with a reproducible random
+    distribution (same 'seed', same data). Signals are bypassed, so the daily
+    rollup is rebuilt and the client choices cache invalidated at the end.
+    """
+    log = log or (lambda message: None)
+    rng = random.Random(seed)
+    today = timezone.localdate()
+    now = timezone.now()
+    statuses, weights = zip(*STATUS_WEIGHTS.items())
+
+    with transaction.atomic():
+        for start in range(0, clients, batch_size):
+            Client.objects.bulk_create(
+                Client(
+                    first_name=rng.choice(FIRST_NAMES),
+                    last_name=f"{rng.choice(LAST_NAMES)}-{index}",
+                    phone_number=f"+380{rng.randrange(10 ** 9):09d}",
+                )
+                for index in range(start, min(start + batch_size, clients))
+            )
+        log(f"Created {clients} clients.")
+        client_ids = list(Client.objects.values_list('pk', flat=True))
+
+        for start in range(0, tasks, batch_size):
+            batch = []
+            for index in range(start, min(start + batch_size, tasks)):
+                status = rng.choices(statuses, weights)[0]
+                batch.append(Task(
+                    client_id=rng.choice(client_ids),
+                    title=f"{rng.choice(TASK_TITLES)} #{index}",
+                    status=status,
+                    deadline=today + datetime.timedelta(days=rng.randint(-365, 60)),
+                    completed_at=now - datetime.timedelta(minutes=rng.randint(0, 3 * 365 * 24 * 60))
+                    if status == TaskStatus.COMPLETED else None,
+                ))
+            Task.objects.bulk_create(batch)
+            log(f"Created {start + len(batch)}/{tasks} tasks.")
+
+        TaskDailyStats.objects.rebuild()
+    invalidate_client_choices()
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE") # Give the planner statistics for the new volumes
@@ -0,0 +1,67 @@
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import Client as HttpClient, TestCase, override_settings
+
+from clients.models import Client
+from tasks.models import Task, TaskDailyStats
+from tasks.scheduler import deadline_scheduler
+from .runner import BenchmarkRunner, compare, summarize
+from .seed import seed
+
+
+class BenchmarkHarnessTests(TestCase):
+    """Smoke test of the harness on a tiny dataset; real runs use seed_benchmark / run_benchmarks."""
+    @classmethod
+    def setUpTestData(cls):
+        seed(clients=20, tasks=200, batch_size=50)
+
+    def test_seed_is_reproducible_in_volume(self):
+        self.assertEqual(Client.objects.count(), 20)
+        self.assertEqual(Task.objects.count(), 200)
+        self.assertEqual(sum(TaskDailyStats.objects.status_totals().values()), 200)
+
+    def test_run_reports_every_scenario(self):
+        report = BenchmarkRunner(iterations=2, connections=5).run()
+        results = report['results']
+        for name in ('task_list', 'client_detail', 'dashboard', 'task_create_htmx', 'task_status_htmx'):
+            self.assertGreater(results[name]['mean_queries'], 0, name)
+        self.assertEqual(results['ws_connect']['runs'], 5)
+        self.assertIn('p95_ms', results['ws_broadcast_fan_out'])
+
+    def test_run_leaves_the_data_unchanged(self):
+        task = Task.objects.filter(status__in=['pending', 'in_progress']).order_by('pk').first()
+        BenchmarkRunner(iterations=2, connections=1).run()
+        self.assertEqual((Client.objects.count(), Task.objects.count()), (20, 200))
+        self.assertEqual(Task.objects.get(pk=task.pk).title, task.title) # Updates rolled back too
+
+    @override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+    def test_sockets_authenticate_through_the_session(self):
+        runner = BenchmarkRunner()
+        runner.http = HttpClient()
+        runner.http.force_login(User.objects.create_user('benchmark'))
+
+        async def connect():
+            communicator = runner.make_communicator()
+            try:
+                return await runner.connect(communicator)
+            finally:
+                await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+                await communicator.wait(timeout=5)
+                await deadline_scheduler.stop() # Started by an accepted connection
+        self.assertGreater(async_to_sync(connect)(), 0)
+        runner.http.logout() # The cookie now names a deleted session: AuthMiddlewareStack rejects it
+        runner.http.cookies[settings.SESSION_COOKIE_NAME] = 'expired'
+        with self.assertRaises(AssertionError):
+            async_to_sync(connect)()
+
+    def test_compare_flags_slower_timings_and_extra_queries(self):
+        baseline = {'results': {'task_list': {'p95_ms': 10.0, 'mean_queries': 3}}}
+        report = {'results': {'task_list': {'p95_ms': 12.0, 'mean_queries': 4}}}
+        self.assertEqual(compare(report, baseline, tolerance=0.25), ['task_list.mean_queries: 4 > baseline 3'])
+        report['results']['task_list']['p95_ms'] = 20.0
+        self.assertEqual(len(compare(report, baseline, tolerance=0.25)), 2)
+
+    def test_summarize_percentiles(self):
+        summary = summarize([i / 1000 for i in range(1, 101)], queries=[2] * 100)
+        self.assertEqual((summary['p50_ms'], summary['p95_ms'], summary['mean_queries']), (50.0, 95.0, 2))
@@ -1,11 +1,15 @@
 from django.contrib import admin
+from atelier_management.changelist import EstimatedCountPaginator
+from atelier_management.search import FullTextSearchAdminMixin
 from .models import Client
 
 @admin.register(Client)
-class ClientAdmin(admin.ModelAdmin):
+class ClientAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ('get_full_name', 'email', 'phone_number', 'created_at')
-    search_fields = ('first_name', 'last_name', 'email', 'phone_number')
+    search_fields = ('first_name', 'last_name', 'email', 'phone_number') # Served by Client.objects.search()
     list_filter = ('created_at', 'updated_at')
+    paginator = EstimatedCountPaginator # Also pages the task admin's client autocomplete
+    show_full_result_count = False
     readonly_fields = ('created_at', 'updated_at') # Ensure these aren't editable
     fieldsets = (
         (None, {
@@ -0,0 +1,94 @@
+import uuid
+
+from django.core.cache import cache
+from .models import Client
+
+CLIENT_CHOICES_VERSION_KEY = 'clients:choices:version'
+CLIENT_CHOICES_TIMEOUT = 60 * 60 # Safety net; entries are normally replaced by a version bump.
+
+# Clients offered at a time by a client picker's autocomplete (see ClientAutocompleteView).
+CLIENT_AUTOCOMPLETE_LIMIT = 20
+
+def _get_choices_version():
+    version = cache.get(CLIENT_CHOICES_VERSION_KEY)
+    if version is None:
+        # A random version (rather than a counter) can never resurrect an old entry after eviction.
+        version = uuid.uuid4().hex
+        cache.set(CLIENT_CHOICES_VERSION_KEY, version, None)
+    return version
+
+async def _aget_choices_version():
+    version = await cache.aget(CLIENT_CHOICES_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        await cache.aset(CLIENT_CHOICES_VERSION_KEY, version, None)
+    return version
+
+def get_client_choices_version():
+    """Opaque token that changes whenever the cached choices are invalidated (used in ETags)."""
+    return _get_choices_version()
+
+def get_client_choices():
+    """
+    Returns a lightweight [(id, full name), ...] list of all clients, ordered by name.
+    Used for filter dropdowns and form selects instead of loading full Client instances.
+    Cached until any client is saved or deleted.
+    """
+    cache_key = f'clients:choices:{_get_choices_version()}'
+    choices = cache.get(cache_key)
+    if choices is None:
+        choices = [
+            (pk, f"{first_name} {last_name}")
+            for pk, first_name, last_name in Client.objects.order_by('first_name', 'last_name')
+            .values_list('pk', 'first_name', 'last_name')
+        ]
+        cache.set(cache_key, choices, CLIENT_CHOICES_TIMEOUT)
+    return choices
+
+async def aget_client_choices():
+    """Async counterpart of get_client_choices(), for async views."""
+    cache_key = f'clients:choices:{await _aget_choices_version()}'
+    choices = await cache.aget(cache_key)
+    if choices is None:
+        choices = [
+            (pk, f"{first_name} {last_name}")
+            async for pk, first_name, last_name in Client.objects.order_by('first_name', 'last_name')
+            .values_list('pk', 'first_name', 'last_name')
+        ]
+        await cache.aset(cache_key, choices, CLIENT_CHOICES_TIMEOUT)
+    return choices
+
+async def aget_client_choices_version():
+    return await _aget_choices_version()
+
+def _name_choices(clients):
+    return [
+        (pk, f"{first_name} {last_name}")
+        for pk, first_name, last_name in clients.values_list('pk', 'first_name', 'last_name')
+    ]
+
+def search_client_choices(term, selected_id=None, limit=CLIENT_AUTOCOMPLETE_LIMIT):
+    """
+    (id, full name) pairs of the 'limit' clients best matching 'term' (by name
+    when empty), preceded by the selected client's so the picker keeps it.
+    Client pickers offer these instead of listing every client.
+    """
+    clients = Client.objects.search(term).order_by('-search_rank', 'first_name', 'last_name', 'pk')[:limit]
+    choices = _name_choices(clients)
+    if selected_id is not None and selected_id not in dict(choices):
+        choices = _name_choices(Client.objects.filter(pk=selected_id)) + choices
+    return choices
+
+async def aget_selected_client_choices(selected_id):
+    """The selected client's [(id, full name)] (empty when none): a picker's initial options."""
+    if selected_id is None:
+        return []
+    return [
+        (pk, f"{first_name} {last_name}")
+        async for pk, first_name, last_name in Client.objects.filter(pk=selected_id)
+        .values_list('pk', 'first_name', 'last_name')
+    ]
+
+def invalidate_client_choices():
+    """Bumps the version so the next get_client_choices() call rebuilds the list."""
+    cache.set(CLIENT_CHOICES_VERSION_KEY, uuid.uuid4().hex, None)
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['last_name', 'first_name', 'id'], name='client_name_idx'),
+        ),
+    ]
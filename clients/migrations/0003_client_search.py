@@ -0,0 +1,32 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+import atelier_management.search
+from atelier_management.search import SearchIndex
+
+# Frozen copy of clients.models.CLIENT_SEARCH_INDEX at the time of this migration.
+CLIENT_SEARCH_INDEX = SearchIndex(
+    'clients_client', [('first_name', 'A'), ('last_name', 'A'), ('email', 'B'), ('phone_number', 'B')]
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0002_client_client_name_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(CLIENT_SEARCH_INDEX.create, CLIENT_SEARCH_INDEX.drop),
+        migrations.CreateModel(
+            name='ClientSearchEntry',
+            fields=[
+                ('client', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='clients.client')),
+                ('document', atelier_management.search.SearchDocumentField(db_column='clients_client_fts')),
+            ],
+            options={
+                'db_table': 'clients_client_fts',
+                'managed': False,
+            },
+        ),
+    ]
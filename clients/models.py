@@ -1,5 +1,30 @@
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.utils import timezone
+from atelier_management.fragments import invalidate_fragments
+from atelier_management.search import SearchDocumentField, SearchIndex, parse_terms
+
+# Full-text index over the client's contact details (created by migration 0003_client_search).
+CLIENT_SEARCH_INDEX = SearchIndex(
+    'clients_client', [('first_name', 'A'), ('last_name', 'A'), ('email', 'B'), ('phone_number', 'B')]
+)
+
+class ClientQuerySet(models.QuerySet):
+    """Custom QuerySet for Client model (search)."""
+    def search(self, query):
+        """
+        Clients matching every word of 'query' (word prefixes) in their name,
+        email or phone number, annotated with 'search_rank' (higher is more
+        relevant). An empty query returns the queryset unfiltered, with rank 0.
+        """
+        terms = parse_terms(query)
+        if not terms:
+            return self.annotate(search_rank=models.Value(0.0, output_field=models.FloatField()))
+        connection = connections[self.db]
+        return self.filter(CLIENT_SEARCH_INDEX.match(terms, connection)).annotate(
+            search_rank=CLIENT_SEARCH_INDEX.rank(terms, connection),
+        )
 
 class Client(models.Model):
     """
@@ -31,10 +56,16 @@ class Client(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, help_text="Date and time when the client profile was created.")
     updated_at = models.DateTimeField(auto_now=True, help_text="Last date and time when the client profile was updated.")
 
+    objects = ClientQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Client"
         verbose_name_plural = "Clients"
         ordering = ['last_name', 'first_name']
+        indexes = [
+            # Client list ordering / keyset pagination (pk as tie-breaker).
+            models.Index(fields=['last_name', 'first_name', 'id'], name='client_name_idx'),
+        ]
 
     def __str__(self):
         """
@@ -57,4 +88,31 @@ class Client(models.Model):
     def contact_info(self):
         """Returns primary contact info."""
         return self.email if self.email else self.phone_number
-    
\ No newline at end of file
+
+class ClientSearchEntry(models.Model):
+    """
+    Row of the SQLite FTS5 index of clients (see CLIENT_SEARCH_INDEX), joined by
+    Client.objects.search(). Unmanaged: created by migration 0003_client_search.
+    """
+    client = models.OneToOneField(
+        Client, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid',
+        db_constraint=False, related_name='search_entry',
+    )
+    document = SearchDocumentField(db_column='clients_client_fts')
+
+    class Meta:
+        managed = False
+        db_table = 'clients_client_fts'
+
+# Signal receivers keeping cached client data in sync
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def client_changed_handler(sender, instance, **kwargs):
+    """
+    Invalidates the cached client choices once the change is committed,
+    so a concurrent request cannot re-cache the pre-commit list, and drops
+    the client's cached row fragments.
+    """
+    from .choices import invalidate_client_choices
+    transaction.on_commit(invalidate_client_choices)
+    invalidate_fragments(instance)
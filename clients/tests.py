@@ -1,3 +1,144 @@
+from django.contrib.auth.models import User
+from django.db import transaction
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from atelier_management.testing import QueryBudgetMixin
+from tasks.models import Task
+from .choices import (
+    CLIENT_AUTOCOMPLETE_LIMIT, get_client_choices, get_client_choices_version, invalidate_client_choices,
+)
+from .models import Client
+
+
+class ClientViewQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Client pages cost a fixed number of queries, however many clients and tasks exist."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='secret')
+        clients = Client.objects.bulk_create(
+            Client(first_name=f"First{i}", last_name=f"Last{i}") for i in range(30)
+        )
+        cls.client_obj = clients[0]
+        Task.objects.bulk_create(Task(client=cls.client_obj, title=f"Task {i}") for i in range(25))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_client_list_within_budget(self):
+        with self.assertQueryBudget(4, allow_duplicates=False): # Session, user, ETag validators, page rows
+            response = self.client.get(reverse('client_list'))
+        with self.assertQueryBudget(4, allow_duplicates=False):
+            self.client.get(f"{reverse('client_list')}?{response.context['next_page_query']}")
+
+    def test_client_detail_within_budget(self):
+        with self.assertQueryBudget(5, allow_duplicates=False): # Session, user, ETag validators, client, its tasks
+            self.client.get(reverse('client_detail', args=[self.client_obj.pk]))
+
+    def test_client_detail_revalidates_until_tasks_change(self):
+        url = reverse('client_detail', args=[self.client_obj.pk])
+        response = self.client.get(url)
+        headers = {'If-None-Match': response['ETag']}
+        self.assertEqual(self.client.get(url, headers=headers).status_code, 304)
+        Task.objects.create(client=self.client_obj, title="New task")
+        self.assertEqual(self.client.get(url, headers=headers).status_code, 200)
+
+    def test_htmx_create_returns_only_the_new_row(self):
+        data = {'first_name': "Grace", 'last_name': "Hopper"}
+        with self.assertQueryBudget(4): # Session, user, insert, session save (flash message)
+            response = self.client.post(reverse('client_create'), data, headers={'HX-Request': 'true'})
+        self.assertEqual(response['HX-Reswap'], 'none')
+        self.assertContains(response, 'hx-swap-oob="afterbegin:#client-table-body"')
+        self.assertEqual(response.content.decode().count('<tr'), 1)
+
+
+class ClientSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='secret')
+        cls.ada = Client.objects.create(first_name="Ada", last_name="Lovelace", email="ada@example.com", phone_number="+380 67 123")
+        cls.adam = Client.objects.create(first_name="Adam", last_name="Smith")
+
+    def test_search_by_name_prefix_email_and_phone(self):
+        self.assertEqual(set(Client.objects.search("ada")), {self.ada, self.adam})
+        self.assertEqual(list(Client.objects.search("lovelace ada")), [self.ada])
+        self.assertEqual(list(Client.objects.search("example.com")), [self.ada])
+        self.assertEqual(list(Client.objects.search("380")), [self.ada])
+
+    def test_list_view_search(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('client_list'), {'q': 'smith'}, headers={'HX-Request': 'true'})
+        self.assertEqual(list(response.context['clients']), [self.adam])
+
+
+class ClientAutocompleteTests(QueryBudgetMixin, TestCase):
+    """Client pickers search a capped number of clients instead of listing them all."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='secret')
+        cls.ada = Client.objects.create(first_name="Ada", last_name="Lovelace")
+        Client.objects.bulk_create(
+            Client(first_name=f"First{i}", last_name=f"Last{i}") for i in range(CLIENT_AUTOCOMPLETE_LIMIT + 5)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def options(self, response):
+        return [pk for pk, name in response.context['client_options']]
+
+    def test_matches_term(self):
+        response = self.client.get(reverse('client_autocomplete'), {'term': 'lovelace'})
+        self.assertEqual(self.options(response), [self.ada.pk])
+        self.assertContains(response, '<option value="">All clients</option>', html=True)
+
+    def test_capped_and_keeps_selected(self):
+        with self.assertQueryBudget(4): # Session, user, matches, the selected client
+            response = self.client.get(reverse('client_autocomplete'), {'term': 'first', 'client': self.ada.pk})
+        options = self.options(response)
+        self.assertEqual(len(options), CLIENT_AUTOCOMPLETE_LIMIT + 1)
+        self.assertEqual(options[0], self.ada.pk)
+        self.assertContains(response, f'<option value="{self.ada.pk}" selected>Ada Lovelace</option>', html=True)
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('client_autocomplete')).status_code, 302)
+
+
+class ClientChoicesCacheTests(TestCase):
+    """The cached (id, name) choices are invalidated by committed client changes only."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.ada = Client.objects.create(first_name="Ada", last_name="Lovelace")
+
+    def setUp(self):
+        invalidate_client_choices() # The cache outlives the previous test's rolled back data
+        self.version = get_client_choices_version()
+        get_client_choices() # Warm
+
+    def test_save_invalidates_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            grace = Client.objects.create(first_name="Grace", last_name="Hopper")
+            self.assertEqual(get_client_choices_version(), self.version) # Not before the commit
+        self.assertNotEqual(get_client_choices_version(), self.version)
+        self.assertIn((grace.pk, "Grace Hopper"), get_client_choices())
+
+    def test_delete_invalidates_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ada.delete()
+            self.assertEqual(get_client_choices_version(), self.version)
+        self.assertEqual(get_client_choices(), [])
+
+    def test_cached_choices_cost_no_query(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(get_client_choices(), [(self.ada.pk, "Ada Lovelace")])
+
+    def test_rollback_keeps_the_cache(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.ada.first_name = "Augusta"
+                self.ada.save()
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertEqual(get_client_choices_version(), self.version)
+        self.assertEqual(get_client_choices(), [(self.ada.pk, "Ada Lovelace")])
@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import ClientListView, ClientDetailView, ClientCreateView, ClientUpdateView, ClientDeleteView
+from .views import ClientListView, ClientAutocompleteView, ClientDetailView, ClientCreateView, ClientUpdateView, ClientDeleteView
 
 urlpatterns = [
     path('clients/', ClientListView.as_view(), name='client_list'),
+    path('clients/autocomplete/', ClientAutocompleteView.as_view(), name='client_autocomplete'),
     path('clients/<int:pk>/', ClientDetailView.as_view(), name='client_detail'),
     path('clients/create/', ClientCreateView.as_view(), name='client_create'),
     path('clients/<int:pk>/update/', ClientUpdateView.as_view(), name='client_update'),
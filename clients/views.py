@@ -1,23 +1,75 @@
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
+from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.http import HttpResponse # For HTMX partial responses
 from django.template.loader import render_to_string
 from django.contrib import messages # For Django messages
+from django.db.models import Count, Max
+from django.utils import timezone
 from .models import Client
+from .choices import search_client_choices
 from .forms import ClientForm
+from atelier_management.conditional import ConditionalGetMixin
+from atelier_management.pagination import KeysetPaginationMixin, get_current_list_params
 
-class ClientListView(LoginRequiredMixin, ListView):
+class ClientListView(LoginRequiredMixin, ConditionalGetMixin, KeysetPaginationMixin, ListView):
     """
     Displays a list of all clients.
-    Uses Django's ListView CBV.
+    Uses Django's ListView CBV with cursor (keyset) pagination.
     """
     model = Client
     template_name = 'clients/client_list.html'
     context_object_name = 'clients'
     paginate_by = 10 # Optional: pagination
+    keyset_ordering = ('last_name', 'first_name', 'id') # Model ordering + pk as tie-breaker
 
-class ClientDetailView(LoginRequiredMixin, DetailView):
+    def get_template_names(self):
+        if self.request.htmx and not self.request.htmx.history_restore_request:
+            return ['clients/partials/client_table.html'] # Search and page changes only swap the table body
+        return super().get_template_names()
+
+    def get_queryset(self):
+        return self.filter_queryset(super().get_queryset(), self.request.GET)
+
+    @staticmethod
+    def filter_queryset(queryset, params):
+        """Applies the ?q= search in 'params'; shared with ClientCreateView."""
+        search_query = params.get('q', '').strip()
+        if search_query:
+            queryset = queryset.search(search_query) # Indexed full-text search, ranked
+        return queryset
+
+    @classmethod
+    def get_keyset_ordering(cls, queryset):
+        if 'search_rank' in queryset.query.annotations:
+            return ('-search_rank', 'id') # Most relevant first
+        return super().get_keyset_ordering(queryset)
+
+    def get_validators(self):
+        return self.get_queryset().order_by().aggregate(
+            clients_modified=Max('updated_at'),
+            client_count=Count('pk'), # Catches deletions
+        )
+
+class ClientAutocompleteView(LoginRequiredMixin, TemplateView):
+    """
+    HTMX endpoint behind the client pickers (task list filter, dashboard scope):
+    the <option>s of the clients best matching ?term=, with the ?client=
+    currently selected kept, so no page has to list every client.
+    """
+    template_name = 'clients/partials/client_options.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        try:
+            selected_client_id = int(self.request.GET.get('client', ''))
+        except ValueError:
+            selected_client_id = None
+        context['client_options'] = search_client_choices(self.request.GET.get('term', ''), selected_client_id)
+        context['selected_client_id'] = selected_client_id
+        return context
+
+class ClientDetailView(LoginRequiredMixin, ConditionalGetMixin, DetailView):
     """
     Displays the details of a single client.
     Uses Django's DetailView CBV.
@@ -26,6 +78,18 @@ class ClientDetailView(LoginRequiredMixin, DetailView):
     template_name = 'clients/client_detail.html'
     context_object_name = 'client'
 
+    def get_validators(self):
+        # The client and its task table: edits, new and deleted tasks all change the aggregate.
+        validators = Client.objects.filter(pk=self.kwargs['pk']).aggregate(
+            client_modified=Max('updated_at'),
+            tasks_modified=Max('tasks__updated_at'),
+            task_count=Count('tasks'),
+        )
+        if validators['client_modified'] is None:
+            return None # Let DetailView raise the 404
+        validators['today'] = timezone.localdate()
+        return validators
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # Fetch tasks related to this client
@@ -41,12 +105,18 @@ class ClientCreateView(LoginRequiredMixin, CreateView):
     def form_valid(self, form):
         response = super().form_valid(form)
         messages.success(self.request, f"Client '{self.object.get_full_name()}' created successfully!")
-        # For HTMX, respond with the updated list or a success message
+        # For HTMX, respond with the new row only, or the first page of the list
         if self.request.htmx:
-            # Reload the client list dynamically
-            clients = Client.objects.all()
-            html = render_to_string('clients/partials/client_table.html', {'clients': clients}, request=self.request)
-            return HttpResponse(html)
+            params = get_current_list_params(self.request)
+            if params:
+                # Searching or viewing a later page: go back to the first one (capped at paginate_by rows)
+                clients = ClientListView.filter_queryset(Client.objects.all(), params)
+                context = ClientListView.get_first_page_context(clients, params)
+                html = render_to_string('clients/partials/client_table.html', context, request=self.request)
+                return HttpResponse(html)
+            # Prepended out of band until the next reload puts it in name order
+            html = render_to_string('clients/partials/client_row_oob.html', {'client': self.object}, request=self.request)
+            return HttpResponse(html, headers={'HX-Reswap': 'none'})
         return response
 
     def form_invalid(self, form):
@@ -0,0 +1,13 @@
+'use strict';
+// Applies an AutocompleteListFilter (atelier_management/changelist.py) as soon as a value is picked.
+{
+    const $ = django.jQuery;
+    $(function() {
+        $('.autocomplete-filter select').on('change', function() {
+            const filter = this.closest('.autocomplete-filter');
+            window.location.search = this.value
+                ? filter.dataset.queryString.replace(filter.dataset.placeholder, encodeURIComponent(this.value))
+                : filter.dataset.clearQueryString;
+        });
+    });
+}
@@ -1,11 +1,17 @@
 from django.contrib import admin
-from .models import Task, TaskStatus
+from atelier_management.changelist import AutocompleteFilterMixin, AutocompleteListFilter, EstimatedCountPaginator
+from atelier_management.search import FullTextSearchAdminMixin
+from .models import Task, TaskStatus, OPEN_STATUSES
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(AutocompleteFilterMixin, FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ('title', 'client', 'status', 'deadline', 'is_overdue', 'is_due_soon', 'created_at')
-    list_filter = ('status', 'deadline', 'client')
-    search_fields = ('title', 'description', 'client__first_name', 'client__last_name')
+    list_select_related = ('client',) # Clients joined in, not fetched per row
+    list_filter = ('status', 'deadline', ('client', AutocompleteListFilter)) # Not every client in the sidebar
+    autocomplete_fields = ('client',)
+    paginator = EstimatedCountPaginator # No exact COUNT(*) over the whole table
+    show_full_result_count = False
+    search_fields = ('title', 'description', 'client__first_name', 'client__last_name') # Served by Task.objects.search()
     date_hierarchy = 'created_at' # Adds date navigation
     readonly_fields = ('created_at', 'updated_at', 'completed_at')
     fieldsets = (
@@ -21,20 +27,27 @@ class TaskAdmin(admin.ModelAdmin):
         })
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_deadline_flags()
+
+    @admin.display(boolean=True, description='Is overdue', ordering='overdue')
+    def is_overdue(self, obj):
+        return obj.overdue
+
+    @admin.display(boolean=True, description='Is due soon', ordering='due_soon')
+    def is_due_soon(self, obj):
+        return obj.due_soon
+
     # Custom actions for Admin (example)
     @admin.action(description="Mark selected tasks as 'In Progress'")
     def mark_in_progress(self, request, queryset):
-        updated_count = queryset.filter(status=TaskStatus.PENDING).update(status=TaskStatus.IN_PROGRESS)
+        updated_count = queryset.filter(status=TaskStatus.PENDING).transition_status(TaskStatus.IN_PROGRESS)
         self.message_user(request, f"{updated_count} tasks marked as 'In Progress'.")
 
     @admin.action(description="Mark selected tasks as 'Completed'")
     def mark_completed(self, request, queryset):
-        # When marking completed, the save() method will set completed_at
-        updated_count = 0
-        for task in queryset.filter(status__in=[TaskStatus.PENDING, TaskStatus.IN_PROGRESS, TaskStatus.ON_HOLD]):
-            task.status = TaskStatus.COMPLETED
-            task.save() # Call save() to trigger the custom logic
-            updated_count += 1
+        # Set-based transition: stamps completed_at in one UPDATE (same rules as Task.save())
+        updated_count = queryset.filter(status__in=OPEN_STATUSES).transition_status(TaskStatus.COMPLETED)
         self.message_user(request, f"{updated_count} tasks marked as 'Completed'.")
 
     actions = [mark_in_progress, mark_completed] # Register custom actions
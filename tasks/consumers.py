@@ -1,93 +1,145 @@
-import json
+from urllib.parse import parse_qs
+
 from channels.generic.websocket import AsyncWebsocketConsumer
-from asgiref.sync import sync_to_async
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from .models import Task, TaskStatus
+from atelier_management.queries import arecord_queries, log_queries
+from .models import Task
+from .signals import tasks_transitioned
+from .scheduler import deadline_scheduler
+from .metrics import (
+    DASHBOARD_SCOPED_GROUP_NAME, RELOAD_KEY, aget_dashboard_snapshot, dashboard_dispatcher,
+    get_dashboard_group_name, get_task_sections, serialize_dashboard_payload,
+)
 
 class DashboardConsumer(AsyncWebsocketConsumer):
+    """
+    Pushes dashboard updates. ws/dashboard/ follows the whole atelier;
+    ws/dashboard/?client=<id> only receives changes of that client's tasks,
+    through the client's own channel layer group.
+    """
     async def connect(self):
+        self.dashboard_group_names = []
         # Only allow authenticated users to connect to the dashboard websocket
         if not self.scope["user"].is_authenticated:
             await self.close()
             return
 
-        self.dashboard_group_name = 'dashboard_updates'
+        query = parse_qs(self.scope.get("query_string", b"").decode())
+        try:
+            self.client_id = int(query["client"][0]) if query.get("client") else None
+        except ValueError:
+            await self.close()
+            return
+        self.dashboard_group_names = [get_dashboard_group_name(self.client_id)]
+        if self.client_id is not None:
+            self.dashboard_group_names.append(DASHBOARD_SCOPED_GROUP_NAME)
+        # Servers without ASGI lifespan support (e.g. Daphne) start the rollover
+        # scheduler here instead; it is a no-op once it runs on this loop.
+        deadline_scheduler.ensure_started()
 
-        # Join group
-        await self.channel_layer.group_add(
-            self.dashboard_group_name,
-            self.channel_name
-        )
+        # Join groups
+        for group_name in self.dashboard_group_names:
+            await self.channel_layer.group_add(group_name, self.channel_name)
 
         await self.accept()
         # Send initial data when connected
         await self.send_dashboard_data()
 
     async def disconnect(self, close_code):
-        # Leave group
-        await self.channel_layer.group_discard(
-            self.dashboard_group_name,
-            self.channel_name
-        )
+        # Leave groups
+        for group_name in self.dashboard_group_names:
+            await self.channel_layer.group_discard(group_name, self.channel_name)
 
     async def receive(self, text_data):
         # We don't expect messages from the client for this dashboard
         pass
 
-    async def send_dashboard_data(self):
+    async def send_dashboard_data(self, reload=False, generation=None):
         """
         Fetches current dashboard data and sends it to the connected client.
         """
-        data = await self.get_dashboard_metrics()
-        await self.send(text_data=json.dumps({
-            'type': 'dashboard_metrics',
-            'data': data
-        }))
-
-    @sync_to_async
-    def get_dashboard_metrics(self):
+        payload = await self.get_dashboard_payload(reload, generation)
+        await self.send(text_data=payload)
+
+    async def get_dashboard_payload(self, reload=False, generation=None):
         """
-        Synchronous function to fetch metrics from the database.
-        Runs in a thread pool managed by Channels.
+        The metrics of this dashboard's scope from the snapshot shared by the
+        scope's dashboards (aget_dashboard_snapshot): a burst of connects or
+        reloads costs one aggregated query, not one per socket.
         """
-        overdue_tasks = Task.objects.get_overdue_tasks().count()
-        due_soon_tasks = Task.objects.get_tasks_near_deadline(days=3).count()
-        in_progress_tasks = Task.objects.filter(status=TaskStatus.IN_PROGRESS).count()
-        pending_tasks = Task.objects.filter(status=TaskStatus.PENDING).count()
-        completed_this_month = Task.objects.get_completed_tasks_this_month().count()
-
-        return {
-            'overdue_count': overdue_tasks,
-            'due_soon_count': due_soon_tasks,
-            'in_progress_count': in_progress_tasks,
-            'pending_count': pending_tasks,
-            'completed_this_month_count': completed_this_month,
-        }
+        async with arecord_queries() as recorder:
+            metrics = await aget_dashboard_snapshot(self.client_id, generation)
+        log_queries('DashboardConsumer.get_dashboard_payload', recorder)
+        return serialize_dashboard_payload(metrics, reload=reload)
 
     # Receive message from channel layer group
     async def dashboard_message(self, event):
         """
-        Called when a message is received from the 'dashboard_updates' group.
+        Called when a message is received from one of the dashboard groups.
+        The payload was computed once by the sender; just forward it.
         """
-        await self.send_dashboard_data()
+        await self.send(text_data=event['text'])
+
+    async def dashboard_reload(self, event):
+        """
+        Called for changes whose scope is unknown (bulk imports, midnight rollover).
+        Only client-scoped dashboards receive it; those of one client share the
+        snapshot of the event's generation.
+        """
+        await self.send_dashboard_data(reload=True, generation=event.get('generation'))
 
 # Signal handlers to send updates to the dashboard group
+@receiver(pre_save, sender=Task)
+def remember_dashboard_sections(sender, instance, **kwargs):
+    """
+    Remembers which dashboard sections (and client scope) the task was listed
+    in before this save. Uses the loaded-values snapshot; only instances not
+    loaded from the database need to read their row (e.g. built with an
+    explicit pk, which may well exist: save() then UPDATEs it), the same way
+    remember_task_stats_bucket() does.
+    """
+    if instance._state.adding and instance.pk is None:
+        instance._previous_dashboard_client_id = None
+        instance._previous_dashboard_sections = frozenset()
+    elif not instance._state.adding and all(name in getattr(instance, '_loaded_values', {}) for name in ('status', 'deadline', 'client_id')):
+        instance._previous_dashboard_client_id = instance.get_loaded_value('client_id')
+        instance._previous_dashboard_sections = get_task_sections(
+            instance.get_loaded_value('status'), instance.get_loaded_value('deadline')
+        )
+    else:
+        row = Task.objects.filter(pk=instance.pk).values('status', 'deadline', 'client_id').first()
+        instance._previous_dashboard_client_id = row['client_id'] if row else None
+        instance._previous_dashboard_sections = get_task_sections(row['status'], row['deadline']) if row else frozenset()
+
 @receiver(post_save, sender=Task)
-@receiver(post_delete, sender=Task)
 def task_changed_handler(sender, instance, **kwargs):
     """
-    Signal handler to notify dashboard group when a Task is saved or deleted.
-    This sends a message to the channel layer, which then broadcasts to connected consumers.
+    Signal handler to notify dashboard group when a Task is saved.
+    Changes are handed to the coalescing dispatcher: after the transaction
+    commits, bursts are merged and metrics and section row changes are
+    computed once per flush before being broadcast to connected consumers
+    through the channel layer.
+    """
+    before = getattr(instance, '_previous_dashboard_sections', None)
+    client_before = getattr(instance, '_previous_dashboard_client_id', None)
+    dashboard_dispatcher.notify(key=instance.pk, value=(before, client_before, instance, False))
+
+@receiver(post_delete, sender=Task)
+def task_deleted_handler(sender, instance, **kwargs):
+    """The deleted task leaves every section it was listed in."""
+    before = get_task_sections(instance.status, instance.deadline)
+    dashboard_dispatcher.notify(key=instance.pk, value=(before, instance.client_id, instance, True))
+
+
+@receiver(tasks_transitioned, sender=Task)
+def tasks_transitioned_handler(sender, count, client_ids=None, **kwargs):
+    """
+    Bulk status transitions arrive as one signal for the whole batch;
+    they are recorded as 'count' events but still produce a single broadcast,
+    which asks the dashboards of the affected clients to reload their sections.
     """
-    from channels.layers import get_channel_layer
-    from asgiref.sync import async_to_sync
-
-    channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
-        'dashboard_updates',
-        {
-            'type': 'dashboard.message', # This calls the dashboard_message method in the consumer
-        }
-    )
-    
\ No newline at end of file
+    if client_ids is None:
+        dashboard_dispatcher.notify(count) # Unknown scope: every dashboard reloads
+    else:
+        dashboard_dispatcher.notify(count, key=RELOAD_KEY, value=frozenset(client_ids))
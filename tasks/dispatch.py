@@ -0,0 +1,101 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+class CoalescingDispatcher:
+    """
+    Collapses bursts of change notifications into a single call of `flush_func`.
+
+    Each notification is deferred until the surrounding transaction commits
+    (rolled back changes never trigger a flush). The first committed event
+    opens a window of `window` seconds; every event arriving before the window
+    closes is merged into the same flush. A window of 0 flushes immediately
+    on commit (no debouncing).
+
+    Events may carry a detail (`key`, `value`). `flush_func` receives the
+    merged details as {key: [values in commit order]}, or None when at least
+    one event of the window came without a detail (receivers must then fall
+    back to a full refresh).
+    """
+    def __init__(self, flush_func, window=None, setting_name='DASHBOARD_BROADCAST_WINDOW'):
+        self.flush_func = flush_func
+        self._window = window
+        self.setting_name = setting_name
+        self._lock = threading.Lock()
+        self._timer = None
+        self._pending = 0
+        self._changes = {}
+        self._stats = {'events': 0, 'merged': 0, 'flushes': 0, 'errors': 0}
+
+    @property
+    def window(self):
+        """Debounce window in seconds (explicit value wins over the setting)."""
+        if self._window is not None:
+            return self._window
+        return getattr(settings, self.setting_name, 0)
+
+    def notify(self, count=1, key=None, value=None):
+        """
+        Records `count` change events, optionally with a detail `value` filed
+        under `key`; the flush is scheduled once the transaction commits.
+        """
+        transaction.on_commit(lambda: self._schedule(count, key, value), robust=True)
+
+    def _schedule(self, count, key=None, value=None):
+        with self._lock:
+            self._stats['events'] += count
+            self._pending += count
+            if key is None:
+                self._changes = None # Untracked change: the next flush is a full refresh.
+            elif self._changes is not None:
+                self._changes.setdefault(key, []).append(value)
+            if self._timer is not None:
+                return # A flush is already scheduled; this event is merged into it.
+            window = self.window
+            if window > 0:
+                self._timer = threading.Timer(window, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+                return
+        self.flush()
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # The timer runs in its own thread, which owns its own DB connections.
+            connections.close_all()
+
+    def flush(self):
+        """
+        Runs `flush_func` once for everything collected so far.
+        Returns True if there was anything to flush.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            pending, self._pending = self._pending, 0
+            changes, self._changes = self._changes, {}
+            if not pending:
+                return False
+            self._stats['flushes'] += 1
+            self._stats['merged'] += pending - 1
+        logger.debug("Flushing %s: %d event(s) merged into one.", self.flush_func.__name__, pending)
+        try:
+            self.flush_func(changes)
+        except Exception:
+            # A failed broadcast must never break the save that triggered it.
+            with self._lock:
+                self._stats['errors'] += 1
+            logger.exception("Coalesced flush of %s failed.", self.flush_func.__name__)
+        return True
+
+    def get_stats(self):
+        """Returns a snapshot of the counters: events received, merged, flushes and errors."""
+        with self._lock:
+            return dict(self._stats, pending=self._pending)
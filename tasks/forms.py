@@ -1,5 +1,6 @@
 from django import forms
 from .models import Task
+from clients.choices import get_client_choices
 
 class TaskForm(forms.ModelForm):
     class Meta:
@@ -14,4 +15,7 @@ class TaskForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields['client'].queryset = self.fields['client'].queryset.order_by('first_name', 'last_name')
+        # Render the options from the cached (id, name) list instead of instantiating
+        # every Client; submitted values are still validated against the queryset.
+        self.fields['client'].choices = [('', self.fields['client'].empty_label), *get_client_choices()]
         
\ No newline at end of file
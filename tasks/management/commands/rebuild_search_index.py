@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from clients.models import CLIENT_SEARCH_INDEX
+from tasks.models import TASK_SEARCH_INDEX
+
+
+class Command(BaseCommand):
+    help = (
+        "Refills the SQLite full-text search tables of tasks and clients and restores "
+        "their triggers (needed after a migration alters either table on SQLite). "
+        "PostgreSQL search vectors are generated columns and need no rebuild."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        for index in (CLIENT_SEARCH_INDEX, TASK_SEARCH_INDEX):
+            index.rebuild(connection)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the search index ({connection.vendor})."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from tasks.models import TaskDailyStats
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the TaskDailyStats rollup from the full task history."
+
+    def handle(self, *args, **options):
+        rows = TaskDailyStats.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt task statistics: {rows} daily rows."))
@@ -0,0 +1,303 @@
+import asyncio
+import json
+import uuid
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from atelier_management.connections import areleasing_connections
+from atelier_management.queries import instrument_queries
+from django.utils import timezone
+
+from .dispatch import CoalescingDispatcher
+from .models import Task, TaskStatus, OPEN_STATUSES
+
+# Window (in days) used for the "due soon" dashboard bucket.
+DUE_SOON_DAYS = 3
+
+# Channel layer group of the atelier-wide dashboards. Dashboards scoped to a
+# client join get_dashboard_group_name(client_id) instead, plus
+# DASHBOARD_SCOPED_GROUP_NAME for the rare "everything changed" reloads.
+DASHBOARD_GROUP_NAME = 'dashboard_updates'
+DASHBOARD_SCOPED_GROUP_NAME = f'{DASHBOARD_GROUP_NAME}.scoped'
+
+# Dispatcher key under which bulk changes file the client scopes to reload.
+RELOAD_KEY = 'reload'
+
+# Task lists shown on the dashboard, in display order: key -> title.
+DASHBOARD_SECTIONS = {
+    'overdue': 'Overdue Tasks',
+    'due_soon': f'Tasks Due Soon (within {DUE_SOON_DAYS} days)',
+    'in_progress': 'Tasks In Progress',
+    'pending': 'Pending Tasks',
+}
+
+# Above this many changed tasks per broadcast, dashboards reload their
+# sections instead of patching row by row.
+DASHBOARD_MAX_ROW_CHANGES = 50
+
+def get_dashboard_group_name(client_id=None):
+    """Channel layer group of the dashboards scoped to 'client_id' (None: the whole atelier)."""
+    if client_id is None:
+        return DASHBOARD_GROUP_NAME
+    return f'{DASHBOARD_GROUP_NAME}.client.{client_id}'
+
+def get_task_queryset(client_id=None):
+    """Tasks visible on a dashboard scoped to 'client_id' (None: all tasks)."""
+    if client_id is None:
+        return Task.objects.all()
+    return Task.objects.filter(client_id=client_id)
+
+def get_section_queryset(section, client_id=None):
+    """Tasks listed in a dashboard section, in display order."""
+    tasks = get_task_queryset(client_id)
+    if section == 'overdue':
+        return tasks.get_overdue_tasks()
+    if section == 'due_soon':
+        return tasks.get_tasks_near_deadline(days=DUE_SOON_DAYS)
+    if section == 'in_progress':
+        return tasks.filter(status=TaskStatus.IN_PROGRESS)
+    if section == 'pending':
+        return tasks.filter(status=TaskStatus.PENDING)
+    raise KeyError(section)
+
+def get_section_page_queryset(section, limit, client_id=None):
+    """
+    The first 'limit' tasks of a section, with their client joined in.
+    The page is picked by a subquery over the section's own index first:
+    joining clients_client into that query lets the planner start from the
+    clients table and sort every matching task.
+    """
+    queryset = get_section_queryset(section, client_id)
+    ordering = queryset.query.order_by or Task._meta.ordering
+    return (
+        Task.objects.filter(pk__in=queryset.values('pk')[:limit])
+        .select_related('client') # The compact list shows the client name
+        .order_by(*ordering)
+    )
+
+def get_task_sections(status, deadline, today=None):
+    """
+    The dashboard sections a task with this status and deadline is listed in.
+    In-memory counterpart of get_section_queryset(), used to derive row changes.
+    """
+    today = today or timezone.localdate()
+    sections = set()
+    if status in OPEN_STATUSES and deadline:
+        if deadline < today:
+            sections.add('overdue')
+        elif deadline <= today + timezone.timedelta(days=DUE_SOON_DAYS):
+            sections.add('due_soon')
+    if status == TaskStatus.IN_PROGRESS:
+        sections.add('in_progress')
+    elif status == TaskStatus.PENDING:
+        sections.add('pending')
+    return frozenset(sections)
+
+def get_section_sort_key(task, section):
+    """
+    Numeric key ordering rows within a section the same way its queryset does
+    (deadline first for deadline sections, newest first otherwise), so the
+    browser can insert a pushed row at the right place.
+    """
+    if section in ('overdue', 'due_soon'):
+        return task.deadline.toordinal()
+    return -task.created_at.timestamp()
+
+def get_section_tasks(section, limit, client_id=None):
+    """Fetches up to 'limit' tasks of a section, each tagged with its sort key."""
+    tasks = list(get_section_page_queryset(section, limit, client_id))
+    for task in tasks:
+        task.sort_key = get_section_sort_key(task, section)
+    return tasks
+
+async def aget_section_tasks(section, limit, client_id=None):
+    """Async counterpart of get_section_tasks(), for async views."""
+    tasks = [task async for task in get_section_page_queryset(section, limit, client_id)]
+    for task in tasks:
+        task.sort_key = get_section_sort_key(task, section)
+    return tasks
+
+def get_section_row_id(section, task_pk):
+    """DOM id of a task's row within a dashboard section."""
+    return f'dashboard-{section}-task-{task_pk}'
+
+def render_section_row(task, section):
+    task.sort_key = get_section_sort_key(task, section)
+    return render_to_string('tasks/partials/task_item_compact.html', {'task': task, 'section': section})
+
+def get_row_changes(changes, client_id=None, rendered=None):
+    """
+    Turns the coalesced task changes of one broadcast into section row changes
+    for the dashboards scoped to 'client_id' (None: the whole atelier).
+
+    'changes' maps task pk -> [(sections_before, client_id_before, task, deleted), ...]
+    in commit order: the first entry tells where the task was listed before the
+    burst, the last one where it is now. Returns a list of {'section', 'id',
+    'action' ('upsert' with the rendered row 'html', or 'remove')} dicts, or
+    None when dashboards should reload their sections instead. 'rendered' is an
+    optional dict memoizing row HTML across scopes.
+    """
+    if changes is None or len(changes) > DASHBOARD_MAX_ROW_CHANGES:
+        return None
+    rendered = {} if rendered is None else rendered
+    today = timezone.localdate()
+    rows = []
+    for task_pk, entries in changes.items():
+        before, client_before = entries[0][:2]
+        if before is None:
+            return None # Previous state unknown
+        task, deleted = entries[-1][2:]
+        after = frozenset() if deleted else get_task_sections(task.status, task.deadline, today)
+        if client_id is not None:
+            # A task moved to another client leaves this scope (or enters it).
+            before = before if client_before == client_id else frozenset()
+            after = after if task.client_id == client_id else frozenset()
+        for section in before - after:
+            rows.append({'section': section, 'id': get_section_row_id(section, task_pk), 'action': 'remove'})
+        for section in after:
+            if (task_pk, section) not in rendered:
+                rendered[task_pk, section] = render_section_row(task, section)
+            rows.append({
+                'section': section,
+                'id': get_section_row_id(section, task_pk),
+                'action': 'upsert',
+                'html': rendered[task_pk, section],
+            })
+    return rows
+
+def get_affected_client_ids(changes):
+    """Client scopes a set of task changes (see get_row_changes) is visible in."""
+    client_ids = set()
+    for entries in changes.values():
+        client_ids.add(entries[0][1])
+        client_ids.add(entries[-1][2].client_id)
+    client_ids.discard(None) # Tasks created in this burst had no previous client
+    return client_ids
+
+def get_dashboard_metrics(client_id=None):
+    """
+    Returns all dashboard counters as a plain dict (JSON-serializable).
+    Shared by DashboardView and DashboardConsumer so both read the same
+    numbers from one aggregated query.
+    """
+    return get_task_queryset(client_id).dashboard_metrics(days=DUE_SOON_DAYS)
+
+async def aget_dashboard_metrics(client_id=None):
+    """Async counterpart of get_dashboard_metrics(), for async views and consumers."""
+    return await get_task_queryset(client_id).adashboard_metrics(days=DUE_SOON_DAYS)
+
+# In-flight snapshot computations of this process: snapshot key -> asyncio task.
+_snapshot_tasks = {}
+
+def get_dashboard_snapshot_key(client_id=None, generation=None):
+    """
+    Cache key of a scope's shared metrics snapshot. 'generation' tells reload
+    rounds apart (see broadcast_dashboard_metrics), so a reload never reuses
+    a snapshot taken before the change that caused it.
+    """
+    return f'dashboard:snapshot:{get_dashboard_group_name(client_id)}:{generation or ""}'
+
+def set_dashboard_snapshot(metrics, client_id=None, generation=None):
+    """Shares a freshly computed snapshot with the dashboards connecting within the broadcast window."""
+    cache.set(get_dashboard_snapshot_key(client_id, generation), metrics, dashboard_dispatcher.window)
+
+async def aget_dashboard_snapshot(client_id=None, generation=None):
+    """
+    Metrics of a dashboard scope, shared by every dashboard of the scope that
+    connects (or reloads) within DASHBOARD_BROADCAST_WINDOW: read from the
+    cache, where broadcasts also leave theirs, or computed once per process
+    however many sockets ask at the same time.
+    """
+    key = get_dashboard_snapshot_key(client_id, generation)
+    metrics = await cache.aget(key)
+    if metrics is not None:
+        return metrics
+    loop = asyncio.get_running_loop()
+    task = _snapshot_tasks.get(key)
+    if task is None or task.get_loop() is not loop:
+        task = loop.create_task(_acompute_dashboard_snapshot(key, client_id))
+        _snapshot_tasks[key] = task
+        task.add_done_callback(lambda done: _snapshot_tasks.pop(key, None) if _snapshot_tasks.get(key) is done else None)
+    return await asyncio.shield(task)
+
+async def _acompute_dashboard_snapshot(key, client_id):
+    async with areleasing_connections():
+        metrics = await aget_dashboard_metrics(client_id)
+    # add(), not set(): a broadcast that stored a newer snapshot meanwhile wins.
+    await cache.aadd(key, metrics, dashboard_dispatcher.window)
+    return metrics
+
+def serialize_dashboard_payload(metrics, rows=None, reload=False):
+    """
+    Serializes a metrics snapshot into the exact text frame sent to browsers,
+    optionally with section row changes (or a request to reload the sections).
+    """
+    message = {
+        'type': 'dashboard_metrics',
+        'data': metrics,
+    }
+    if rows:
+        message['rows'] = rows
+    if reload:
+        message['reload'] = True
+    return json.dumps(message)
+
+def build_dashboard_payload(metrics=None, rows=None, reload=False, client_id=None):
+    """Dashboard text frame; the metrics are computed for 'client_id' when not given."""
+    if metrics is None:
+        metrics = get_dashboard_metrics(client_id)
+    return serialize_dashboard_payload(metrics, rows, reload)
+
+async def abuild_dashboard_payload(reload=False, client_id=None):
+    """Async counterpart of build_dashboard_payload(), computing fresh metrics."""
+    return serialize_dashboard_payload(await aget_dashboard_metrics(client_id), reload=reload)
+
+@instrument_queries('broadcast_dashboard_metrics')
+def broadcast_dashboard_metrics(changes=None):
+    """
+    Computes the metrics snapshot and the section row changes once per affected
+    scope and fans the ready-made payloads out to those scopes' groups only:
+    the atelier-wide group and the groups of the clients whose tasks changed.
+    Consumers only forward them, so the database load of a change stays
+    constant no matter how many dashboards are open, and a change is never
+    sent to dashboards it cannot affect.
+    """
+    from channels.layers import get_channel_layer
+    from asgiref.sync import async_to_sync
+
+    channel_layer = get_channel_layer()
+    group_send = async_to_sync(channel_layer.group_send)
+
+    def send(client_id, rows):
+        metrics = get_dashboard_metrics(client_id)
+        set_dashboard_snapshot(metrics, client_id) # Dashboards connecting meanwhile reuse it
+        group_send(
+            get_dashboard_group_name(client_id),
+            {
+                'type': 'dashboard.message', # This calls the dashboard_message method in the consumer
+                'text': build_dashboard_payload(metrics, rows=rows, reload=rows is None),
+            }
+        )
+
+    if changes is not None:
+        changes = dict(changes)
+        reload_client_ids = set().union(*changes.pop(RELOAD_KEY, []))
+        if len(changes) + len(reload_client_ids) > DASHBOARD_MAX_ROW_CHANGES:
+            changes = None # Too many scopes to compute one by one
+    if changes is None:
+        # Untracked (or very large) change: no way to tell which scopes it affects.
+        # Scoped dashboards compute their own update (see DashboardConsumer.dashboard_reload).
+        send(None, None)
+        # A new generation: the scoped dashboards of each client share one fresh snapshot.
+        group_send(DASHBOARD_SCOPED_GROUP_NAME, {'type': 'dashboard.reload', 'generation': uuid.uuid4().hex})
+        return
+
+    rendered = {}
+    send(None, None if reload_client_ids else get_row_changes(changes, rendered=rendered))
+    for client_id in get_affected_client_ids(changes) | reload_client_ids:
+        rows = None if client_id in reload_client_ids else get_row_changes(changes, client_id, rendered)
+        send(client_id, rows)
+
+# Bursts of task changes (bulk admin actions, imports) are merged into one
+# broadcast; see DASHBOARD_BROADCAST_WINDOW.
+dashboard_dispatcher = CoalescingDispatcher(broadcast_dashboard_metrics)
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+
+def populate_task_daily_stats(apps, schema_editor):
+    """Initial fill of the rollup (same rules as TaskDailyStats.objects.rebuild())."""
+    Task = apps.get_model('tasks', 'Task')
+    TaskDailyStats = apps.get_model('tasks', 'TaskDailyStats')
+    stats_day = TruncDate(
+        models.Case(
+            models.When(status='completed', completed_at__isnull=False, then=models.F('completed_at')),
+            default=models.F('created_at'),
+        )
+    )
+    rows = (
+        Task.objects.order_by()
+        .annotate(stats_day=stats_day)
+        .values('stats_day', 'client_id', 'status')
+        .annotate(n=models.Count('pk'))
+    )
+    TaskDailyStats.objects.bulk_create(
+        (
+            TaskDailyStats(day=row['stats_day'], client_id=row['client_id'], status=row['status'], task_count=row['n'])
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0002_client_client_name_idx'),
+        ('tasks', '0002_task_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='Local completion date for completed tasks, creation date otherwise.')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('on_hold', 'On Hold'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('task_count', models.IntegerField(default=0)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_task_stats', to='clients.client')),
+            ],
+            options={
+                'verbose_name': 'Daily task statistics',
+                'verbose_name_plural': 'Daily task statistics',
+                'ordering': ['day'],
+                'indexes': [models.Index(fields=['status', 'day'], name='task_stats_status_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'client', 'status'), name='task_daily_stats_bucket_unique')],
+            },
+        ),
+        migrations.RunPython(populate_task_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+import atelier_management.search
+from atelier_management.search import SearchIndex
+
+# Frozen copy of tasks.models.TASK_SEARCH_INDEX at the time of this migration.
+TASK_SEARCH_INDEX = SearchIndex('tasks_task', [('title', 'A'), ('description', 'B')])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_daily_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(TASK_SEARCH_INDEX.create, TASK_SEARCH_INDEX.drop),
+        migrations.CreateModel(
+            name='TaskSearchEntry',
+            fields=[
+                ('task', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='tasks.task')),
+                ('document', atelier_management.search.SearchDocumentField(db_column='tasks_task_fts')),
+            ],
+            options={
+                'db_table': 'tasks_task_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:15
+
+from django.db import migrations, models
+
+
+def populate_task_daily_totals(apps, schema_editor):
+    """Initial fill from the per-client rollup (same as TaskDailyStats.objects.rebuild())."""
+    TaskDailyStats = apps.get_model('tasks', 'TaskDailyStats')
+    TaskDailyTotals = apps.get_model('tasks', 'TaskDailyTotals')
+    rows = TaskDailyStats.objects.order_by().values('day', 'status').annotate(n=models.Sum('task_count'))
+    TaskDailyTotals.objects.bulk_create(
+        (TaskDailyTotals(day=row['day'], status=row['status'], task_count=row['n']) for row in rows.iterator()),
+        batch_size=1000,
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskDailyTotals',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='Local completion date for completed tasks, creation date otherwise.')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('on_hold', 'On Hold'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('task_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Daily task totals',
+                'verbose_name_plural': 'Daily task totals',
+                'ordering': ['day'],
+                'constraints': [models.UniqueConstraint(fields=('status', 'day'), name='task_daily_totals_bucket_unique')],
+            },
+        ),
+        migrations.RunPython(populate_task_daily_totals, migrations.RunPython.noop),
+    ]
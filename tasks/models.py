@@ -1,6 +1,14 @@
-from django.db import models
+from django.db import models, connections, transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
 from django.utils import timezone
-from clients.models import Client # Import the Client model
+from atelier_management.fragments import invalidate_fragments
+from atelier_management.search import SearchDocumentField, SearchIndex, parse_terms
+from atelier_management.tracking import FieldTrackerMixin
+from clients.models import CLIENT_SEARCH_INDEX, Client # Import the Client model
+from .periods import period_bounds
+from .signals import tasks_transitioned
+from .versions import invalidate_task_list
 
 # Strategy Pattern (Implicit): Using different status choices to alter behavior.
 class TaskStatus(models.TextChoices):
@@ -16,48 +24,241 @@ class TaskStatus(models.TextChoices):
     COMPLETED = 'completed', 'Completed'
     CANCELLED = 'cancelled', 'Cancelled'
 
+# Statuses for which a task still counts as open work (deadline-sensitive).
+OPEN_STATUSES = [TaskStatus.PENDING, TaskStatus.IN_PROGRESS, TaskStatus.ON_HOLD]
+
+class LiteralIn(models.lookups.In):
+    """
+    IN lookup that writes its (constant) values into the SQL instead of binding
+    them. SQLite only uses a partial index when the query repeats the index's
+    condition literally, and a bound parameter never matches it.
+    Only for values defined in code, never for user input.
+    """
+    def process_rhs(self, compiler, connection):
+        sql, params = super().process_rhs(compiler, connection)
+        return sql % tuple("'%s'" % str(value).replace("'", "''") for value in params), ()
+
+def stats_bucket(status, client_id, created_at, completed_at):
+    """
+    Rollup bucket of a task: completed tasks are dated by their (local)
+    completion day, every other task by its creation day.
+    """
+    timestamp = completed_at if status == TaskStatus.COMPLETED and completed_at else created_at
+    return (timezone.localdate(timestamp), client_id, status)
+
+# Full-text index over the task's own text (created by migration 0004_task_search).
+TASK_SEARCH_INDEX = SearchIndex('tasks_task', [('title', 'A'), ('description', 'B')])
+
+# SQL equivalent of stats_bucket()'s day, used to (re)build rollups in bulk.
+STATS_DAY = models.functions.TruncDate(
+    models.Case(
+        models.When(status=TaskStatus.COMPLETED, completed_at__isnull=False, then=models.F('completed_at')),
+        default=models.F('created_at'),
+    )
+)
+
 class TaskQuerySet(models.QuerySet):
     """
     Custom QuerySet for Task model.
     Extends default manager with specific business logic queries.
     This follows the Repository Pattern idea of encapsulating query logic.
     """
+    # Predicates are exposed as Q objects so they can be reused both as plain
+    # filters and as conditional aggregates (see dashboard_metrics()).
+    @staticmethod
+    def open_q():
+        """Q for open tasks, spelled exactly like task_open_deadline_idx's condition."""
+        return models.Q(LiteralIn(models.F('status'), OPEN_STATUSES))
+
+    @classmethod
+    def near_deadline_q(cls, days=3, today=None):
+        """Q for open tasks due between today and today + 'days' (inclusive)."""
+        today = today or timezone.localdate()
+        return cls.open_q() & models.Q(
+            deadline__gte=today,
+            deadline__lte=today + timezone.timedelta(days=days),
+        )
+
+    @classmethod
+    def overdue_q(cls, today=None):
+        """Q for open tasks whose deadline has already passed."""
+        today = today or timezone.localdate()
+        return cls.open_q() & models.Q(deadline__lt=today)
+
+    @staticmethod
+    def completed_between_q(start, end):
+        """Q for tasks completed in the half-open range [start, end)."""
+        return models.Q(status=TaskStatus.COMPLETED, completed_at__gte=start, completed_at__lt=end)
+
+    @classmethod
+    def completed_this_month_q(cls, now=None):
+        """Q for tasks completed in the current (local) month, as an index-friendly range."""
+        return cls.completed_between_q(*period_bounds('month', timezone.localdate(now)))
+
+    def with_deadline_flags(self, days=3, today=None):
+        """
+        Annotates 'overdue' and 'due_soon', the is_overdue / is_due_soon
+        properties computed in SQL, e.g. to sort on them.
+        """
+        def flag(q):
+            return models.Case(models.When(q, then=True), default=False, output_field=models.BooleanField())
+        return self.annotate(
+            overdue=flag(self.overdue_q(today)),
+            due_soon=flag(self.near_deadline_q(days=days, today=today)),
+        )
+
     def get_tasks_near_deadline(self, days=3):
         """Returns tasks that are not completed/cancelled and are due within 'days'."""
-        today = timezone.localdate()
-        due_date_limit = today + timezone.timedelta(days=days)
-        return self.filter(
-            deadline__gte=today,
-            deadline__lte=due_date_limit,
-            status__in=[TaskStatus.PENDING, TaskStatus.IN_PROGRESS, TaskStatus.ON_HOLD]
-        ).order_by('deadline')
+        return self.filter(self.near_deadline_q(days=days)).order_by('deadline')
 
     def get_overdue_tasks(self):
         """Returns tasks that are not completed/cancelled and are past their deadline."""
-        today = timezone.localdate()
-        return self.filter(
-            deadline__lt=today,
-            status__in=[TaskStatus.PENDING, TaskStatus.IN_PROGRESS, TaskStatus.ON_HOLD]
-        ).order_by('deadline')
+        return self.filter(self.overdue_q()).order_by('deadline')
 
     def get_active_tasks(self):
-        """Returns tasks that are not completed or cancelled."""
-        return self.exclude(status__in=[TaskStatus.COMPLETED, TaskStatus.CANCELLED])
+        """Returns tasks that are not completed or cancelled, soonest deadline first."""
+        # Walks task_open_deadline_idx, which holds only the open tasks.
+        return self.filter(self.open_q()).order_by('deadline')
 
     def get_completed_tasks_this_month(self):
         """Returns tasks completed in the current month."""
-        now = timezone.now()
+        return self.filter(self.completed_this_month_q())
+
+    def completed_between(self, start, end):
+        """Returns tasks completed in [start, end) (aware datetimes, see tasks.periods)."""
+        return self.filter(self.completed_between_q(start, end))
+
+    def completed_in_period(self, period='month', day=None):
+        """Returns tasks completed in the local day/week/month/year containing 'day'."""
+        return self.completed_between(*period_bounds(period, day))
+
+    def completion_report(self, start, end, period='month'):
+        """
+        Number of tasks completed per local day/week/month/year within [start, end).
+        The WHERE clause stays a plain range on completed_at; truncation is only
+        applied for grouping. Yields dicts {'period': <aware datetime>, 'count': n}.
+        """
+        trunc = {
+            'day': models.functions.TruncDay,
+            'week': models.functions.TruncWeek,
+            'month': models.functions.TruncMonth,
+            'year': models.functions.TruncYear,
+        }[period]
+        return (
+            self.completed_between(start, end)
+            .annotate(period=trunc('completed_at'))
+            .values('period')
+            .annotate(count=models.Count('pk'))
+            .order_by('period')
+        )
+
+    def search(self, query):
+        """
+        Tasks matching every word of 'query' (word prefixes) in their title or
+        description, or whose client matches it (name, email, phone number: the
+        client index), annotated with 'search_rank' (higher is more relevant,
+        title matches first, client-only matches last). An empty query returns
+        the queryset unfiltered, with rank 0.
+        """
+        terms = parse_terms(query)
+        if not terms:
+            return self.annotate(search_rank=models.Value(0.0, output_field=models.FloatField()))
+        connection = connections[self.db]
+        clients = Client.objects.using(self.db).filter(CLIENT_SEARCH_INDEX.match(terms, connection)).values('pk')
         return self.filter(
-            status=TaskStatus.COMPLETED,
-            completed_at__year=now.year,
-            completed_at__month=now.month
+            TASK_SEARCH_INDEX.match_pks(terms, connection) | models.Q(client_id__in=clients)
+        ).annotate(
+            search_rank=TASK_SEARCH_INDEX.rank_or_zero(terms, connection),
         )
 
-class Task(models.Model):
+    # Bulk writes skip the model signals, so they bump the task list version themselves.
+    def update(self, **kwargs):
+        updated = super().update(**kwargs)
+        if updated:
+            transaction.on_commit(invalidate_task_list, using=self.db)
+        return updated
+
+    def bulk_create(self, objs, *args, **kwargs):
+        created = super().bulk_create(objs, *args, **kwargs)
+        if created:
+            transaction.on_commit(invalidate_task_list, using=self.db)
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        updated = super().bulk_update(objs, fields, *args, **kwargs)
+        if updated:
+            transaction.on_commit(invalidate_task_list, using=self.db)
+        return updated
+
+    def transition_status(self, new_status):
+        """
+        Moves every task in the queryset to 'new_status' with a single set-based
+        UPDATE, applying the same completed_at semantics as Task.save():
+        tasks entering COMPLETED get stamped, tasks leaving it are cleared.
+        Sends one tasks_transitioned signal instead of a post_save per row.
+        Returns the number of tasks whose status actually changed.
+        """
+        now = timezone.now()
+        changing = self.exclude(status=new_status)
+        if new_status == TaskStatus.COMPLETED:
+            completed_at = now
+        else:
+            completed_at = models.Case(
+                models.When(status=TaskStatus.COMPLETED, then=models.Value(None, output_field=models.DateTimeField())),
+                default=models.F('completed_at'),
+            )
+        with transaction.atomic(using=self.db):
+            client_ids = TaskDailyStats.objects.using(self.db).apply_transition(changing, new_status, now)
+            updated = changing.update(status=new_status, completed_at=completed_at, updated_at=now)
+        if updated:
+            tasks_transitioned.send(sender=self.model, new_status=new_status, count=updated, client_ids=client_ids)
+        return updated
+
+    def dashboard_metrics(self, days=3):
+        """
+        Computes every dashboard counter in a single query, instead of one
+        round trip per metric. Each counter is its own scalar subquery, so each
+        is answered from the index that serves its predicate (the open-task
+        partial index, or the status indexes) rather than by scanning tasks_task.
+        """
+        row = self._dashboard_metrics_query(days).first()
+        return row or self._empty_dashboard_metrics()
+
+    async def adashboard_metrics(self, days=3):
+        """Async counterpart of dashboard_metrics() (the same single query)."""
+        row = await self._dashboard_metrics_query(days).afirst()
+        return row or self._empty_dashboard_metrics()
+
+    def _dashboard_metrics_counts(self, days):
+        return {
+            'overdue_count': self.overdue_q(),
+            'due_soon_count': self.near_deadline_q(days=days),
+            'in_progress_count': models.Q(status=TaskStatus.IN_PROGRESS),
+            'pending_count': models.Q(status=TaskStatus.PENDING),
+            'completed_this_month_count': self.completed_this_month_q(),
+        }
+
+    def _empty_dashboard_metrics(self):
+        return dict.fromkeys(self._dashboard_metrics_counts(days=0), 0)
+
+    def _dashboard_metrics_query(self, days):
+        def count(q):
+            matching = self.filter(q).order_by().values(
+                count=models.Func('pk', function='COUNT', output_field=models.IntegerField()),
+            )
+            return models.Subquery(matching)
+        counts = {name: count(q) for name, q in self._dashboard_metrics_counts(days).items()}
+        # The subqueries are uncorrelated: any one row carries all of them (none: no tasks at all).
+        return self.order_by().annotate(**counts).values(*counts)
+
+class Task(FieldTrackerMixin, models.Model):
     """
     Represents a work task for the atelier.
     Adheres to Single Responsibility Principle (SRP) for task data.
+    Loaded field values are tracked in memory, so saves only write changed columns.
     """
+    save_changed_fields_only = True
+
     client = models.ForeignKey(
         Client,
         on_delete=models.CASCADE, # If client is deleted, tasks are deleted.
@@ -93,6 +294,20 @@ class Task(models.Model):
         verbose_name = "Task"
         verbose_name_plural = "Tasks"
         ordering = ['-created_at'] # Order by most recent first
+        indexes = [
+            # Overdue / due soon / active: only open tasks are ever queried by deadline.
+            models.Index(
+                fields=['deadline'],
+                condition=models.Q(status__in=OPEN_STATUSES),
+                name='task_open_deadline_idx',
+            ),
+            # Completed-in-period reports.
+            models.Index(fields=['status', 'completed_at'], name='task_status_completed_idx'),
+            # Task list: default ordering / keyset pagination, and its status and client filters.
+            models.Index(fields=['-created_at', '-id'], name='task_created_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='task_status_created_idx'),
+            models.Index(fields=['client', '-created_at', '-id'], name='task_client_created_idx'),
+        ]
 
     def __str__(self):
         return f"Task: {self.title} for {self.client.get_full_name()} ({self.status})"
@@ -102,15 +317,41 @@ class Task(models.Model):
         Override save method to set completed_at when status changes to COMPLETED.
         This demonstrates a simple application of the Observer pattern (implicitly,
         as the model 'observes' its own status change).
+        The previous status comes from the in-memory snapshot taken when the
+        instance was loaded, so no extra SELECT is needed.
         """
         if self.pk: # Only on existing instances
-            original = Task.objects.get(pk=self.pk)
-            if original.status != TaskStatus.COMPLETED and self.status == TaskStatus.COMPLETED:
+            original_status = self.get_original_status()
+            completed_at = self.completed_at
+            if original_status is None:
+                pass # Row does not exist yet
+            elif original_status != TaskStatus.COMPLETED and self.status == TaskStatus.COMPLETED:
                 self.completed_at = timezone.now()
-            elif original.status == TaskStatus.COMPLETED and self.status != TaskStatus.COMPLETED:
+            elif original_status == TaskStatus.COMPLETED and self.status != TaskStatus.COMPLETED:
                 self.completed_at = None # If status changes from completed, clear completion date
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and self.completed_at != completed_at:
+                kwargs['update_fields'] = {*update_fields, 'completed_at'}
         super().save(*args, **kwargs)
 
+    def get_original_status(self):
+        """
+        Returns the status currently stored in the database.
+        Read from the loaded-values snapshot; only instances that were never
+        loaded from the database (e.g. built with an explicit pk) need a query.
+        """
+        if not self._state.adding and 'status' in getattr(self, '_loaded_values', {}):
+            return self.get_loaded_value('status')
+        return Task.objects.filter(pk=self.pk).values_list('status', flat=True).first()
+
+    def get_stats_bucket(self, original=False):
+        """
+        The (day, client_id, status) TaskDailyStats bucket this task is counted in.
+        With original=True it is computed from the values loaded from the database.
+        """
+        get = self.get_loaded_value if original else lambda attname: getattr(self, attname)
+        return stats_bucket(get('status'), get('client_id'), get('created_at'), get('completed_at'))
+
     @property
     def is_overdue(self):
         """Checks if the task is overdue."""
@@ -124,4 +365,273 @@ class Task(models.Model):
         if self.deadline and self.status not in [TaskStatus.COMPLETED, TaskStatus.CANCELLED]:
             return timezone.localdate() <= self.deadline <= (timezone.localdate() + timezone.timedelta(days=3))
         return False
-    
\ No newline at end of file
+    
+
+class TaskSearchEntry(models.Model):
+    """
+    Row of the SQLite FTS5 index of tasks (see TASK_SEARCH_INDEX), joined by
+    Task.objects.search() for matching and bm25() ranking. Unmanaged: the table
+    and its triggers are created by migration 0004_task_search.
+    """
+    task = models.OneToOneField(
+        Task, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid',
+        db_constraint=False, related_name='search_entry',
+    )
+    document = SearchDocumentField(db_column='tasks_task_fts')
+
+    class Meta:
+        managed = False
+        db_table = 'tasks_task_fts'
+
+class TaskRollupQuerySet(models.QuerySet):
+    """
+    Reads and counter maintenance shared by the task rollups, whose rows are
+    counters keyed by the model's 'bucket_fields' (a tuple per bucket).
+    """
+    def apply_deltas(self, deltas):
+        """
+        Adds {bucket: delta} to the rollup in a fixed number of statements:
+        missing buckets receiving tasks are inserted first, then every counter
+        is incremented in one batched UPDATE.
+        """
+        deltas = {bucket: delta for bucket, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        fields = [self.model._meta.get_field(name) for name in self.model.bucket_fields]
+        self.bulk_create(
+            [
+                self.model(**{field.attname: value for field, value in zip(fields, bucket)}, task_count=0)
+                for bucket, delta in deltas.items() if delta > 0
+            ],
+            ignore_conflicts=True,
+        )
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        sql = (
+            f"UPDATE {qn(self.model._meta.db_table)} SET {qn('task_count')} = {qn('task_count')} + %s "
+            f"WHERE {' AND '.join(f'{qn(field.column)} = %s' for field in fields)}"
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, [
+                (delta, *(field.get_db_prep_value(value, connection) for field, value in zip(fields, bucket)))
+                for bucket, delta in deltas.items()
+            ])
+
+    def completed_count(self, start_day, end_day):
+        """Tasks completed between two local dates, half-open [start_day, end_day)."""
+        return self.filter(
+            status=TaskStatus.COMPLETED, day__gte=start_day, day__lt=end_day,
+        ).aggregate(total=models.functions.Coalesce(models.Sum('task_count'), 0))['total']
+
+    def completion_report(self, start_day, end_day, period='month'):
+        """
+        Completed tasks per week/month/year between two local dates, read from
+        the pre-aggregated rows. Yields dicts {'period': <date>, 'count': n}.
+        """
+        trunc = {
+            'day': models.functions.TruncDay,
+            'week': models.functions.TruncWeek,
+            'month': models.functions.TruncMonth,
+            'year': models.functions.TruncYear,
+        }[period]
+        return (
+            self.filter(status=TaskStatus.COMPLETED, day__gte=start_day, day__lt=end_day, task_count__gt=0)
+            .annotate(period=trunc('day'))
+            .values('period')
+            .annotate(count=models.Sum('task_count'))
+            .order_by('period')
+        )
+
+    def status_totals(self):
+        """Current number of tasks per status: {status: count}."""
+        # Buckets emptied by moves stay as zero rows; rebuild() doesn't write them.
+        return dict(
+            self.filter(task_count__gt=0).values_list('status').annotate(total=models.Sum('task_count')).order_by()
+        )
+
+class TaskDailyStatsQuerySet(TaskRollupQuerySet):
+    """
+    Reads and incremental maintenance of the per-day task rollups: every change
+    to the per-client rows is mirrored into the atelier-wide TaskDailyTotals.
+    """
+    def apply_deltas(self, deltas):
+        """Adds {(day, client_id, status): delta} to both rollups."""
+        super().apply_deltas(deltas)
+        totals = {}
+        for (day, client_id, status), delta in deltas.items():
+            totals[day, status] = totals.get((day, status), 0) + delta
+        TaskDailyTotals.objects.using(self.db).apply_deltas(totals)
+
+    def move(self, old_bucket, new_bucket):
+        """Moves one task from 'old_bucket' to 'new_bucket' (either may be None)."""
+        if old_bucket == new_bucket:
+            return
+        deltas = {}
+        if old_bucket is not None:
+            deltas[old_bucket] = -1
+        if new_bucket is not None:
+            deltas[new_bucket] = 1
+        self.apply_deltas(deltas)
+
+    def apply_transition(self, tasks, new_status, now):
+        """
+        Rollup side of TaskQuerySet.transition_status(): one grouped query over
+        the tasks about to change, then a batched move of their counts.
+        Must run before the UPDATE, in the same transaction.
+        Returns the ids of the clients whose tasks change.
+        """
+        groups = (
+            tasks.order_by()
+            .annotate(stats_day=STATS_DAY, created_day=models.functions.TruncDate('created_at'))
+            .values('stats_day', 'created_day', 'client_id', 'status')
+            .annotate(n=models.Count('pk'))
+        )
+        deltas = {}
+        for group in groups:
+            old_bucket = (group['stats_day'], group['client_id'], group['status'])
+            new_day = timezone.localdate(now) if new_status == TaskStatus.COMPLETED else group['created_day']
+            new_bucket = (new_day, group['client_id'], new_status)
+            deltas[old_bucket] = deltas.get(old_bucket, 0) - group['n']
+            deltas[new_bucket] = deltas.get(new_bucket, 0) + group['n']
+        self.apply_deltas(deltas)
+        return {client_id for _, client_id, _ in deltas}
+
+    def rebuild(self):
+        """
+        Recomputes both rollups from tasks_task (the totals from the fresh
+        per-client rows). Returns the number of per-client rows written.
+        """
+        with transaction.atomic(using=self.db):
+            self.all().delete()
+            rows = (
+                Task.objects.using(self.db).order_by()
+                .annotate(stats_day=STATS_DAY)
+                .values('stats_day', 'client_id', 'status')
+                .annotate(n=models.Count('pk'))
+            )
+            created = self.bulk_create(
+                (
+                    TaskDailyStats(day=row['stats_day'], client_id=row['client_id'], status=row['status'], task_count=row['n'])
+                    for row in rows.iterator()
+                ),
+                batch_size=1000,
+            )
+            totals = TaskDailyTotals.objects.using(self.db)
+            totals.all().delete()
+            totals.bulk_create(
+                (
+                    TaskDailyTotals(day=row['day'], status=row['status'], task_count=row['n'])
+                    for row in self.order_by().values('day', 'status').annotate(n=models.Sum('task_count')).iterator()
+                ),
+                batch_size=1000,
+            )
+        return len(created)
+
+class TaskDailyStats(models.Model):
+    """
+    Pre-aggregated task counts per local day, client and status.
+    Every task is counted exactly once, in the bucket of its current status,
+    dated by its completion day (completed tasks) or creation day (others).
+    Maintained incrementally from task changes; rebuild with
+    `manage.py rebuild_task_stats`. Reports scoped to one client read it;
+    atelier-wide ones read TaskDailyTotals.
+    """
+    day = models.DateField(help_text="Local completion date for completed tasks, creation date otherwise.")
+    client = models.ForeignKey(
+        Client,
+        on_delete=models.CASCADE,
+        related_name='daily_task_stats',
+    )
+    status = models.CharField(max_length=20, choices=TaskStatus.choices)
+    task_count = models.IntegerField(default=0)
+
+    objects = TaskDailyStatsQuerySet.as_manager()
+
+    bucket_fields = ('day', 'client', 'status')
+
+    class Meta:
+        verbose_name = "Daily task statistics"
+        verbose_name_plural = "Daily task statistics"
+        ordering = ['day']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'client', 'status'], name='task_daily_stats_bucket_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'day'], name='task_stats_status_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.get_status_display()}: {self.task_count}"
+
+class TaskDailyTotals(models.Model):
+    """
+    Atelier-wide task counts per local day and status: TaskDailyStats summed
+    over clients, so an atelier-wide report reads at most one row per day and
+    status however many clients there are. Kept in step by
+    TaskDailyStats.objects (apply_deltas() and rebuild()).
+    """
+    day = models.DateField(help_text="Local completion date for completed tasks, creation date otherwise.")
+    status = models.CharField(max_length=20, choices=TaskStatus.choices)
+    task_count = models.IntegerField(default=0)
+
+    objects = TaskRollupQuerySet.as_manager()
+
+    bucket_fields = ('day', 'status')
+
+    class Meta:
+        verbose_name = "Daily task totals"
+        verbose_name_plural = "Daily task totals"
+        ordering = ['day']
+        constraints = [
+            # Also the index of the reports' status + day range.
+            models.UniqueConstraint(fields=['status', 'day'], name='task_daily_totals_bucket_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.get_status_display()}: {self.task_count}"
+
+# Signal receivers keeping TaskDailyStats in sync with individual task saves/deletes
+STATS_BUCKET_FIELDS = {'status', 'client', 'client_id', 'created_at', 'completed_at'}
+
+def _affects_stats_bucket(update_fields):
+    return update_fields is None or bool(STATS_BUCKET_FIELDS & set(update_fields))
+
+@receiver(pre_save, sender=Task)
+def remember_task_stats_bucket(sender, instance, **kwargs):
+    """
+    Remembers the rollup bucket the task is counted in before this save.
+    Uses the loaded-values snapshot; only instances not loaded from the
+    database need to read their row (e.g. built with an explicit pk, which
+    may well exist: save() then UPDATEs it).
+    """
+    if not _affects_stats_bucket(kwargs.get('update_fields')):
+        return
+    if instance._state.adding and instance.pk is None:
+        instance._previous_stats_bucket = None
+    elif not instance._state.adding and all(name in getattr(instance, '_loaded_values', {}) for name in ('status', 'client_id', 'created_at', 'completed_at')):
+        instance._previous_stats_bucket = instance.get_stats_bucket(original=True)
+    else:
+        row = Task.objects.filter(pk=instance.pk).values('status', 'client_id', 'created_at', 'completed_at').first()
+        instance._previous_stats_bucket = stats_bucket(**row) if row else None
+
+@receiver(post_save, sender=Task)
+def update_task_stats_on_save(sender, instance, **kwargs):
+    """Moves the task between rollup buckets (no query when the bucket is unchanged)."""
+    if not _affects_stats_bucket(kwargs.get('update_fields')):
+        return
+    TaskDailyStats.objects.move(getattr(instance, '_previous_stats_bucket', None), instance.get_stats_bucket())
+
+@receiver(post_delete, sender=Task)
+def update_task_stats_on_delete(sender, instance, **kwargs):
+    TaskDailyStats.objects.move(instance.get_stats_bucket(), None)
+
+# Cached template fragments ({% fragmentcache %})
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_fragments(sender, instance, **kwargs):
+    """
+    Drops the task's cached row and detail card fragments, and bumps the task
+    list version once the change is committed (see clients.choices).
+    """
+    invalidate_fragments(instance)
+    transaction.on_commit(invalidate_task_list)
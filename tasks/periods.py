@@ -0,0 +1,42 @@
+import datetime
+
+from django.utils import timezone
+
+PERIODS = ('day', 'week', 'month', 'year')
+
+def local_midnight(day):
+    """Aware datetime for 00:00 in the current (local) time zone on 'day'."""
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+def period_start(day, period):
+    """First local date of the day/week (Monday)/month/year containing 'day'."""
+    if period == 'day':
+        return day
+    if period == 'week':
+        return day - datetime.timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    if period == 'year':
+        return day.replace(month=1, day=1)
+    raise ValueError(f"Unknown period {period!r}; expected one of {PERIODS}.")
+
+def next_period_start(day, period):
+    """First local date of the period following the one containing 'day'."""
+    start = period_start(day, period)
+    if period == 'day':
+        return start + datetime.timedelta(days=1)
+    if period == 'week':
+        return start + datetime.timedelta(weeks=1)
+    if period == 'month':
+        return (start + datetime.timedelta(days=32)).replace(day=1)
+    return start.replace(year=start.year + 1)
+
+def period_bounds(period='month', day=None):
+    """
+    Half-open [start, end) aware datetimes of the local period containing 'day'
+    (default: today). Filtering with __gte/__lt on these keeps the lookup a plain
+    range on the column, which an index can serve, unlike __year/__month
+    lookups that compile to per-row timezone-converting EXTRACT expressions.
+    """
+    day = day or timezone.localdate()
+    return local_midnight(period_start(day, period)), local_midnight(next_period_start(day, period))
@@ -0,0 +1,8 @@
+from django.urls import re_path
+
+from .consumers import DashboardConsumer
+
+# WebSocket routes of the tasks app, mounted by atelier_management.asgi.
+websocket_urlpatterns = [
+    re_path(r"ws/dashboard/$", DashboardConsumer.as_asgi()),
+]
@@ -0,0 +1,116 @@
+import asyncio
+import datetime
+import logging
+import uuid
+
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.utils import timezone
+
+from atelier_management.connections import areleasing_connections
+
+from .metrics import DASHBOARD_GROUP_NAME, DASHBOARD_SCOPED_GROUP_NAME, abuild_dashboard_payload
+from .periods import local_midnight
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait past midnight so timezone.localdate() already returns the new day.
+ROLLOVER_GRACE = 1
+
+# How long a worker's claim on a rollover push is remembered (see claim_rollover()).
+ROLLOVER_CLAIM_TIMEOUT = 60 * 60
+
+def seconds_until_next_rollover(now=None):
+    """
+    Seconds until the next local midnight: the only moment at which tasks move
+    between the overdue / due soon buckets (and the month may roll over)
+    without any task being saved.
+    """
+    now = now or timezone.now()
+    tomorrow = timezone.localdate(now) + datetime.timedelta(days=1)
+    # Compare timestamps: subtracting datetimes sharing a tzinfo ignores DST offset changes.
+    return max(local_midnight(tomorrow).timestamp() - now.timestamp(), 0)
+
+class DeadlineRolloverScheduler:
+    """
+    In-process asyncio scheduler pushing one dashboard update at every deadline
+    rollover (local midnight, DST aware). The payload is computed once and fanned
+    out through the channel layer, so open dashboards refresh without polling.
+    One scheduler runs per event loop; see ensure_started(). With several
+    server workers, each runs one, and the first to claim a rollover in the
+    shared cache pushes it.
+    """
+    def __init__(self):
+        self._task = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def ensure_started(self):
+        """Starts the scheduler on the running event loop unless it already runs there (idempotent)."""
+        loop = asyncio.get_running_loop()
+        if self.running and self._task.get_loop() is loop:
+            return
+        self._task = loop.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(seconds_until_next_rollover() + ROLLOVER_GRACE)
+            try:
+                if await self.claim_rollover():
+                    await self.push_update()
+            except Exception:
+                # Keep the schedule alive; the next rollover is tomorrow.
+                logger.exception("Deadline rollover dashboard update failed.")
+
+    async def claim_rollover(self, day=None):
+        """
+        True for the first worker asking to push the rollover of 'day' (today),
+        False for the others. cache.add() is atomic on shared backends (Redis);
+        with a per-process cache every worker pushes, as a single one would.
+        """
+        day = day or timezone.localdate()
+        return await cache.aadd(f'tasks:dashboard-rollover:{day.isoformat()}', True, ROLLOVER_CLAIM_TIMEOUT)
+
+    async def push_update(self):
+        """
+        Computes the atelier-wide metrics once and asks every open dashboard to
+        reload its sections; client-scoped dashboards fetch their scope's metrics.
+        """
+        async with areleasing_connections():
+            payload = await abuild_dashboard_payload(reload=True)
+        channel_layer = get_channel_layer()
+        await channel_layer.group_send(
+            DASHBOARD_GROUP_NAME,
+            {
+                'type': 'dashboard.message', # Forwarded as-is by DashboardConsumer.dashboard_message
+                'text': payload,
+            }
+        )
+        # A new generation: the scoped dashboards of each client share one fresh snapshot.
+        await channel_layer.group_send(DASHBOARD_SCOPED_GROUP_NAME, {'type': 'dashboard.reload', 'generation': uuid.uuid4().hex})
+
+deadline_scheduler = DeadlineRolloverScheduler()
+
+async def lifespan_app(scope, receive, send):
+    """ASGI lifespan handler starting and stopping the scheduler together with the server."""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            deadline_scheduler.ensure_started()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await deadline_scheduler.stop()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
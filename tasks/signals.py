@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+# Sent once after a set-based status change (TaskQuerySet.transition_status),
+# in place of one post_save per row.
+# Arguments: new_status, count (number of tasks whose status changed),
+# client_ids (set of ids of the clients owning those tasks).
+tasks_transitioned = Signal()
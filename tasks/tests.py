@@ -1,4 +1,1196 @@
-from django.test import TestCase
+import asyncio
+import base64
+import io
+import re
+import json
+import datetime
+from unittest import mock
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
-# TODO: Create tests here?!
+from asgiref.sync import async_to_sync
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from atelier_management.changelist import EstimatedCountPaginator
+from atelier_management.connections import configure_connections, release_connections
+from atelier_management.fragments import fragment_key, get_fragment_cache
+from atelier_management.pagination import InvalidCursor, KeysetPaginator
+from atelier_management.queries import arecord_queries
+from atelier_management.testing import QueryBudgetMixin
+from clients.models import Client
+from .consumers import DashboardConsumer
+from .dispatch import CoalescingDispatcher
+from .metrics import (
+    RELOAD_KEY, broadcast_dashboard_metrics, dashboard_dispatcher, get_affected_client_ids,
+    aget_dashboard_snapshot, get_dashboard_group_name, get_dashboard_snapshot_key, get_row_changes,
+    get_section_page_queryset,
+)
+from .models import OPEN_STATUSES, TASK_SEARCH_INDEX, Task, TaskDailyStats, TaskDailyTotals, TaskQuerySet, TaskStatus
+from .periods import period_bounds
+from .scheduler import deadline_scheduler, seconds_until_next_rollover
+from .signals import tasks_transitioned
+from .views import TaskListView
+
+
+class TaskIndexUsageTests(TestCase):
+    """
+    Checks via EXPLAIN that the TaskQuerySet access patterns are served by an
+    index rather than a full scan of tasks_task, on a dataset shaped like a
+    real atelier history (mostly completed tasks, few open ones).
+    """
+    TASK_COUNT = 6000
+
+    @classmethod
+    def setUpTestData(cls):
+        clients = Client.objects.bulk_create(
+            Client(first_name=f"First{i}", last_name=f"Last{i}") for i in range(50)
+        )
+        today = timezone.localdate()
+        now = timezone.now()
+        statuses = [TaskStatus.COMPLETED] * 16 + [TaskStatus.CANCELLED] + [
+            TaskStatus.PENDING, TaskStatus.IN_PROGRESS, TaskStatus.ON_HOLD,
+        ]
+        tasks = []
+        for i in range(cls.TASK_COUNT):
+            status = statuses[i % len(statuses)]
+            tasks.append(Task(
+                client=clients[i % len(clients)],
+                title=f"Task {i}",
+                status=status,
+                deadline=today + datetime.timedelta(days=(i % 720) - 360),
+                completed_at=now - datetime.timedelta(days=i % 1000) if status == TaskStatus.COMPLETED else None,
+            ))
+        Task.objects.bulk_create(tasks, batch_size=1000)
+        cls.client_id = clients[0].pk
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE") # Give the planner real statistics
+
+    def assertUsesIndex(self, queryset, index_name=None):
+        plan = queryset.explain()
+        # SQLite: "SEARCH ... USING [COVERING] INDEX"; PostgreSQL: "Index [Only] Scan" / "Bitmap Index Scan".
+        self.assertRegex(plan, re.compile(r'using (covering )?index|index (only )?scan', re.IGNORECASE), plan)
+        if index_name:
+            self.assertIn(index_name, plan)
+        return plan
+
+    def assertUsesIndexOrder(self, queryset, index_name):
+        """The rows come out of 'index_name' already ordered: no sort step after the scan."""
+        plan = self.assertUsesIndex(queryset, index_name)
+        # SQLite: "USE TEMP B-TREE FOR [RIGHT PART OF] ORDER BY"; PostgreSQL: a "Sort" node.
+        self.assertNotRegex(plan, re.compile(r'temp b-tree for (right part of )?order by|(^|->)\s*(incremental )?sort\b', re.IGNORECASE | re.MULTILINE), plan)
+
+    def test_overdue_tasks_use_index(self):
+        self.assertUsesIndexOrder(Task.objects.get_overdue_tasks(), 'task_open_deadline_idx')
+
+    def test_tasks_near_deadline_use_index(self):
+        self.assertUsesIndexOrder(Task.objects.get_tasks_near_deadline(days=3), 'task_open_deadline_idx')
+
+    def test_active_tasks_use_index(self):
+        self.assertUsesIndexOrder(Task.objects.get_active_tasks(), 'task_open_deadline_idx')
+
+    def test_completed_tasks_this_month_use_index(self):
+        self.assertUsesIndex(Task.objects.get_completed_tasks_this_month(), 'task_status_completed_idx')
+
+    def test_dashboard_metrics_use_index(self):
+        # Each counter subquery is answered from an index; only the one-row outer query reads tasks_task.
+        plan = Task.objects.all()._dashboard_metrics_query(days=3).order_by('pk')[:1].explain()
+        for index_name in ('task_open_deadline_idx', 'task_status_created_idx', 'task_status_completed_idx'):
+            self.assertIn(index_name, plan)
+        self.assertNotRegex(plan, re.compile(r'\bscan u0\b|seq scan on tasks_task u0', re.IGNORECASE), plan)
+
+    def test_dashboard_section_pages_use_index(self):
+        # The page is picked through the section's index; clients are only looked up by pk.
+        for section, index_name in [
+            ('overdue', 'task_open_deadline_idx'),
+            ('due_soon', 'task_open_deadline_idx'),
+            ('in_progress', 'task_status_created_idx'),
+        ]:
+            with self.subTest(section=section):
+                plan = self.assertUsesIndex(get_section_page_queryset(section, 11), index_name)
+                self.assertNotRegex(plan, re.compile(r'scan (table )?"?clients_client', re.IGNORECASE), plan)
+
+    def test_task_list_filters_use_index(self):
+        # The task list's keyset ordering, unfiltered and under each of its filters.
+        ordering = TaskListView.keyset_ordering
+        self.assertUsesIndexOrder(Task.objects.order_by(*ordering)[:10], 'task_created_idx')
+        self.assertUsesIndexOrder(
+            Task.objects.filter(status=TaskStatus.PENDING).order_by(*ordering)[:10], 'task_status_created_idx'
+        )
+        self.assertUsesIndexOrder(
+            Task.objects.filter(client_id=self.client_id).order_by(*ordering)[:10], 'task_client_created_idx'
+        )
+
+
+@override_settings(DASHBOARD_BROADCAST_WINDOW=60) # Flushed explicitly below
+class DashboardRowChangeTests(TestCase):
+    """Row-level dashboard updates derived from the changed tasks."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.client_obj = Client.objects.create(first_name="Ada", last_name="Lovelace")
+        cls.task = Task.objects.create(
+            client=cls.client_obj,
+            title="Hem trousers",
+            deadline=timezone.localdate() + datetime.timedelta(days=1),
+        )
+
+    def collect_changes(self, func):
+        """Runs 'func' and returns the changes the dispatcher merged after commit."""
+        flush_func = mock.Mock(__name__='broadcast_dashboard_metrics')
+        with mock.patch.object(dashboard_dispatcher, 'flush_func', flush_func):
+            with self.captureOnCommitCallbacks(execute=True):
+                func()
+            dashboard_dispatcher.flush()
+        flush_func.assert_called_once()
+        return flush_func.call_args.args[0]
+
+    def rows_by_action(self, rows):
+        return {(row['action'], row['section']) for row in rows}
+
+    def test_status_change_moves_row_between_sections(self):
+        task = Task.objects.get(pk=self.task.pk)
+        task.status = TaskStatus.IN_PROGRESS
+        rows = get_row_changes(self.collect_changes(task.save))
+        self.assertEqual(self.rows_by_action(rows), {
+            ('remove', 'pending'), ('upsert', 'in_progress'), ('upsert', 'due_soon'),
+        })
+        upsert = next(row for row in rows if row['section'] == 'in_progress')
+        self.assertEqual(upsert['id'], f'dashboard-in_progress-task-{task.pk}')
+        self.assertIn('Hem trousers', upsert['html'])
+
+    def test_resave_through_fresh_instance_with_existing_pk(self):
+        overdue = Task.objects.create(
+            client=self.client_obj, title="Let out hem", deadline=timezone.localdate() - datetime.timedelta(days=2),
+        )
+        # Not loaded from the database, but an UPDATE of the existing (overdue, pending) row.
+        resaved = Task(pk=overdue.pk, client=self.client_obj, title="Let out hem", status=TaskStatus.COMPLETED,
+                       deadline=overdue.deadline, created_at=overdue.created_at)
+        rows = get_row_changes(self.collect_changes(resaved.save))
+        self.assertEqual(self.rows_by_action(rows), {('remove', 'overdue'), ('remove', 'pending')})
+
+    def test_burst_of_saves_is_merged_per_task(self):
+        task = Task.objects.get(pk=self.task.pk)
+
+        def complete_in_two_steps():
+            task.status = TaskStatus.IN_PROGRESS
+            task.save()
+            task.status = TaskStatus.COMPLETED
+            task.save()
+
+        rows = get_row_changes(self.collect_changes(complete_in_two_steps))
+        self.assertEqual(self.rows_by_action(rows), {('remove', 'pending'), ('remove', 'due_soon')})
+
+    def test_delete_removes_rows(self):
+        task = Task.objects.get(pk=self.task.pk)
+        rows = get_row_changes(self.collect_changes(task.delete))
+        self.assertEqual(self.rows_by_action(rows), {('remove', 'pending'), ('remove', 'due_soon')})
+
+    def test_bulk_transition_asks_affected_clients_to_reload(self):
+        changes = self.collect_changes(
+            lambda: Task.objects.filter(pk=self.task.pk).transition_status(TaskStatus.IN_PROGRESS)
+        )
+        self.assertEqual(changes, {RELOAD_KEY: [frozenset({self.client_obj.pk})]})
+
+    def test_task_moved_to_another_client_changes_both_scopes(self):
+        other = Client.objects.create(first_name="Charles", last_name="Babbage")
+        task = Task.objects.get(pk=self.task.pk)
+        task.client = other
+        changes = self.collect_changes(task.save)
+        self.assertEqual(get_affected_client_ids(changes), {self.client_obj.pk, other.pk})
+        self.assertEqual(
+            self.rows_by_action(get_row_changes(changes, self.client_obj.pk)),
+            {('remove', 'pending'), ('remove', 'due_soon')},
+        )
+        self.assertEqual(
+            self.rows_by_action(get_row_changes(changes, other.pk)),
+            {('upsert', 'pending'), ('upsert', 'due_soon')},
+        )
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class DeadlineRolloverSchedulerTests(TestCase):
+    def test_next_rollover_is_local_midnight(self):
+        now = datetime.datetime(2025, 6, 1, 23, 0, tzinfo=ZoneInfo('Europe/Kiev'))
+        self.assertEqual(seconds_until_next_rollover(now), 3600)
+
+    def test_next_rollover_across_dst_change(self):
+        # 2025-03-30 has only 23 hours in Europe/Kiev.
+        now = datetime.datetime(2025, 3, 30, 0, 0, tzinfo=ZoneInfo('Europe/Kiev'))
+        self.assertEqual(seconds_until_next_rollover(now), 23 * 3600)
+
+    async def test_push_update_reaches_dashboard_group(self):
+        channel_layer = get_channel_layer()
+        channel_name = await channel_layer.new_channel()
+        await channel_layer.group_add('dashboard_updates', channel_name)
+        await deadline_scheduler.push_update()
+        message = await channel_layer.receive(channel_name)
+        payload = json.loads(message['text'])
+        self.assertEqual(payload['type'], 'dashboard_metrics')
+        self.assertTrue(payload['reload'])
+
+
+class CountingChannelLayer(InMemoryChannelLayer):
+    """In-memory layer counting the messages delivered to channels."""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.delivered = 0
+
+    async def send(self, channel, message):
+        self.delivered += 1
+        await super().send(channel, message)
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'tasks.tests.CountingChannelLayer', 'CONFIG': {'capacity': 10}}})
+class DashboardFanOutTests(TestCase):
+    """
+    Fan-out cost of one task change against the number of open dashboards,
+    most of them scoped to a client: only the atelier-wide dashboards and
+    those of the task's client receive it, however many others are open.
+    """
+    CLIENT_COUNT = 20
+    ATELIER_WIDE = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.clients = Client.objects.bulk_create(
+            Client(first_name=f"First{i}", last_name=f"Last{i}") for i in range(cls.CLIENT_COUNT)
+        )
+        cls.task = Task.objects.create(client=cls.clients[0], title="Take in waist")
+
+    def open_dashboards(self, channel_layer, scoped_count):
+        async def subscribe():
+            for _ in range(self.ATELIER_WIDE):
+                await channel_layer.group_add(get_dashboard_group_name(), await channel_layer.new_channel())
+            for i in range(scoped_count):
+                client_id = self.clients[i % self.CLIENT_COUNT].pk
+                await channel_layer.group_add(get_dashboard_group_name(client_id), await channel_layer.new_channel())
+        async_to_sync(subscribe)()
+
+    def test_fan_out_only_grows_with_subscribers_of_the_changed_client(self):
+        task = Task.objects.select_related('client').get(pk=self.task.pk)
+        task.status = TaskStatus.IN_PROGRESS
+        task.save()
+        changes = {task.pk: [(frozenset({'pending'}), task.client_id, task, False)]}
+        for scoped_count in (20, 200, 1000):
+            with self.subTest(dashboards=scoped_count):
+                channel_layer = get_channel_layer()
+                async_to_sync(channel_layer.flush)() # Drop the previous round's channels and groups
+                channel_layer.delivered = 0
+                self.open_dashboards(channel_layer, scoped_count)
+                # One aggregate per affected scope (atelier-wide + the task's client), whatever the audience.
+                with self.assertNumQueries(2):
+                    broadcast_dashboard_metrics(changes)
+                self.assertEqual(channel_layer.delivered, self.ATELIER_WIDE + scoped_count // self.CLIENT_COUNT)
+
+
+class TaskListQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """TaskListView costs a fixed number of queries, whatever the page size, page or filter."""
+    BUDGET = 4 # Session, user, page rows (client joined in), the selected client
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='secret')
+        clients = Client.objects.bulk_create(
+            Client(first_name=f"First{i}", last_name=f"Last{i}") for i in range(5)
+        )
+        cls.client_id = clients[0].pk
+        Task.objects.bulk_create(
+            Task(client=clients[i % len(clients)], title=f"Task {i}") for i in range(120)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_task_list_within_budget_at_any_page_size(self):
+        url = reverse('task_list')
+        for page_size in (5, 10, 50):
+            with self.subTest(page_size=page_size), mock.patch.object(TaskListView, 'paginate_by', page_size):
+                with self.assertQueryBudget(self.BUDGET, allow_duplicates=False):
+                    response = self.client.get(url)
+                self.assertEqual(len(response.context['tasks']), page_size)
+                with self.assertQueryBudget(self.BUDGET, allow_duplicates=False):
+                    self.client.get(f"{url}?{response.context['next_page_query']}")
+
+    def test_filtered_htmx_task_list_within_budget(self):
+        with self.assertQueryBudget(self.BUDGET, allow_duplicates=False):
+            self.client.get(
+                reverse('task_list'),
+                {'status': TaskStatus.PENDING, 'client': self.client_id},
+                headers={'HX-Request': 'true'},
+            )
+
+    def test_query_instrumentation_headers(self):
+        response = self.client.get(reverse('task_list'))
+        self.assertLessEqual(int(response['X-DB-Query-Count']), self.BUDGET)
+        self.assertEqual(response['X-DB-Duplicate-Queries'], '0')
+        self.assertIn('X-DB-Time-Ms', response)
+
+
+class TaskFragmentCacheTests(TestCase):
+    """Task rows are rendered once per version and shared by the list and the HTMX responses."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='secret')
+        cls.client_obj = Client.objects.create(first_name="Ada", last_name="Lovelace")
+        cls.task = Task.objects.create(client=cls.client_obj, title="Hem trousers")
+
+    def setUp(self):
+        get_fragment_cache().clear()
+        self.client.force_login(self.user)
+
+    def row_key(self, task):
+        return fragment_key('task_row', [task, task.client])
+
+    def test_list_caches_rows(self):
+        self.client.get(reverse('task_list'))
+        self.assertIn('Hem trousers', get_fragment_cache().get(self.row_key(self.task)))
+
+    def test_save_invalidates_and_rerenders_row(self):
+        self.client.get(reverse('task_list'))
+        old_key = self.row_key(self.task)
+        task = Task.objects.get(pk=self.task.pk)
+        task.title = "Take in waist"
+        task.save()
+        self.assertIsNone(get_fragment_cache().get(old_key))
+        response = self.client.get(reverse('task_list'))
+        self.assertContains(response, "Take in waist")
+        self.assertNotContains(response, "Hem trousers")
+
+    def test_client_rename_rerenders_task_rows(self):
+        self.client.get(reverse('task_list'))
+        self.client_obj.last_name = "Byron"
+        self.client_obj.save()
+        self.assertContains(self.client.get(reverse('task_list')), "Ada Byron")
+
+    def test_delete_drops_cached_fragments(self):
+        self.client.get(reverse('task_list'))
+        key = self.row_key(self.task)
+        Task.objects.get(pk=self.task.pk).delete()
+        self.assertIsNone(get_fragment_cache().get(key))
+
+
+@override_settings(
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+    DASHBOARD_BROADCAST_WINDOW=0, # Committed changes broadcast in the test's thread
+)
+class TaskConditionalGetTests(QueryBudgetMixin, TestCase):
+    """Unchanged task pages are answered with 304 Not Modified before any rendering."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='secret')
+        cls.client_obj = Client.objects.create(first_name="Ada", last_name="Lovelace")
+        cls.task = Task.objects.create(client=cls.client_obj, title="Hem trousers")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def revalidate(self, url, response, **kwargs):
+        return self.client.get(url, headers={'If-None-Match': response['ETag']}, **kwargs)
+
+    def test_unchanged_list_is_not_modified(self):
+        url = reverse('task_list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        with self.assertQueryBudget(2): # Session, user; the validators are cached versions
+            revalidated = self.revalidate(url, response)
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], response['ETag'])
+
+    def test_partial_and_page_have_different_etags(self):
+        url = reverse('task_list')
+        page = self.client.get(url)
+        partial = self.client.get(url, headers={'HX-Request': 'true'})
+        self.assertNotEqual(page['ETag'], partial['ETag'])
+        self.assertEqual(self.client.get(url, headers={'HX-Request': 'true', 'If-None-Match': page['ETag']}).status_code, 200)
+
+    def test_changes_invalidate_list(self):
+        url = reverse('task_list')
+        response = self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(client=self.client_obj, title="Take in waist")
+        response = self.client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            task.delete()
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+    def test_bulk_changes_invalidate_list(self):
+        url = reverse('task_list')
+        for change in (
+            lambda: Task.objects.filter(pk=self.task.pk).transition_status(TaskStatus.IN_PROGRESS),
+            lambda: Task.objects.filter(pk=self.task.pk).update(title="Take in waist"),
+            lambda: Task.objects.bulk_create([Task(client=self.client_obj, title="Let out hem")]),
+        ):
+            response = self.client.get(url)
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+    def test_detail_changes_with_task_and_client(self):
+        url = reverse('task_detail', args=[self.task.pk])
+        response = self.client.get(url)
+        self.assertEqual(self.revalidate(url, response).status_code, 304)
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() + datetime.timedelta(seconds=5)):
+            self.client_obj.save()
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+    def test_missing_task_is_still_404(self):
+        self.assertEqual(self.client.get(reverse('task_detail', args=[self.task.pk + 100])).status_code, 404)
+
+    def test_pending_messages_force_full_response(self):
+        url = reverse('task_list')
+        response = self.client.get(url)
+        self.client.post(reverse('task_update_status', args=[self.task.pk]), {'status': self.task.status})
+        Task.objects.filter(pk=self.task.pk).update(updated_at=self.task.updated_at) # Same validators
+        revalidated = self.revalidate(url, response)
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertContains(revalidated, "status updated")
+
+
+class TaskCreateResponseTests(QueryBudgetMixin, TestCase):
+    """HTMX creates answer with the new row only, whatever the size of the table."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='secret')
+        cls.client_obj = Client.objects.create(first_name="Ada", last_name="Lovelace")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def create(self, title, current_url=None):
+        headers = {'HX-Request': 'true'}
+        if current_url:
+            headers['HX-Current-URL'] = f"http://testserver{current_url}"
+        data = {'client': self.client_obj.pk, 'title': title, 'description': '', 'status': TaskStatus.PENDING}
+        return self.client.post(reverse('task_create'), data, headers=headers)
+
+    def test_new_row_is_swapped_out_of_band(self):
+        self.create("Warm-up") # Cached session and user, as in the second measurement
+        with CaptureQueriesContext(connection) as small_table:
+            response = self.create("First")
+        self.assertEqual(response['HX-Reswap'], 'none')
+        self.assertContains(response, 'hx-swap-oob="afterbegin:#task-list-table-body"')
+        self.assertEqual(response.content.decode().count('<tr'), 1)
+        Task.objects.bulk_create(Task(client=self.client_obj, title=f"Task {i}") for i in range(50))
+        with CaptureQueriesContext(connection) as large_table:
+            self.create("Second")
+        self.assertEqual(len(large_table), len(small_table))
+
+    def test_filtered_list_gets_capped_first_page(self):
+        Task.objects.bulk_create(Task(client=self.client_obj, title=f"Task {i}") for i in range(30))
+        response = self.create("New", current_url=f"{reverse('task_list')}?status={TaskStatus.PENDING}&cursor=abc")
+        self.assertNotIn('HX-Reswap', response)
+        self.assertContains(response, 'id="task-list-table-body"')
+        self.assertEqual(len(response.context['tasks']), TaskListView.paginate_by)
+        self.assertEqual(response.context['tasks'][0].title, "New")
+        self.assertIn(f"status={TaskStatus.PENDING}", response.context['next_page_query'])
+
+
+class TaskSearchTests(TestCase):
+    """Full-text search (FTS5 on SQLite): kept in sync by the database, ranked, paginated."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('owner', password='secret')
+        cls.ada = Client.objects.create(first_name="Ada", last_name="Lovelace", email="ada@example.com")
+        cls.grace = Client.objects.create(first_name="Grace", last_name="Hopper")
+        cls.in_title = Task.objects.create(client=cls.grace, title="Hem wedding dress", description="Silk")
+        cls.in_description = Task.objects.create(client=cls.grace, title="Fitting", description="Bring the wedding shoes")
+        cls.for_ada = Task.objects.create(client=cls.ada, title="Take in waist")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_uses_fts5_index(self):
+        self.assertEqual(TASK_SEARCH_INDEX.get_backend(connection), 'sqlite')
+
+    def test_ranks_title_matches_first(self):
+        results = list(Task.objects.search("wedd").order_by('-search_rank'))
+        self.assertEqual(results, [self.in_title, self.in_description])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(list(Task.objects.search("wedding silk")), [self.in_title])
+
+    def test_search_is_a_single_query(self):
+        with self.assertNumQueries(1): # Task and client matches, and the ranks, in subqueries
+            list(Task.objects.search("wedding").order_by('-search_rank'))
+
+    def test_matches_client_names(self):
+        self.assertEqual(list(Task.objects.search("lovelace")), [self.for_ada])
+        self.assertEqual(set(Task.objects.search("grace hop")), {self.in_title, self.in_description})
+
+    def test_client_matches_rank_after_text_matches(self):
+        in_title = Task.objects.create(client=self.grace, title="Hopper jacket")
+        results = list(Task.objects.search("hopper").order_by('-search_rank', 'pk'))
+        self.assertEqual(results, [in_title, self.in_title, self.in_description])
+        self.assertEqual(results[-1].search_rank, 0)
+
+    def test_admin_search_by_client_name(self):
+        response = self.client.get(reverse('admin:tasks_task_changelist'), {'q': 'lovel'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.for_ada])
+
+    def test_list_view_search_by_client_name(self):
+        response = self.client.get(reverse('task_list'), {'q': 'ada'})
+        self.assertEqual(list(response.context['tasks']), [self.for_ada])
+
+    def test_index_follows_set_based_writes(self):
+        Task.objects.filter(pk=self.for_ada.pk).update(title="Shorten sleeves")
+        self.assertEqual(list(Task.objects.search("sleeves")), [self.for_ada])
+        Task.objects.filter(pk=self.in_title.pk).delete()
+        self.assertEqual(list(Task.objects.search("wedding")), [self.in_description])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(list(Task.objects.search('"hem" OR * NEAR(')), [])
+        self.assertEqual(list(Task.objects.search('"hem*')), [self.in_title])
+
+    def test_icontains_fallback_without_index(self):
+        with mock.patch.object(TASK_SEARCH_INDEX, 'get_backend', return_value=None):
+            self.assertEqual(list(Task.objects.search("wedding silk")), [self.in_title])
+
+    def test_list_view_paginates_ranked_results(self):
+        Task.objects.bulk_create(Task(client=self.ada, title=f"Wedding gown {i}") for i in range(12))
+        url = reverse('task_list')
+        response = self.client.get(url, {'q': 'wedding'}, headers={'HX-Request': 'true'})
+        first_page = list(response.context['tasks'])
+        self.assertEqual(len(first_page), TaskListView.paginate_by)
+        second_page = list(self.client.get(f"{url}?{response.context['next_page_query']}").context['tasks'])
+        self.assertEqual(len(first_page) + len(second_page), 14)
+        self.assertFalse(set(first_page) & set(second_page))
+        self.assertEqual(second_page[-1], self.in_description) # Description-only match ranks last
+
+    def test_admin_search(self):
+        response = self.client.get(reverse('admin:tasks_task_changelist'), {'q': 'wedd'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.in_title, self.in_description])
+
+    def test_rebuild_command_restores_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM tasks_task_fts") # Contentless delete of an external content table
+            cursor.execute("DROP TRIGGER tasks_task_fts_ai")
+        call_command('rebuild_search_index', stdout=io.StringIO())
+        Task.objects.create(client=self.ada, title="Wedding veil")
+        self.assertEqual(Task.objects.search("wedding").count(), 3)
+
+
+class TaskListAsyncTests(TestCase):
+    """The task list on the async stack: async ORM page, async validators."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='secret')
+        cls.client_obj = Client.objects.create(first_name="Ada", last_name="Lovelace")
+        Task.objects.bulk_create(Task(client=cls.client_obj, title=f"Task {i}") for i in range(15))
+
+    async def test_pages_and_revalidates(self):
+        await self.async_client.aforce_login(self.user)
+        url = reverse('task_list')
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['tasks']), TaskListView.paginate_by)
+        self.assertEqual(response.context['client_options'], []) # Nothing selected: the picker searches
+        next_page = await self.async_client.get(f"{url}?{response.context['next_page_query']}")
+        self.assertEqual(len(next_page.context['tasks']), 5)
+        revalidated = await self.async_client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(revalidated.status_code, 304)
+
+    async def test_client_filter_renders_only_the_selected_client(self):
+        await self.async_client.aforce_login(self.user)
+        other = await Client.objects.acreate(first_name="Grace", last_name="Hopper")
+        response = await self.async_client.get(reverse('task_list'), {'client': self.client_obj.pk})
+        self.assertEqual(response.context['client_options'], [(self.client_obj.pk, "Ada Lovelace")])
+        self.assertContains(response, f'<option value="{self.client_obj.pk}" selected>Ada Lovelace</option>', html=True)
+        self.assertNotContains(response, other.last_name)
+
+    async def test_invalid_cursor_is_404(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('task_list'), {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+    DASHBOARD_BROADCAST_WINDOW=60,
+)
+class DashboardSnapshotTests(TestCase):
+    """Dashboards of one scope connecting or reloading together share one metrics snapshot."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.client_obj = Client.objects.create(first_name="Ada", last_name="Lovelace")
+        Task.objects.create(client=cls.client_obj, title="Hem trousers")
+
+    def setUp(self):
+        for client_id in (None, self.client_obj.pk):
+            cache.delete(get_dashboard_snapshot_key(client_id))
+
+    async def test_concurrent_connects_share_one_query(self):
+        async with arecord_queries() as recorder:
+            snapshots = await asyncio.gather(*(aget_dashboard_snapshot() for _ in range(20)))
+        self.assertEqual(recorder.count, 1)
+        self.assertEqual(snapshots, [snapshots[0]] * 20)
+        self.assertEqual(snapshots[0]['pending_count'], 1)
+        async with arecord_queries() as recorder:
+            await aget_dashboard_snapshot() # Within the window: from the cache
+        self.assertEqual(recorder.count, 0)
+
+    async def test_reload_generation_is_never_an_older_snapshot(self):
+        await aget_dashboard_snapshot(self.client_obj.pk)
+        await Task.objects.acreate(client=self.client_obj, title="Take in waist")
+        self.assertEqual((await aget_dashboard_snapshot(self.client_obj.pk))['pending_count'], 1) # Shared
+        self.assertEqual((await aget_dashboard_snapshot(self.client_obj.pk, 'next'))['pending_count'], 2)
+
+    def test_broadcast_leaves_its_snapshot(self):
+        Task.objects.create(client=self.client_obj, title="Take in waist")
+        broadcast_dashboard_metrics()
+        with self.assertNumQueries(0):
+            metrics = async_to_sync(aget_dashboard_snapshot)()
+        self.assertEqual(metrics['pending_count'], 2)
+
+
+class AsyncQueryRecordingTests(TestCase):
+    async def test_concurrent_recorders_only_count_their_own_queries(self):
+        async def run(queries):
+            async with arecord_queries() as recorder:
+                for _ in range(queries):
+                    await Task.objects.acount()
+                    await asyncio.sleep(0) # Interleave with the other task
+            return recorder.count
+        self.assertEqual(await asyncio.gather(run(1), run(3)), [1, 3])
+
+
+class AsgiApplicationTests(TestCase):
+    def test_one_application_serves_every_protocol(self):
+        from atelier_management.asgi import application
+        self.assertEqual(set(application.application_mapping), {'http', 'websocket', 'lifespan'})
+
+
+class ConnectionManagementTests(TestCase):
+    POSTGRES = {'ENGINE': 'django.db.backends.postgresql', 'NAME': 'atelier_db', 'OPTIONS': {}}
+
+    def test_pool_is_split_between_workers(self):
+        database = configure_connections(self.POSTGRES, mode='pool', workers=4, budget=80)
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        self.assertEqual(database['OPTIONS']['pool']['max_size'], 20)
+        self.assertEqual(database['OPTIONS']['pool']['min_size'], 2)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+        self.assertNotIn('pool', self.POSTGRES['OPTIONS']) # The input is left untouched
+        many_workers = configure_connections(self.POSTGRES, mode='pool', workers=100, budget=80)
+        self.assertEqual(many_workers['OPTIONS']['pool']['max_size'], 2)
+
+    def test_backends_without_pooling_fall_back_to_per_request(self):
+        database = configure_connections({'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'db.sqlite3'}, mode='pool')
+        self.assertNotIn('pool', database['OPTIONS'])
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+
+    def test_persistent_connections_are_health_checked(self):
+        database = configure_connections(self.POSTGRES, mode='persistent', conn_max_age=30)
+        self.assertEqual(database['CONN_MAX_AGE'], 30)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+        with self.assertRaises(ValueError):
+            configure_connections(self.POSTGRES, mode='bouncer')
+
+    def test_release_skips_connections_in_a_transaction(self):
+        idle, in_transaction = mock.Mock(in_atomic_block=False), mock.Mock(in_atomic_block=True)
+        with mock.patch('atelier_management.connections.connections.all', return_value=[idle, in_transaction]):
+            release_connections()
+        idle.close_if_unusable_or_obsolete.assert_called_once()
+        in_transaction.close_if_unusable_or_obsolete.assert_not_called()
+
+    async def test_consumer_releases_its_connection(self):
+        consumer = DashboardConsumer()
+        consumer.client_id = None
+        await cache.adelete(get_dashboard_snapshot_key()) # Computed, not shared from an earlier test
+        with mock.patch('atelier_management.connections.release_connections') as release:
+            payload = json.loads(await consumer.get_dashboard_payload())
+        self.assertEqual(payload['type'], 'dashboard_metrics')
+        self.assertEqual(release.call_count, 2) # Before and after the queries
+
+    def test_stats_are_staff_only(self):
+        url = reverse('database_stats')
+        self.client.force_login(User.objects.create_user('owner', password='secret'))
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(User.objects.create_user('admin', password='secret', is_staff=True))
+        stats = self.client.get(url).json()
+        self.assertEqual(stats['default']['vendor'], connection.vendor)
+        self.assertIn(stats['default']['mode'], ('pool', 'persistent', 'per-request'))
+
+
+class TaskAdminChangelistTests(QueryBudgetMixin, TestCase):
+    """The task changelist stays cheap on large tables: joined clients, SQL flags, no client list."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('owner', password='secret')
+        clients = Client.objects.bulk_create(
+            Client(first_name=f"First{i}", last_name=f"Last{i}") for i in range(30)
+        )
+        today = timezone.localdate()
+        cls.overdue = Task.objects.create(client=clients[0], title="Late coat", deadline=today - datetime.timedelta(days=1))
+        cls.due_soon = Task.objects.create(client=clients[1], title="Dress", deadline=today + datetime.timedelta(days=2))
+        cls.done = Task.objects.create(
+            client=clients[2], title="Old suit", deadline=today - datetime.timedelta(days=1), status=TaskStatus.COMPLETED,
+        )
+        Task.objects.bulk_create(Task(client=clients[i % 30], title=f"Task {i}") for i in range(60))
+        cls.clients = clients
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_changelist_does_not_query_per_row(self):
+        url = reverse('admin:tasks_task_changelist')
+        with self.assertQueryBudget(8, allow_duplicates=False):
+            response = self.client.get(url)
+        self.assertEqual(len(response.context['cl'].result_list), 63)
+        self.assertIsNone(response.context['cl'].full_result_count) # No second, unfiltered COUNT(*)
+
+    def test_deadline_flags_match_properties(self):
+        for task in Task.objects.with_deadline_flags():
+            self.assertEqual((task.overdue, task.due_soon), (task.is_overdue, task.is_due_soon))
+
+    def test_sort_by_overdue(self):
+        response = self.client.get(reverse('admin:tasks_task_changelist'), {'o': '-5'}) # is_overdue column
+        self.assertEqual(response.context['cl'].result_list[0], self.overdue)
+
+    def test_client_filter_is_an_autocomplete(self):
+        url = reverse('admin:tasks_task_changelist')
+        response = self.client.get(url, {'client__id__exact': self.clients[0].pk})
+        self.assertEqual(set(response.context['cl'].result_list), set(Task.objects.filter(client=self.clients[0])))
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertContains(response, 'js/autocomplete_filter.js')
+        self.assertNotContains(response, str(self.clients[5])) # The other clients aren't listed
+        # The widget's searches: the admin autocomplete view, served by the clients' full-text search.
+        results = self.client.get(reverse('admin:autocomplete'), {
+            'app_label': 'tasks', 'model_name': 'task', 'field_name': 'client', 'term': 'last29',
+        }).json()['results']
+        self.assertEqual([result['id'] for result in results], [str(self.clients[29].pk)])
+
+    def test_paginator_caps_filtered_counts(self):
+        paginator = EstimatedCountPaginator(Task.objects.filter(status=TaskStatus.PENDING).order_by('pk'), 10)
+        paginator.count_limit = 25
+        self.assertEqual(paginator.count, 25)
+        self.assertEqual(EstimatedCountPaginator(Task.objects.order_by('pk'), 10).count, 63)
+
+
+class TaskDailyStatsConsistencyTests(TestCase):
+    """Incremental rollup maintenance must leave what rebuild() would compute."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.ada = Client.objects.create(first_name="Ada", last_name="Lovelace")
+        cls.grace = Client.objects.create(first_name="Grace", last_name="Hopper")
+        cls.task = Task.objects.create(client=cls.ada, title="Hem trousers")
+        Task.objects.create(client=cls.grace, title="Dress", status=TaskStatus.COMPLETED)
+
+    def snapshot(self):
+        today = timezone.localdate()
+        start, end = today - datetime.timedelta(days=400), today + datetime.timedelta(days=1)
+        stats = TaskDailyStats.objects
+        totals = TaskDailyTotals.objects
+        snapshot = (
+            {(row.day, row.client_id, row.status): row.task_count for row in stats.all() if row.task_count},
+            list(stats.completion_report(start, end)),
+            stats.status_totals(),
+            stats.completed_count(start, end),
+        )
+        # The atelier-wide totals agree with the per-client rows.
+        self.assertEqual(list(totals.completion_report(start, end)), snapshot[1])
+        self.assertEqual(totals.status_totals(), snapshot[2])
+        self.assertEqual(totals.completed_count(start, end), snapshot[3])
+        return snapshot + ({(row.day, row.status): row.task_count for row in totals.all() if row.task_count},)
+
+    def assertMatchesRebuild(self):
+        incremental = self.snapshot()
+        TaskDailyStats.objects.rebuild()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_create(self):
+        Task.objects.create(client=self.grace, title="Coat")
+        self.assertMatchesRebuild()
+
+    def test_delete(self):
+        self.task.delete()
+        self.assertMatchesRebuild()
+
+    def test_status_change(self):
+        self.task.status = TaskStatus.COMPLETED
+        self.task.save()
+        self.assertMatchesRebuild()
+        self.task.status = TaskStatus.PENDING # Back out of the completion bucket
+        self.task.save()
+        self.assertMatchesRebuild()
+
+    def test_client_change(self):
+        self.task.client = self.grace
+        self.task.save()
+        self.assertMatchesRebuild()
+
+    def test_transition_status(self):
+        Task.objects.bulk_create(Task(client=self.grace, title=f"Task {i}") for i in range(3)) # Not counted
+        TaskDailyStats.objects.rebuild()
+        Task.objects.all().transition_status(TaskStatus.COMPLETED)
+        self.assertMatchesRebuild()
+        Task.objects.all().transition_status(TaskStatus.IN_PROGRESS)
+        self.assertMatchesRebuild()
+
+    def test_save_with_explicit_existing_pk(self):
+        # Not loaded from the database, but an UPDATE of an existing row.
+        Task(pk=self.task.pk, client=self.grace, title="Hem trousers", status=TaskStatus.COMPLETED,
+             created_at=self.task.created_at).save()
+        self.assertMatchesRebuild()
+
+    def test_client_delete(self):
+        self.ada.delete()
+        self.assertMatchesRebuild()
+
+
+class TaskDailyTotalsTests(TestCase):
+    """The atelier-wide report reads one rollup row per day, however many clients completed tasks."""
+    CLIENT_COUNT = 20
+    DAYS = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        clients = Client.objects.bulk_create(
+            Client(first_name=f"First{i}", last_name=f"Last{i}") for i in range(cls.CLIENT_COUNT)
+        )
+        now = timezone.now()
+        Task.objects.bulk_create(
+            Task(client=client, title=f"Task {day}", status=TaskStatus.COMPLETED,
+                 completed_at=now - datetime.timedelta(days=day))
+            for client in clients for day in range(cls.DAYS)
+        )
+        TaskDailyStats.objects.rebuild()
+
+    def test_report_rows_are_capped_by_days(self):
+        today = timezone.localdate()
+        start, end = today - datetime.timedelta(days=self.DAYS + 1), today + datetime.timedelta(days=1)
+        report = TaskDailyTotals.objects.completion_report(start, end, period='day')
+        with CaptureQueriesContext(connection) as queries:
+            rows = list(report)
+        self.assertEqual(len(queries), 1)
+        self.assertIn(TaskDailyTotals._meta.db_table, queries[0]['sql'])
+        self.assertEqual(sum(row['count'] for row in rows), self.CLIENT_COUNT * self.DAYS)
+        # Rows read: one per day (up to DAYS + 1 across a local midnight), not one per client and day.
+        read = TaskDailyTotals.objects.filter(status=TaskStatus.COMPLETED, day__gte=start, day__lt=end).count()
+        self.assertLessEqual(read, self.DAYS + 1)
+        self.assertGreaterEqual(TaskDailyStats.objects.count(), self.CLIENT_COUNT * self.DAYS)
+
+    def test_dashboard_reads_totals(self):
+        user = User.objects.create_user('owner', password='secret')
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('dashboard'))
+        tables = ' '.join(query['sql'] for query in queries)
+        self.assertIn(TaskDailyTotals._meta.db_table, tables)
+        self.assertNotIn(f'"{TaskDailyStats._meta.db_table}"', tables)
+
+
+class CoalescingDispatcherTests(TestCase):
+    """Change notifications are deferred to commit and merged within the window."""
+    def setUp(self):
+        self.flushes = []
+        self.dispatcher = CoalescingDispatcher(self.flushes.append, window=60) # Flushed by hand below
+
+    def test_events_within_the_window_are_merged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dispatcher.notify(key='task', value=1)
+            self.dispatcher.notify(key='task', value=2)
+            self.dispatcher.notify(key='client', value=7)
+        self.assertEqual(self.flushes, []) # Window still open
+        self.assertTrue(self.dispatcher.flush())
+        self.assertEqual(self.flushes, [{'task': [1, 2], 'client': [7]}])
+        self.assertFalse(self.dispatcher.flush()) # Nothing left
+
+    def test_event_without_detail_asks_for_a_full_refresh(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dispatcher.notify(key='task', value=1)
+            self.dispatcher.notify(count=5)
+        self.dispatcher.flush()
+        self.assertEqual(self.flushes, [None])
+
+    def test_waits_for_commit(self):
+        dispatcher = CoalescingDispatcher(self.flushes.append, window=0)
+        with self.captureOnCommitCallbacks() as callbacks:
+            dispatcher.notify(key='task', value=1)
+        self.assertEqual(self.flushes, [])
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.flushes, [{'task': [1]}]) # Window 0: flushed on commit
+
+    def test_rolled_back_changes_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.dispatcher.notify(key='task', value=1)
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertFalse(self.dispatcher.flush())
+        self.assertEqual(self.dispatcher.get_stats()['events'], 0)
+
+    def test_stats(self):
+        def failing_flush(changes):
+            raise ValueError
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dispatcher.notify(count=2, key='task', value=1)
+            self.dispatcher.notify(key='task', value=2)
+        self.assertEqual(self.dispatcher.get_stats()['pending'], 3)
+        self.dispatcher.flush()
+        self.dispatcher.flush_func = failing_flush
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dispatcher.notify(key='task', value=3)
+        with self.assertLogs('tasks.dispatch', 'ERROR'):
+            self.dispatcher.flush() # A failing flush is logged, not raised
+        self.assertEqual(
+            self.dispatcher.get_stats(),
+            {'events': 4, 'merged': 2, 'flushes': 2, 'errors': 1, 'pending': 0},
+        )
+
+
+class TaskFieldTrackingTests(TestCase):
+    """Loaded-values snapshot: dirty fields in memory, UPDATEs of changed columns only."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.client_obj = Client.objects.create(first_name="Ada", last_name="Lovelace")
+        cls.task = Task.objects.create(client=cls.client_obj, title="Hem trousers", description="Navy")
+
+    def setUp(self):
+        self.loaded = Task.objects.get(pk=self.task.pk)
+
+    def test_dirty_fields(self):
+        self.assertFalse(self.loaded.is_dirty())
+        self.loaded.title = "Shorten trousers"
+        self.assertEqual(self.loaded.get_dirty_fields(), {'title': "Hem trousers"})
+        self.assertEqual(self.loaded.get_loaded_value('title'), "Hem trousers")
+
+    def test_unchanged_save_issues_no_query(self):
+        with self.assertNumQueries(0):
+            self.loaded.save()
+
+    def test_save_updates_changed_columns_only(self):
+        self.loaded.title = "Shorten trousers"
+        with CaptureQueriesContext(connection) as queries:
+            self.loaded.save()
+        update = next(query['sql'] for query in queries if query['sql'].startswith('UPDATE "tasks_task"'))
+        self.assertIn('"title"', update)
+        self.assertIn('"updated_at"', update) # auto_now
+        self.assertNotIn('"description"', update)
+        self.assertFalse(self.loaded.is_dirty()) # Snapshot refreshed
+
+    def test_status_update_fields_persist_completed_at(self):
+        self.loaded.status = TaskStatus.COMPLETED
+        self.loaded.save(update_fields=['status'])
+        completed_at = Task.objects.get(pk=self.task.pk).completed_at
+        self.assertIsNotNone(completed_at)
+        self.loaded.status = TaskStatus.PENDING
+        self.loaded.save(update_fields=['status'])
+        self.assertIsNone(Task.objects.get(pk=self.task.pk).completed_at)
+
+    def test_status_change_persists_completed_at(self):
+        self.loaded.status = TaskStatus.COMPLETED
+        self.loaded.save()
+        self.assertEqual(Task.objects.get(pk=self.task.pk).completed_at, self.loaded.completed_at)
+
+
+class TaskTransitionStatusTests(TestCase):
+    """Set-based status changes: one UPDATE, save()'s completed_at rules, one signal per batch."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.ada = Client.objects.create(first_name="Ada", last_name="Lovelace")
+        cls.grace = Client.objects.create(first_name="Grace", last_name="Hopper")
+        Task.objects.bulk_create([
+            Task(client=cls.ada, title="Hem trousers"),
+            Task(client=cls.ada, title="Take in waist", status=TaskStatus.IN_PROGRESS),
+            Task(client=cls.grace, title="Sew dress"),
+        ])
+        cls.done = Task.objects.create(client=cls.grace, title="Old suit", status=TaskStatus.COMPLETED)
+
+    def setUp(self):
+        self.signals = []
+        def receiver(sender, **kwargs):
+            self.signals.append(kwargs)
+        tasks_transitioned.connect(receiver, sender=Task, weak=False)
+        self.addCleanup(tasks_transitioned.disconnect, receiver, sender=Task)
+
+    def test_completing_stamps_completed_at(self):
+        completed_at = Task.objects.get(pk=self.done.pk).completed_at
+        before = timezone.now()
+        self.assertEqual(Task.objects.all().transition_status(TaskStatus.COMPLETED), 3) # Not the completed one
+        for task in Task.objects.exclude(pk=self.done.pk):
+            self.assertEqual(task.status, TaskStatus.COMPLETED)
+            self.assertGreaterEqual(task.completed_at, before)
+        self.assertEqual(Task.objects.get(pk=self.done.pk).completed_at, completed_at) # Untouched
+
+    def test_leaving_completed_clears_completed_at(self):
+        Task.objects.all().transition_status(TaskStatus.COMPLETED)
+        self.assertEqual(Task.objects.all().transition_status(TaskStatus.PENDING), 4)
+        self.assertFalse(Task.objects.filter(completed_at__isnull=False).exists())
+
+    def test_one_signal_per_batch(self):
+        Task.objects.all().transition_status(TaskStatus.ON_HOLD)
+        self.assertEqual(len(self.signals), 1)
+        self.assertEqual(self.signals[0]['count'], 4)
+        self.assertEqual(self.signals[0]['new_status'], TaskStatus.ON_HOLD)
+        self.assertEqual(self.signals[0]['client_ids'], {self.ada.pk, self.grace.pk})
+
+    def test_nothing_to_change_sends_no_signal(self):
+        self.assertEqual(Task.objects.filter(pk=self.done.pk).transition_status(TaskStatus.COMPLETED), 0)
+        self.assertEqual(self.signals, [])
+
+
+class KeysetPaginatorTests(TestCase):
+    """Cursor pagination: every row exactly once in both directions, tampered cursors rejected."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='secret')
+        client = Client.objects.create(first_name="Ada", last_name="Lovelace")
+        Task.objects.bulk_create(Task(client=client, title=f"Task {i}") for i in range(23))
+
+    def paginator(self):
+        return KeysetPaginator(Task.objects.all(), ('-created_at', '-id'), 5)
+
+    def walk(self, paginator):
+        """Pages forward to the end, then back to the start; returns (forward ids, backward ids)."""
+        forward, page = [], paginator.page()
+        self.assertFalse(page.has_previous())
+        while True:
+            forward.append([task.pk for task in page])
+            if not page.has_next():
+                break
+            page = paginator.page(page.next_cursor)
+        backward = [[task.pk for task in page]]
+        while page.has_previous():
+            page = paginator.page(page.previous_cursor)
+            backward.append([task.pk for task in page])
+        return forward, backward[::-1]
+
+    def test_next_and_previous(self):
+        forward, backward = self.walk(self.paginator())
+        expected = list(Task.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+        self.assertEqual(sum(forward, []), expected)
+        self.assertEqual([len(ids) for ids in forward], [5, 5, 5, 5, 3])
+        self.assertEqual(backward, forward)
+
+    def test_rows_sharing_the_sort_value(self):
+        Task.objects.update(created_at=timezone.now()) # Only the id tells them apart
+        forward, backward = self.walk(self.paginator())
+        self.assertEqual(sum(forward, []), sorted(Task.objects.values_list('pk', flat=True), reverse=True))
+        self.assertEqual(backward, forward)
+
+    def test_tampered_cursors_are_rejected(self):
+        paginator = self.paginator()
+        def encode(data):
+            return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip('=')
+        cursors = [
+            'garbage', '!!!', encode([1, 2]), encode({'d': 'up', 'v': []}),
+            encode({'d': 'next', 'v': ['2024-01-01T00:00:00+00:00']}), # Wrong length
+            encode({'d': 'next', 'v': [None, None]}),
+            encode({'d': 'next', 'v': ['not a date', 1]}),
+            encode({'d': 'next', 'v': ['2024-01-01T00:00:00+00:00', 10 ** 30]}),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                paginator.page(cursor)
+
+    def test_tampered_cursor_is_a_404_not_a_500(self):
+        self.client.force_login(self.user)
+        for cursor in ('garbage', base64.urlsafe_b64encode(b'{"d": "next", "v": [null, null, null]}').decode()):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get(reverse('client_list'), {'cursor': cursor}).status_code, 404)
+
+
+@override_settings(TIME_ZONE='Europe/Kyiv')
+class CompletionPeriodTests(TestCase):
+    """
+    Local period ranges across a DST change: March 2024 in Kyiv starts at
+    +02:00 and ends at +03:00, so it is 31 days minus an hour long and neither
+    end falls on a UTC midnight.
+    """
+    tz = ZoneInfo('Europe/Kyiv')
+    march_start = datetime.datetime(2024, 3, 1, tzinfo=tz)
+    april_start = datetime.datetime(2024, 4, 1, tzinfo=tz)
+    microsecond = datetime.timedelta(microseconds=1)
+
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create(first_name="Ada", last_name="Lovelace")
+        cls.tasks = dict(zip(['before', 'first', 'last', 'after'], Task.objects.bulk_create(
+            Task(client=client, title=f"Task {i}", status=TaskStatus.COMPLETED, completed_at=completed_at)
+            for i, completed_at in enumerate([
+                cls.march_start - cls.microsecond, cls.march_start,
+                cls.april_start - cls.microsecond, cls.april_start,
+            ])
+        )))
+
+    def test_period_bounds(self):
+        start, end = period_bounds('month', datetime.date(2024, 3, 15))
+        self.assertEqual((start, end), (self.march_start, self.april_start))
+        self.assertEqual(start.utcoffset(), datetime.timedelta(hours=2))
+        self.assertEqual(end.utcoffset(), datetime.timedelta(hours=3))
+        self.assertEqual(end.astimezone(datetime.UTC) - start.astimezone(datetime.UTC), datetime.timedelta(days=31, hours=-1))
+
+    def test_completed_this_month_q(self):
+        now = datetime.datetime(2024, 3, 31, 12, tzinfo=self.tz) # After the switch
+        matched = set(Task.objects.filter(TaskQuerySet.completed_this_month_q(now)))
+        self.assertEqual(matched, {self.tasks['first'], self.tasks['last']})
+
+    def test_completion_report(self):
+        report = Task.objects.completion_report(self.march_start, self.april_start)
+        self.assertEqual(list(report), [{'period': self.march_start, 'count': 2}])
+        report = Task.objects.completion_report(
+            datetime.datetime(2024, 2, 1, tzinfo=self.tz), datetime.datetime(2024, 5, 1, tzinfo=self.tz)
+        )
+        self.assertEqual(list(report), [
+            {'period': datetime.datetime(2024, 2, 1, tzinfo=self.tz), 'count': 1},
+            {'period': self.march_start, 'count': 2},
+            {'period': self.april_start, 'count': 1},
+        ])
+
+
+class DashboardMetricsTests(TestCase):
+    """The single metrics query must agree with one COUNT(*) per predicate."""
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create(first_name="Ada", last_name="Lovelace")
+        today = timezone.localdate()
+        now = timezone.now()
+        tasks = []
+        # Around each boundary: overdue stops at yesterday, due-soon covers today .. today + 3.
+        for offset in (-1, 0, 3, 4):
+            for status in TaskStatus.values:
+                tasks.append(Task(
+                    client=client, title=f"{status} {offset}", status=status,
+                    deadline=today + datetime.timedelta(days=offset),
+                    completed_at=now if status == TaskStatus.COMPLETED else None,
+                ))
+        tasks.append(Task(client=client, title="Last month", status=TaskStatus.COMPLETED,
+                          completed_at=period_bounds('month')[0] - datetime.timedelta(microseconds=1)))
+        tasks.append(Task(client=client, title="No deadline"))
+        Task.objects.bulk_create(tasks)
+
+    def test_matches_per_predicate_counts(self):
+        with self.assertNumQueries(1):
+            metrics = Task.objects.dashboard_metrics()
+        self.assertEqual(metrics, {
+            'overdue_count': Task.objects.get_overdue_tasks().count(),
+            'due_soon_count': Task.objects.get_tasks_near_deadline(days=3).count(),
+            'in_progress_count': Task.objects.filter(status=TaskStatus.IN_PROGRESS).count(),
+            'pending_count': Task.objects.filter(status=TaskStatus.PENDING).count(),
+            'completed_this_month_count': Task.objects.get_completed_tasks_this_month().count(),
+        })
+        # Open statuses only: yesterday is overdue, today and today + 3 are due soon, today + 4 neither.
+        open_count = len(OPEN_STATUSES)
+        self.assertEqual(metrics['overdue_count'], open_count)
+        self.assertEqual(metrics['due_soon_count'], 2 * open_count)
+        self.assertEqual(metrics['pending_count'], 5)
+        self.assertEqual(metrics['completed_this_month_count'], 4)
+
+    def test_no_tasks(self):
+        metrics = Task.objects.filter(title="Missing").dashboard_metrics()
+        self.assertEqual(set(metrics.values()), {0})
+        self.assertEqual(len(metrics), 5)
+
+    def test_days_window(self):
+        metrics = Task.objects.dashboard_metrics(days=4)
+        self.assertEqual(metrics['due_soon_count'], Task.objects.get_tasks_near_deadline(days=4).count())
+        self.assertEqual(metrics['due_soon_count'], 3 * len(OPEN_STATUSES))
@@ -0,0 +1,30 @@
+import uuid
+
+from django.core.cache import cache
+
+TASK_LIST_VERSION_KEY = 'tasks:list:version'
+
+def _new_version():
+    # A random version (rather than a counter) can never resurrect an old ETag after eviction.
+    version = uuid.uuid4().hex
+    cache.set(TASK_LIST_VERSION_KEY, version, None)
+    return version
+
+def get_task_list_version():
+    """
+    Opaque token that changes whenever any task is created, edited or deleted
+    (through save(), delete() or the bulk TaskQuerySet methods). Used in the
+    task list's ETag instead of aggregating over the tasks table.
+    """
+    return cache.get(TASK_LIST_VERSION_KEY) or _new_version()
+
+async def aget_task_list_version():
+    version = await cache.aget(TASK_LIST_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        await cache.aset(TASK_LIST_VERSION_KEY, version, None)
+    return version
+
+def invalidate_task_list():
+    """Bumps the version so every cached copy of the task list revalidates."""
+    _new_version()
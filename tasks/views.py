@@ -4,40 +4,110 @@ from django.urls import reverse_lazy
 from django.http import HttpResponse
 from django.template.loader import render_to_string
 from django.contrib import messages
+from django.db.models import Count, Max
+from django.utils import timezone
 from .models import Task, TaskStatus
 from .forms import TaskForm # Create this in next step
+from .versions import aget_task_list_version
+from clients.choices import aget_client_choices_version, aget_selected_client_choices
+from atelier_management.auth import AsyncLoginRequiredMixin
+from atelier_management.conditional import ConditionalGetMixin
+from atelier_management.pagination import KeysetPaginationMixin, get_current_list_params
 
-class TaskListView(LoginRequiredMixin, ListView):
+class TaskListView(AsyncLoginRequiredMixin, ConditionalGetMixin, KeysetPaginationMixin, ListView):
     model = Task
     template_name = 'tasks/task_list.html'
     context_object_name = 'tasks'
     paginate_by = 10
+    keyset_ordering = ('-created_at', '-id') # Cursor pagination: no COUNT(*)/OFFSET on deep pages
+
+    def get_template_names(self):
+        if self.request.htmx and not self.request.htmx.history_restore_request:
+            return ['tasks/partials/task_table.html'] # Filter and page changes only swap the table body
+        return super().get_template_names()
 
     def get_queryset(self):
-        # Example of using custom manager methods
-        queryset = super().get_queryset()
-        status_filter = self.request.GET.get('status')
-        client_filter = self.request.GET.get('client')
+        return self.filter_queryset(super().get_queryset(), self.request.GET)
+
+    @staticmethod
+    def filter_queryset(queryset, params):
+        """Applies the list filters in 'params' (?status=, ?client=, ?q=); shared with TaskCreateView."""
+        status_filter = params.get('status')
+        client_filter = params.get('client')
+        search_query = params.get('q', '').strip()
 
         if status_filter:
             queryset = queryset.filter(status=status_filter)
         if client_filter:
             queryset = queryset.filter(client_id=client_filter)
+        if search_query:
+            queryset = queryset.search(search_query) # Indexed full-text search, ranked
 
         return queryset.select_related('client') # Optimize query for client data
 
+    @classmethod
+    def get_keyset_ordering(cls, queryset):
+        if 'search_rank' in queryset.query.annotations:
+            return ('-search_rank', '-id') # Most relevant first
+        return super().get_keyset_ordering(queryset)
+
+    async def get(self, request, *args, **kwargs):
+        return await self.aconditional_get(self.alist, request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        """
+        Async counterpart of ListView.get(): the page and the selected client are
+        read with the async ORM, then the template is rendered (by Django, in a
+        thread) from the fetched rows without further queries.
+        """
+        self.object_list = self.get_queryset()
+        await self.apaginate_queryset(self.object_list, self.get_paginate_by(self.object_list))
+        selected_client_id = self.get_selected_client_id()
+        return self.render_to_response(self.get_context_data(
+            # Only the selected client: the picker searches the others (ClientAutocompleteView).
+            client_options=await aget_selected_client_choices(selected_client_id),
+            selected_client_id=selected_client_id,
+        ))
+
+    def get_selected_client_id(self):
+        try:
+            return int(self.request.GET['client'])
+        except (KeyError, ValueError):
+            return None
+
+    async def aget_validators(self):
+        return {
+            # Bumped on every task write: no query over the (possibly huge) task table.
+            'tasks': await aget_task_list_version(),
+            'today': timezone.localdate(), # Overdue / due soon highlighting
+            # Bumped on every client save or delete: covers client names in rows and the client filter.
+            'client_choices': await aget_client_choices_version(),
+        }
+
+    def get_last_modified(self, validators):
+        return None # Client changes only show in the ETag, so a date alone could validate a stale copy
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['task_statuses'] = TaskStatus.choices # Pass choices to template for filter dropdown
-        from clients.models import Client # Import here to avoid circular dependency at top
-        context['clients'] = Client.objects.all().order_by('first_name')
         return context
 
-class TaskDetailView(LoginRequiredMixin, DetailView):
+class TaskDetailView(LoginRequiredMixin, ConditionalGetMixin, DetailView):
     model = Task
     template_name = 'tasks/task_detail.html'
     context_object_name = 'task'
 
+    def get_validators(self):
+        validators = Task.objects.filter(pk=self.kwargs['pk']).aggregate(
+            task_modified=Max('updated_at'),
+            client_modified=Max('client__updated_at'),
+            task_count=Count('pk'),
+        )
+        if not validators['task_count']:
+            return None # Let DetailView raise the 404
+        validators['today'] = timezone.localdate()
+        return validators
+
 class TaskCreateView(LoginRequiredMixin, CreateView):
     model = Task
     form_class = TaskForm
@@ -48,9 +118,18 @@ class TaskCreateView(LoginRequiredMixin, CreateView):
         response = super().form_valid(form)
         messages.success(self.request, f"Task '{self.object.title}' created successfully!")
         if self.request.htmx:
-            tasks = self.get_queryset() # Use get_queryset to apply filters if any
-            html = render_to_string('tasks/partials/task_table.html', {'tasks': tasks}, request=self.request)
-            return HttpResponse(html, headers={'HX-Trigger': 'taskCreated'})
+            headers = {'HX-Trigger': 'taskCreated'}
+            params = get_current_list_params(self.request)
+            if params:
+                # Filtered or paged list: the new task may not belong there, re-render the first page (capped).
+                tasks = TaskListView.filter_queryset(Task.objects.all(), params)
+                context = TaskListView.get_first_page_context(tasks, params)
+                html = render_to_string('tasks/partials/task_table.html', context, request=self.request)
+            else:
+                # Only the new row, prepended out of band: the cost doesn't grow with the table.
+                html = render_to_string('tasks/partials/task_row_oob.html', {'task': self.object}, request=self.request)
+                headers['HX-Reswap'] = 'none'
+            return HttpResponse(html, headers=headers)
         return response
 
     def form_invalid(self, form):
@@ -110,6 +189,7 @@ class TaskStatusUpdateView(LoginRequiredMixin, UpdateView):
     model = Task
     fields = ['status'] # Only allow updating status
     http_method_names = ['post'] # Only allow POST requests for this
+    success_url = reverse_lazy('task_list')
 
     def form_valid(self, form):
         response = super().form_valid(form)
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
+from atelier_management.changelist import EstimatedCountPaginator
 from .models import UserProfile
 
 # Define an inline admin descriptor for UserProfile model
@@ -19,6 +20,9 @@ class UserProfileInline(admin.StackedInline):
 class UserAdmin(BaseUserAdmin):
     inlines = (UserProfileInline,)
     list_display = ('username', 'email', 'first_name', 'last_name', 'is_staff', 'get_role')
+    list_select_related = ('profile',) # get_role without a query per row
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_filter = ('is_staff', 'is_superuser', 'is_active', 'groups', 'profile__role')
     search_fields = ('username', 'first_name', 'last_name', 'email', 'profile__phone_number')
 
@@ -33,7 +37,8 @@ class UserAdmin(BaseUserAdmin):
     )
 
     def get_role(self, obj):
-        return obj.profile.get_role_display()
+        profile = getattr(obj, 'profile', None) # Users created before profiles existed have none
+        return profile.get_role_display() if profile else None
     get_role.short_description = 'Role'
     get_role.admin_order_field = 'profile__role'
 
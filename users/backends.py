@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from .cache import get_user_cache_timeout, user_cache_key
+
+UserModel = get_user_model()
+
+
+class ProfileModelBackend(ModelBackend):
+    """
+    ModelBackend loading the user's profile in the same query as the user, so
+    that role checks on request.user (HTTP session auth, sync and async) and
+    scope['user'] (Channels' AuthMiddlewareStack, which calls get_user() too)
+    don't cost a query of their own.
+
+    The loaded user is cached (AUTH_USER_CACHE_TIMEOUT): authenticated requests
+    and websocket connects then resolve it without touching the database. The
+    entry is dropped whenever the user or its profile is saved or deleted
+    (password, is_active and role changes included) and on logout.
+    """
+    def get_user_queryset(self):
+        return UserModel._default_manager.select_related('profile')
+
+    def get_user(self, user_id):
+        timeout = get_user_cache_timeout()
+        user = cache.get(user_cache_key(user_id)) if timeout else None
+        if user is None:
+            try:
+                user = self.get_user_queryset().get(pk=user_id)
+            except UserModel.DoesNotExist:
+                return None
+            if timeout:
+                cache.set(user_cache_key(user_id), user, timeout)
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        timeout = get_user_cache_timeout()
+        user = await cache.aget(user_cache_key(user_id)) if timeout else None
+        if user is None:
+            try:
+                user = await self.get_user_queryset().aget(pk=user_id)
+            except UserModel.DoesNotExist:
+                return None
+            if timeout:
+                await cache.aset(user_cache_key(user_id), user, timeout)
+        return user if self.user_can_authenticate(user) else None
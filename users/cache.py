@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.core.cache import cache
+
+def user_cache_key(user_id):
+    return f'users:auth-user:{user_id}'
+
+def get_user_cache_timeout():
+    """Seconds an authenticated user stays cached; 0 disables the cache."""
+    return settings.AUTH_USER_CACHE_TIMEOUT
+
+def invalidate_cached_user(user_id):
+    """Drops the cached user, so the next request reads it (and its profile) again."""
+    cache.delete(user_cache_key(user_id))
@@ -1,18 +1,26 @@
-from django.db import models
+from functools import partial
+
+from django.db import models, transaction
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from atelier_management.tracking import FieldTrackerMixin
+from .cache import invalidate_cached_user
+
 class UserRole(models.TextChoices):
     ADMIN = 'admin', 'Administrator'
     EMPLOYEE = 'employee', 'Employee'
 
-class UserProfile(models.Model):
+class UserProfile(FieldTrackerMixin, models.Model):
     """
     Extends the built-in Django User model with additional profile information,
     specifically a role. This follows the Proxy Pattern (indirectly) by adding behavior
     to an existing model without modifying its structure, and OCP for extensibility.
     """
+    save_changed_fields_only = True # Saving an unchanged profile issues no UPDATE
+
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     role = models.CharField(
         max_length=20,
@@ -36,5 +44,33 @@ def create_or_update_user_profile(sender, instance, created, **kwargs):
     """
     if created:
         UserProfile.objects.create(user=instance)
-    instance.profile.save() # Ensure profile is always saved/updated
-    
\ No newline at end of file
+        return
+    # Only a profile already loaded on this instance can carry unsaved changes:
+    # don't fetch it (e.g. on every sign-in's last_login update) just to save it.
+    profile = User.profile.related.get_cached_value(instance, default=None)
+    if profile is not None:
+        profile.save() # Changed fields only, nothing if it wasn't modified
+    
+# Signal receivers keeping the cached authenticated user (users.backends) in sync
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed_handler(sender, instance, **kwargs):
+    """
+    Drops the cached user right away and again once the change is committed (a
+    concurrent request could re-cache the pre-commit row in between): password
+    changes, deactivation and deletion take effect on the user's next request.
+    """
+    invalidate_cached_user(instance.pk)
+    transaction.on_commit(partial(invalidate_cached_user, instance.pk))
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def user_profile_changed_handler(sender, instance, **kwargs):
+    """The cached user carries its profile: role changes invalidate it too."""
+    invalidate_cached_user(instance.user_id)
+    transaction.on_commit(partial(invalidate_cached_user, instance.user_id))
+
+@receiver(user_logged_out)
+def user_logged_out_handler(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_cached_user(user.pk)
@@ -1,3 +1,221 @@
-from django.test import TestCase
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from atelier_management.testing import QueryBudgetMixin
+from clients.models import Client
+from tasks.models import Task, TaskStatus
+from .backends import ProfileModelBackend
+from .cache import invalidate_cached_user
+from .models import UserProfile, UserRole
+from .views import DASHBOARD_SECTION_LIMIT
+
+
+class DashboardSectionTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='secret')
+        clients = Client.objects.bulk_create(
+            Client(first_name=f"First{i}", last_name=f"Last{i}") for i in range(5)
+        )
+        Task.objects.bulk_create(
+            Task(client=clients[i % len(clients)], title=f"Task {i}", status=TaskStatus.PENDING)
+            for i in range(DASHBOARD_SECTION_LIMIT * 3)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_section_is_capped_and_does_not_query_per_row(self):
+        url = reverse('dashboard_section', args=['pending'])
+        # User (the session comes from the cache), and one query for the rows with their clients joined in.
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(len(response.context['tasks']), DASHBOARD_SECTION_LIMIT)
+        self.assertTrue(response.context['has_more'])
+        self.assertEqual(response.context['next_limit'], DASHBOARD_SECTION_LIMIT * 2)
+
+    def test_show_more_extends_the_section(self):
+        response = self.client.get(reverse('dashboard_section', args=['pending']), {'limit': DASHBOARD_SECTION_LIMIT * 3})
+        self.assertEqual(len(response.context['tasks']), DASHBOARD_SECTION_LIMIT * 3)
+        self.assertFalse(response.context['has_more'])
+
+    def test_dashboard_within_budget(self):
+        # Session, user, metrics query, completion report, and the selected client when scoped.
+        with self.assertQueryBudget(4, allow_duplicates=False):
+            self.client.get(reverse('dashboard'))
+        with self.assertQueryBudget(5, allow_duplicates=False):
+            self.client.get(reverse('dashboard'), {'client': Client.objects.first().pk})
+
+    def test_scope_picker_renders_only_the_selected_client(self):
+        selected, other = Client.objects.order_by('pk')[:2]
+        response = self.client.get(reverse('dashboard'), {'client': selected.pk})
+        self.assertContains(response, f'<option value="{selected.pk}" selected>{selected.first_name} {selected.last_name}</option>', html=True)
+        self.assertNotContains(response, other.first_name)
+        self.assertContains(response, reverse('client_autocomplete'))
+
+    def test_unknown_section_is_404(self):
+        response = self.client.get(reverse('dashboard_section', args=['archived']))
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(QUERY_INSTRUMENTATION_HEADERS=True)
+class AsyncDashboardTests(TestCase):
+    """The dashboard views run natively on the async stack (AsyncClient is an ASGI request)."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='secret')
+        client = Client.objects.create(first_name="Olena", last_name="Koval")
+        Task.objects.create(client=client, title="Hem trousers", status=TaskStatus.PENDING)
+
+    async def test_dashboard_metrics_from_async_orm(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['metrics']['pending_count'], 1)
+        # Queries awaited by the view are recorded by the async middleware.
+        self.assertGreaterEqual(int(response['X-DB-Query-Count']), 3)
+
+    async def test_section_rows(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('dashboard_section', args=['pending']))
+        self.assertEqual([task.title for task in response.context['tasks']], ["Hem trousers"])
+        self.assertContains(response, "Olena Koval")
+
+    async def test_anonymous_is_redirected_to_login(self):
+        response = await self.async_client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 302)
+
+
+class UserProfileSyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tailor', password='secret')
+
+    def test_profile_created_with_user(self):
+        self.assertEqual(UserProfile.objects.get(user=self.user).role, UserRole.EMPLOYEE)
+
+    def test_login_does_not_touch_profile(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(self.client.login(username='tailor', password='secret'))
+        self.assertFalse([query for query in queries if 'users_userprofile' in query['sql']])
+
+    def test_unchanged_profile_is_not_saved(self):
+        user = User.objects.select_related('profile').get(pk=self.user.pk)
+        user.first_name = "Iryna"
+        with self.assertNumQueries(1): # The user's UPDATE only
+            user.save()
+
+    def test_profile_changes_are_saved_with_user(self):
+        user = User.objects.select_related('profile').get(pk=self.user.pk)
+        user.profile.role = UserRole.ADMIN
+        user.save()
+        self.assertEqual(UserProfile.objects.get(user=self.user).role, UserRole.ADMIN)
+
+
+class ProfileModelBackendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tailor', password='secret')
+
+    def setUp(self):
+        invalidate_cached_user(self.user.pk)
+
+    def test_get_user_loads_profile(self):
+        with self.assertNumQueries(1):
+            user = ProfileModelBackend().get_user(self.user.pk)
+            self.assertEqual(user.profile.role, UserRole.EMPLOYEE)
+
+    async def test_aget_user_loads_profile(self):
+        user = await ProfileModelBackend().aget_user(self.user.pk)
+        self.assertTrue(User.profile.is_cached(user))
+
+    def test_request_user_has_profile(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('client_list'))
+        self.assertTrue(User.profile.is_cached(response.wsgi_request.user))
+
+    def test_sessions_from_model_backend_stay_logged_in(self):
+        # Logged in before ProfileModelBackend was configured: the session names ModelBackend.
+        self.client.force_login(self.user, backend='django.contrib.auth.backends.ModelBackend')
+        response = self.client.get(reverse('client_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.user, self.user)
+
+    def test_login_uses_profile_backend(self):
+        self.client.login(username='tailor', password='secret')
+        self.assertEqual(self.client.session[BACKEND_SESSION_KEY], 'users.backends.ProfileModelBackend')
+
+    async def test_async_request_user_has_profile(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('dashboard'))
+        self.assertTrue(User.profile.is_cached(response.asgi_request.user))
+
+
+class CachedAuthenticationTests(TestCase):
+    """Sessions and users are resolved from the cache, and dropped from it when they change."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tailor', password='secret')
+
+    def setUp(self):
+        self.client.login(username='tailor', password='secret')
+        self.backend = ProfileModelBackend()
+
+    def test_authenticated_request_skips_session_and_user_queries(self):
+        self.client.get(reverse('client_list')) # Caches the user
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('client_list'))
+        self.assertEqual(response.status_code, 200)
+        tables = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('django_session', tables)
+        self.assertNotIn('auth_user', tables)
+
+    def test_cached_user_carries_profile(self):
+        self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.pk).profile.role, UserRole.EMPLOYEE)
+
+    def test_role_change_invalidates(self):
+        self.backend.get_user(self.user.pk)
+        profile = UserProfile.objects.get(user=self.user)
+        profile.role = UserRole.ADMIN
+        profile.save()
+        self.assertEqual(self.backend.get_user(self.user.pk).profile.role, UserRole.ADMIN)
+
+    def test_deactivation_invalidates(self):
+        self.backend.get_user(self.user.pk)
+        user = User.objects.get(pk=self.user.pk)
+        user.is_active = False
+        user.save()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    def test_password_change_logs_out_other_sessions(self):
+        self.client.get(reverse('client_list'))
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('changed')
+        user.save()
+        response = self.client.get(reverse('client_list'))
+        self.assertEqual(response.status_code, 302) # Session hash no longer matches
+
+    def test_logout_invalidates(self):
+        self.client.get(reverse('client_list'))
+        self.client.logout()
+        with self.assertNumQueries(1):
+            self.backend.get_user(self.user.pk)
+
+
+class UserAdminTests(TestCase):
+    def test_changelist_loads_roles_with_users(self):
+        User.objects.bulk_create(User(username=f"user{i}") for i in range(10)) # bulk_create: no profiles
+        admin_user = User.objects.create_superuser('admin', password='secret')
+        self.client.force_login(admin_user)
+        url = reverse('admin:auth_user_changelist')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertFalse([query for query in queries if 'FROM "users_userprofile"' in query['sql']])
+        self.assertContains(response, 'Employee') # The admin's own role
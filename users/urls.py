@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import DashboardView # Will add later for DashboardView
+from .views import DashboardView, DashboardSectionView
 
 urlpatterns = [
     path('dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('dashboard/sections/<slug:section>/', DashboardSectionView.as_view(), name='dashboard_section'),
     path('', DashboardView.as_view(), name='home'), # Make dashboard the home page
 ]
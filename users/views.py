@@ -1,17 +1,96 @@
 from django.views.generic import TemplateView
-from django.contrib.auth.mixins import LoginRequiredMixin
-from tasks.models import Task, TaskStatus # Import Task and TaskStatus
+from django.http import Http404
+from django.utils import timezone
+from tasks.models import TaskDailyStats, TaskDailyTotals
+from tasks.metrics import aget_dashboard_metrics, aget_section_tasks, DASHBOARD_SECTIONS
+from tasks.periods import period_start, next_period_start
+from clients.choices import aget_selected_client_choices
+from atelier_management.auth import AsyncLoginRequiredMixin
 
-class DashboardView(LoginRequiredMixin, TemplateView):
+# Rows rendered per dashboard section, and how far "show more" may extend it.
+DASHBOARD_SECTION_LIMIT = 10
+DASHBOARD_SECTION_MAX_LIMIT = 100
+
+class DashboardScopeMixin:
+    """
+    Reads the optional ?client=<id> scope of the dashboard: a scoped dashboard
+    only shows (and is only pushed updates about) that client's tasks.
+    """
+    def get_client_id(self):
+        client_id = self.request.GET.get('client')
+        if not client_id:
+            return None
+        try:
+            return int(client_id)
+        except ValueError:
+            raise Http404("Invalid client.")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['client_id'] = self.get_client_id()
+        return context
+
+class DashboardView(AsyncLoginRequiredMixin, DashboardScopeMixin, TemplateView):
     template_name = 'users/dashboard.html'
 
+    async def get(self, request, *args, **kwargs):
+        # Every query is awaited with the async ORM (no worker thread held while
+        # the database answers); the template, rendered afterwards, runs none.
+        client_id = self.get_client_id()
+        # All counters come from a single aggregated query (same as the WebSocket push).
+        metrics = await aget_dashboard_metrics(client_id)
+        # Year-to-date report from a pre-aggregated daily rollup, at most one row per day:
+        # the atelier-wide totals, or the scoped client's own rows.
+        today = timezone.localdate()
+        stats = TaskDailyTotals.objects.all() if client_id is None else TaskDailyStats.objects.filter(client_id=client_id)
+        completion_report = [
+            row async for row in stats.completion_report(
+                period_start(today, 'year'), next_period_start(today, 'year'), period='month'
+            )
+        ]
+        context = self.get_context_data(
+            metrics=metrics,
+            completion_report=completion_report,
+            # Only the selected client: the scope picker searches the others (ClientAutocompleteView).
+            client_options=await aget_selected_client_choices(client_id),
+            **kwargs
+        )
+        return self.render_to_response(context)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # Initial data for the dashboard. Real-time updates will come via WebSocket.
-        context['overdue_tasks'] = Task.objects.get_overdue_tasks()
-        context['due_soon_tasks'] = Task.objects.get_tasks_near_deadline(days=3)
-        context['in_progress_tasks'] = Task.objects.filter(status=TaskStatus.IN_PROGRESS)
-        context['pending_tasks'] = Task.objects.filter(status=TaskStatus.PENDING)
-        context['completed_this_month_count'] = Task.objects.get_completed_tasks_this_month().count()
+        # Task lists are loaded lazily per section (DashboardSectionView), so the
+        # page itself costs a fixed number of queries whatever the backlog size.
+        context['sections'] = DASHBOARD_SECTIONS.items()
         return context
-    
\ No newline at end of file
+
+class DashboardSectionView(AsyncLoginRequiredMixin, DashboardScopeMixin, TemplateView):
+    """
+    HTMX endpoint rendering one dashboard task section, capped at ?limit= rows
+    (one query, client joined in) with a "show more" link when more exist.
+    """
+    template_name = 'users/partials/dashboard_section.html'
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.GET.get('limit', DASHBOARD_SECTION_LIMIT))
+        except ValueError:
+            limit = DASHBOARD_SECTION_LIMIT
+        return max(1, min(limit, DASHBOARD_SECTION_MAX_LIMIT))
+
+    async def get(self, request, *args, **kwargs):
+        section = self.kwargs['section']
+        if section not in DASHBOARD_SECTIONS:
+            raise Http404("Unknown dashboard section.")
+        limit = self.get_limit()
+        # Fetch one extra row to know whether there is more, without a COUNT(*).
+        tasks = await aget_section_tasks(section, limit + 1, self.get_client_id())
+        context = self.get_context_data(
+            section=section,
+            limit=limit,
+            tasks=tasks[:limit],
+            has_more=len(tasks) > limit and limit < DASHBOARD_SECTION_MAX_LIMIT,
+            next_limit=min(limit + DASHBOARD_SECTION_LIMIT, DASHBOARD_SECTION_MAX_LIMIT),
+        )
+        return self.render_to_response(context)